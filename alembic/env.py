@@ -6,8 +6,9 @@ from alembic import context
 from app.core.config import get_settings
 from app.core.database import Base
 # Import all models here
-from app.models.user import User, RefreshToken
-from app.models.todo import Task, TaskAttachment
+from app.models.user import User, RefreshToken  # noqa: F401
+from app.models.todo import Task, TaskAttachment, TaskTombstone, PendingFileDeletion, ShardMove  # noqa: F401
+from app.models.idempotency import IdempotencyKey  # noqa: F401
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
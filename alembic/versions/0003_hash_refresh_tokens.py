@@ -0,0 +1,78 @@
+"""Hash refresh tokens and index active sessions
+
+Replaces the raw refresh_tokens.token string with a 32-byte SHA-256 digest
+and adds a (user_id, expires_at) index plus a partial index on non-revoked
+tokens. Existing tokens are hashed in place, so sessions survive.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('refresh_tokens', sa.Column('token_hash', sa.LargeBinary(length=32), nullable=True))
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("UPDATE refresh_tokens SET token_hash = sha256(convert_to(token, 'UTF8'))")
+    else:
+        refresh_tokens = sa.table(
+            'refresh_tokens',
+            sa.column('id', sa.Integer),
+            sa.column('token', sa.String),
+            sa.column('token_hash', sa.LargeBinary)
+        )
+        rows = bind.execute(sa.select(refresh_tokens.c.id, refresh_tokens.c.token)).fetchall()
+        for row in rows:
+            bind.execute(
+                refresh_tokens.update()
+                .where(refresh_tokens.c.id == row.id)
+                .values(token_hash=hashlib.sha256(row.token.encode()).digest())
+            )
+
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.alter_column('token_hash', existing_type=sa.LargeBinary(length=32), nullable=False)
+        batch_op.drop_column('token')
+
+    op.create_index(op.f('ix_refresh_tokens_token_hash'), 'refresh_tokens', ['token_hash'], unique=True)
+    op.create_index(
+        'ix_refresh_tokens_user_id_expires_at',
+        'refresh_tokens',
+        ['user_id', 'expires_at'],
+        unique=False
+    )
+    op.create_index(
+        'ix_refresh_tokens_active_user_id',
+        'refresh_tokens',
+        ['user_id', 'expires_at'],
+        unique=False,
+        postgresql_where=sa.text('NOT is_revoked'),
+        sqlite_where=sa.text('NOT is_revoked')
+    )
+
+
+def downgrade() -> None:
+    # Raw tokens cannot be recovered from their digests; all sessions end
+    op.drop_index('ix_refresh_tokens_active_user_id', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_user_id_expires_at', table_name='refresh_tokens')
+    op.drop_index(op.f('ix_refresh_tokens_token_hash'), table_name='refresh_tokens')
+    op.execute("DELETE FROM refresh_tokens")
+
+    with op.batch_alter_table('refresh_tokens') as batch_op:
+        batch_op.add_column(sa.Column('token', sa.String(length=255), nullable=False))
+        batch_op.drop_column('token_hash')
+        batch_op.create_unique_constraint('refresh_tokens_token_key', ['token'])
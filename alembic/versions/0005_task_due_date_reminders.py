@@ -0,0 +1,44 @@
+"""Task due-date reminders
+
+Adds tasks.reminder_sent_at and a partial index on due_date covering open
+tasks still waiting for a reminder. Tasks already past due are marked as
+reminded, so the rollout does not send a burst of stale reminders.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('reminder_sent_at', sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE tasks SET reminder_sent_at = due_date "
+        "WHERE due_date < CURRENT_TIMESTAMP AND NOT is_completed"
+    )
+    op.create_index(
+        'ix_tasks_pending_reminder_due_date',
+        'tasks',
+        ['due_date'],
+        unique=False,
+        postgresql_where=sa.text('NOT is_completed AND reminder_sent_at IS NULL'),
+        sqlite_where=sa.text('NOT is_completed AND reminder_sent_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_pending_reminder_due_date', table_name='tasks')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('reminder_sent_at')
@@ -0,0 +1,56 @@
+"""Task updated_at and tombstones for delta sync
+
+Adds tasks.updated_at, backfilled from created_at, with a
+(user_id, updated_at, id) index, and the task_tombstones table recording
+deleted tasks.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE tasks SET updated_at = COALESCE(completed_at, created_at, CURRENT_TIMESTAMP)")
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_index('ix_tasks_user_id_updated_at', 'tasks', ['user_id', 'updated_at', 'id'], unique=False)
+
+    op.create_table(
+        'task_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_task_tombstones_user_id_deleted_at',
+        'task_tombstones',
+        ['user_id', 'deleted_at', 'task_id'],
+        unique=False
+    )
+    op.create_index(op.f('ix_task_tombstones_deleted_at'), 'task_tombstones', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_task_tombstones_deleted_at'), table_name='task_tombstones')
+    op.drop_index('ix_task_tombstones_user_id_deleted_at', table_name='task_tombstones')
+    op.drop_table('task_tombstones')
+    op.drop_index('ix_tasks_user_id_updated_at', table_name='tasks')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('updated_at')
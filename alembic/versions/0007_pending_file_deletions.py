@@ -0,0 +1,46 @@
+"""Pending file deletions
+
+Adds the pending_file_deletions queue of uploaded files to remove from
+disk once their attachments are gone, and indexes task_attachments.file_path
+for the purger's and reconciler's lookups.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 09:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pending_file_deletions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('file_path', sa.String(length=255), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_pending_file_deletions_file_path'),
+        'pending_file_deletions',
+        ['file_path'],
+        unique=False
+    )
+    op.create_index(op.f('ix_task_attachments_file_path'), 'task_attachments', ['file_path'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_task_attachments_file_path'), table_name='task_attachments')
+    op.drop_index(op.f('ix_pending_file_deletions_file_path'), table_name='pending_file_deletions')
+    op.drop_table('pending_file_deletions')
@@ -0,0 +1,39 @@
+"""Attachment thumbnails
+
+Adds task_attachments.thumbnail_path and thumbnail_status for generated
+thumbnails.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('task_attachments', sa.Column('thumbnail_path', sa.String(length=255), nullable=True))
+    op.add_column('task_attachments', sa.Column('thumbnail_status', sa.String(length=20), nullable=True))
+    op.create_index(
+        op.f('ix_task_attachments_thumbnail_path'),
+        'task_attachments',
+        ['thumbnail_path'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_task_attachments_thumbnail_path'), table_name='task_attachments')
+    with op.batch_alter_table('task_attachments') as batch_op:
+        batch_op.drop_column('thumbnail_status')
+        batch_op.drop_column('thumbnail_path')
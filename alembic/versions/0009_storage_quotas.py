@@ -0,0 +1,61 @@
+"""Storage quotas
+
+Adds task_attachments.size_bytes and the per-user running total and quota
+override. Existing attachments are sized from their files on disk, so run
+the upgrade from the directory the app runs in.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'task_attachments',
+        sa.Column('size_bytes', sa.BigInteger(), server_default='0', nullable=False)
+    )
+    op.add_column(
+        'users',
+        sa.Column('storage_used_bytes', sa.BigInteger(), server_default='0', nullable=False)
+    )
+    op.add_column('users', sa.Column('storage_quota_bytes', sa.BigInteger(), nullable=True))
+
+    conn = op.get_bind()
+    attachments = conn.execute(sa.text("SELECT id, file_path FROM task_attachments")).all()
+    sizes = []
+    for attachment_id, file_path in attachments:
+        try:
+            sizes.append({"id": attachment_id, "size": os.path.getsize(file_path)})
+        except OSError:
+            # Missing files take up no space
+            continue
+    if sizes:
+        conn.execute(sa.text("UPDATE task_attachments SET size_bytes = :size WHERE id = :id"), sizes)
+    op.execute(
+        "UPDATE users SET storage_used_bytes = ("
+        "SELECT COALESCE(SUM(task_attachments.size_bytes), 0) FROM task_attachments "
+        "JOIN tasks ON tasks.id = task_attachments.task_id "
+        "WHERE tasks.user_id = users.id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('storage_quota_bytes')
+        batch_op.drop_column('storage_used_bytes')
+    with op.batch_alter_table('task_attachments') as batch_op:
+        batch_op.drop_column('size_bytes')
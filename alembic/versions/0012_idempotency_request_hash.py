@@ -0,0 +1,29 @@
+"""Idempotency request hash
+
+Adds idempotency_keys.request_hash, the digest of the first request's
+body, so a key reused with a different body is refused.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('idempotency_keys', sa.Column('request_hash', sa.LargeBinary(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('idempotency_keys', 'request_hash')
@@ -25,6 +25,19 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+def get_read_db(db: Session = Depends(get_db)) -> Session:
+    """
+    Dependency for a database session whose reads may use the replica.
+    
+    Shares the request's session with get_db, so the current user lookup
+    is routed too. Writes still go to the primary.
+    
+    Returns:
+        Session: Database session marked read-only
+    """
+    db.info["read_only"] = True
+    return db
+
 async def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme)
@@ -53,7 +66,9 @@ async def get_current_user(
         if user is None:
             logger.warning(f"Invalid token attempt")
             raise credentials_exception
-            
+        
+        # Lets replica routing keep this user's reads on the primary after a write
+        db.info["user_id"] = user.id
         return user
         
     except Exception as e:
@@ -80,4 +95,27 @@ async def get_current_active_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User not verified"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+async def get_current_admin_user(
+    current_user: User = Depends(get_current_active_user),
+) -> User:
+    """
+    Dependency for getting current administrator.
+    
+    Args:
+        current_user: Current active user
+        
+    Returns:
+        User: Current administrator
+        
+    Raises:
+        HTTPException: If user is not an administrator
+    """
+    if not current_user.is_admin:
+        logger.warning(f"Non-admin access attempt by user: {current_user.email}")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator privileges required"
+        )
+    return current_user
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_admin_user, get_db
+from app.models.user import User
+from app.services.export_service import EXPORT_MEDIA_TYPES, ExportService
+from app.core.logging import setup_logger
+
+router = APIRouter()
+logger = setup_logger(__name__)
+
+EXPORT_FORMAT_PATTERN = f"^({'|'.join(EXPORT_MEDIA_TYPES)})$"
+
+@router.get("/export")
+async def export_all_tasks(
+    export_format: str = Query("ndjson", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    user_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Stream tasks of all users, or of one user, for the analytics pipeline."""
+    logger.info(f"Task export ({export_format}, user: {user_id or 'all'}) started by {current_user.email}")
+    # The export reads with its own sessions; don't hold this one while it streams
+    db.close()
+    filename = f"tasks-all-{datetime.utcnow():%Y%m%d}.{export_format}"
+    return StreamingResponse(
+        ExportService.stream_export(export_format, user_id),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
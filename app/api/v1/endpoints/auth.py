@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Cookie, Depends, HTTPException, Response, status, BackgroundTasks, Request
 from fastapi.security import OAuth2PasswordRequestForm, HTTPBearer
 from sqlalchemy.orm import Session
-from typing import Any, Dict
+from typing import Any, Dict, List
 from datetime import datetime, timedelta
 from app.api.deps import get_db, get_current_active_user
 from app.core.security import SecurityService
-from app.models.user import RefreshToken, User
-from app.schemas.user import UserCreate, UserResponse
+from app.models.user import User
+from app.schemas.user import SessionResponse, UserCreate, UserResponse
 from app.services.user_service import UserService
 from app.services.email_service import EmailService
 from app.services.token_service import TokenService
@@ -141,24 +141,15 @@ async def refresh_token(
     db: Session = Depends(get_db),
     refresh_token: str = Cookie(None)
 ) -> Dict[str, str]:
-    """Refresh access token using refresh token."""
-    try:
-        # Validate refresh token
-        is_valid = await TokenService.validate_refresh_token(refresh_token, db)
-        if not is_valid:
-            raise HTTPException(
-                status_code=401, 
-                detail="Invalid refresh token"
-            )
-
-        # Get user from refresh token
-        token_record = db.query(RefreshToken).filter(
-            RefreshToken.token == refresh_token
-        ).first()
-        user = token_record.user
+    """Rotate refresh token and issue a new access token."""
+    if not refresh_token:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid refresh token"
+        )
 
-        # Create new tokens
-        tokens = UserService.create_user_token(db, user)
+    try:
+        tokens = TokenService.rotate_refresh_token(refresh_token, db)
 
         # Set new refresh token cookie
         response.set_cookie(
@@ -176,6 +167,8 @@ async def refresh_token(
             "token_type": "bearer"
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Token refresh error: {str(e)}")
         raise HTTPException(
@@ -183,6 +176,34 @@ async def refresh_token(
             detail="Token refresh failed"
         )
     
+@router.get("/sessions", response_model=List[SessionResponse])
+async def list_sessions(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """List active sessions of the current user."""
+    return TokenService.list_active_sessions(current_user.id, db)
+
+@router.delete("/sessions/{session_id}")
+async def revoke_session(
+    session_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, str]:
+    """Revoke one session of the current user."""
+    if not TokenService.revoke_session(current_user.id, session_id, db):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"message": "Session revoked"}
+
+@router.delete("/sessions")
+async def revoke_all_sessions(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Dict[str, str]:
+    """Revoke every session of the current user."""
+    await TokenService.revoke_all_user_tokens(current_user.id, db)
+    return {"message": "All sessions revoked"}
+
 async def verify_token(request: Request):
     """Verify access token in request."""
     if request.url.path in ["/api/v1/auth/login", "/api/v1/auth/signup"]:
@@ -0,0 +1,131 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Any, Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_admin_user
+from app.core.config import get_settings
+from app.core.database import engine, get_db, replica_engine, replica_router, shard_router
+from app.core.pool import get_pool_stats
+from app.middleware.admission import admission_controller
+from app.models.user import User
+from app.services.memory_service import KEY_TYPES, memory_diagnostics
+from app.core.logging import setup_logger
+
+router = APIRouter()
+logger = setup_logger(__name__)
+settings = get_settings()
+
+KEY_TYPE_PATTERN = f"^({'|'.join(KEY_TYPES)})$"
+
+@router.get("/memory")
+async def memory_status(
+    current_user: User = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Get memory tracing status."""
+    return memory_diagnostics.status()
+
+@router.post("/memory/start")
+async def start_memory_tracing(
+    frames: Optional[int] = Query(None, ge=1, le=100),
+    current_user: User = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Start tracemalloc allocation tracing."""
+    logger.info(f"Memory tracing started by {current_user.email}")
+    return memory_diagnostics.start(frames)
+
+@router.post("/memory/stop")
+async def stop_memory_tracing(
+    current_user: User = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Stop tracemalloc tracing and drop snapshots."""
+    logger.info(f"Memory tracing stopped by {current_user.email}")
+    return memory_diagnostics.stop()
+
+@router.post("/memory/snapshots", status_code=status.HTTP_201_CREATED)
+async def take_memory_snapshot(
+    current_user: User = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Take a tracemalloc snapshot for later comparison."""
+    try:
+        return memory_diagnostics.take_snapshot()
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+@router.get("/memory/top")
+async def top_allocations(
+    limit: int = Query(10, ge=1, le=100),
+    key_type: str = Query("lineno", pattern=KEY_TYPE_PATTERN),
+    snapshot_id: Optional[str] = None,
+    current_user: User = Depends(get_current_admin_user)
+) -> List[Dict[str, Any]]:
+    """Get top allocation sites from a stored or fresh snapshot."""
+    try:
+        return memory_diagnostics.top(limit, key_type, snapshot_id)
+    except (RuntimeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+
+@router.get("/memory/diff")
+async def diff_allocations(
+    from_snapshot: str,
+    to_snapshot: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    key_type: str = Query("lineno", pattern=KEY_TYPE_PATTERN),
+    current_user: User = Depends(get_current_admin_user)
+) -> List[Dict[str, Any]]:
+    """
+    Compare two snapshots, or a snapshot against the current heap.
+
+    Snapshots are per worker process; one taken by another worker gets 409.
+    """
+    try:
+        return memory_diagnostics.diff(from_snapshot, to_snapshot, limit, key_type)
+    except (RuntimeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+
+@router.get("/objects")
+async def object_counts(
+    current_user: User = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Count live ORM instances and rate limiter buckets."""
+    return memory_diagnostics.object_counts()
+
+@router.get("/pool")
+def pool_statistics(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """
+    Get live connection pool statistics for this worker.
+
+    On Postgres the server's connection limit and current usage are
+    included, so per-worker pool sizes can be checked against them.
+    """
+    result = get_pool_stats(engine, settings.DB_POOL_MODE)
+    if engine.dialect.name == "postgresql":
+        result["server"] = {
+            "max_connections": int(db.execute(text("SHOW max_connections")).scalar()),
+            "connections": db.execute(text(
+                "SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()"
+            )).scalar()
+        }
+    if replica_engine is not None:
+        result["replica"] = get_pool_stats(replica_engine, settings.DB_POOL_MODE)
+        result["replica"]["lag_seconds"] = replica_router.monitor.lag_seconds
+    if shard_router is not None:
+        result["shards"] = {
+            name: get_pool_stats(shard_engine, settings.DB_POOL_MODE)
+            for name, shard_engine in shard_router.engines.items()
+        }
+    return result
+
+@router.get("/admission")
+async def admission_statistics(
+    current_user: User = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Get admission control state per route class for this worker."""
+    return admission_controller.stats()
@@ -1,14 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.datastructures import UploadFile
+from typing import Any, Dict, List, Optional
 import os
+import uuid
 from datetime import datetime
 
-from app.api.deps import get_current_active_user, get_db
+from app.api.deps import get_current_active_user, get_db, get_read_db
 from app.models.user import User
-from app.models.todo import Task, TaskAttachment
-from app.schemas.todo import TaskCreate, TaskUpdate, TaskResponse
+from app.models.todo import Task, TaskAttachment, TaskTombstone
+from app.schemas.todo import TaskChangesResponse, TaskCreate, TaskUpdate, TaskResponse
+from app.services.export_service import EXPORT_MEDIA_TYPES, ExportService
+from app.services.file_purge_service import FilePurgeService
+from app.services.import_service import IMPORT_MEDIA_TYPES, ImportJob
+from app.services.storage_service import StorageService, quota_exceeded
+from app.services.sync_service import SyncService
+from app.services.thumbnail_service import thumbnail_pipeline
+from app.utils.thumbnails import THUMBNAIL_MEDIA_TYPE
+from app.core.change_feed import change_feed, event_stream
+from app.core.database import shard_router
 from app.core.config import get_settings
 from app.core.logging import setup_logger
 
@@ -16,9 +29,155 @@ router = APIRouter()
 logger = setup_logger(__name__)
 settings = get_settings()
 
-UPLOAD_DIR = "uploads"
+UPLOAD_DIR = settings.UPLOAD_DIR
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+EXPORT_FORMAT_PATTERN = f"^({'|'.join(EXPORT_MEDIA_TYPES)})$"
+IMPORT_FORMAT_PATTERN = f"^({'|'.join(IMPORT_MEDIA_TYPES)})$"
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Documents the multipart body that add_attachment parses itself
+ATTACHMENT_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "required": ["file"],
+                "properties": {"file": {"type": "string", "format": "binary"}}
+            }
+        }
+    }
+}
+
+def task_event_data(task: Task) -> Dict[str, Any]:
+    """Task fields sent with change events."""
+    return {
+        "id": task.id,
+        "title": task.title,
+        "description": task.description,
+        "due_date": task.due_date.isoformat() if task.due_date else None,
+        "is_completed": task.is_completed,
+        "completed_at": task.completed_at.isoformat() if task.completed_at else None
+    }
+
+@router.get("/events")
+async def task_events(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Stream changes to the user's tasks as Server-Sent Events.
+
+    Events are task.created, task.updated, task.deleted, tasks.imported and
+    reset; after a reset the client should refetch its tasks.
+    """
+    if not settings.CHANGE_FEED_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    # The stream can stay open for hours, so give back the connection the
+    # authentication used instead of holding it until the client leaves
+    user_id = current_user.id
+    db.close()
+
+    subscription = change_feed.subscribe(user_id)
+
+    async def stream():
+        try:
+            async for frame in event_stream(
+                subscription,
+                request.is_disconnected,
+                settings.CHANGE_FEED_HEARTBEAT_SECONDS
+            ):
+                yield frame
+        finally:
+            change_feed.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/export")
+async def export_tasks(
+    export_format: str = Query("ndjson", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Stream all of the user's tasks and attachment metadata as NDJSON or CSV."""
+    # The export reads with its own sessions; don't hold this one while it streams
+    user_id = current_user.id
+    db.close()
+    filename = f"tasks-{datetime.utcnow():%Y%m%d}.{export_format}"
+    return StreamingResponse(
+        ExportService.stream_export(export_format, user_id),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/changes", response_model=TaskChangesResponse)
+async def get_task_changes(
+    since: Optional[str] = Query(None, description="Cursor from the previous response"),
+    limit: int = Query(500, ge=1),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get tasks changed and deleted since a cursor, for offline-first clients.
+
+    Call without a cursor for a full sync, then keep passing the returned
+    cursor; repeat immediately while has_more is true. A 410 response means
+    the cursor is too old and the client must do a full sync.
+    """
+    # Read from the primary: replica lag could let a cursor skip over changes
+    return SyncService.get_changes(
+        db,
+        current_user.id,
+        since,
+        min(limit, settings.SYNC_MAX_PAGE_SIZE)
+    )
+
+@router.post("/import")
+async def import_tasks(
+    request: Request,
+    import_format: str = Query("ndjson", alias="format", pattern=IMPORT_FORMAT_PATTERN),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Bulk import tasks from a CSV or NDJSON request body.
+
+    The body is parsed as it streams in and loaded in batches within one
+    transaction; invalid rows are skipped and reported. Unlike create_task,
+    imports are not subject to the per-user task limit.
+    """
+    job = ImportJob(
+        db,
+        current_user.id,
+        import_format,
+        batch_size=settings.IMPORT_BATCH_SIZE,
+        max_errors=settings.IMPORT_MAX_ERRORS,
+        max_rows=settings.IMPORT_MAX_ROWS
+    )
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                await run_in_threadpool(job.feed, chunk)
+        return await run_in_threadpool(
+            job.finish,
+            lambda count: change_feed.publish(db, current_user.id, "tasks.imported", {"count": count})
+        )
+    except ValueError as e:
+        # Malformed input (including bad JSON or encoding) aborts the whole import
+        await run_in_threadpool(job.abort)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception:
+        await run_in_threadpool(job.abort)
+        raise
+
 @router.post("/", response_model=TaskResponse)
 async def create_task(
     task_in: TaskCreate,
@@ -35,6 +194,8 @@ async def create_task(
     
     task = Task(**task_in.dict(), user_id=current_user.id)
     db.add(task)
+    db.flush()
+    change_feed.publish(db, current_user.id, "task.created", task_event_data(task))
     db.commit()
     db.refresh(task)
     return task
@@ -58,22 +219,36 @@ async def update_task(
     update_data = task_in.dict(exclude_unset=True)
     if task_in.is_completed and not task.is_completed:
         update_data["completed_at"] = datetime.utcnow()
+    if "due_date" in update_data and update_data["due_date"] != task.due_date:
+        # A new due date gets its own reminder
+        update_data["reminder_sent_at"] = None
     
     for field, value in update_data.items():
         setattr(task, field, value)
     
+    change_feed.publish(db, current_user.id, "task.updated", task_event_data(task))
     db.commit()
     db.refresh(task)
     return task
 
-@router.post("/{task_id}/attachments")
+@router.post(
+    "/{task_id}/attachments",
+    openapi_extra={"requestBody": ATTACHMENT_REQUEST_BODY}
+)
 async def add_attachment(
     task_id: int,
-    file: UploadFile = File(...),
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Add file attachment to task."""
+    """
+    Add file attachment to task.
+
+    The file counts against the user's storage quota. The multipart body is
+    parsed here rather than by a File parameter so that a Content-Length
+    that cannot fit is refused before the body is read, and reading stops
+    as soon as the body outgrows the remaining quota.
+    """
     task = db.query(Task).filter(
         Task.id == task_id,
         Task.user_id == current_user.id
@@ -82,27 +257,72 @@ async def add_attachment(
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    file_path = os.path.join(UPLOAD_DIR, f"{task_id}_{file.filename}")
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    remaining = StorageService.remaining(current_user)
+    StorageService.check_content_length(request, remaining)
+    form = await StorageService.limit_body(request, remaining).form(max_files=1)
+    try:
+        file = form.get("file")
+        if not isinstance(file, UploadFile):
+            raise HTTPException(status_code=422, detail="A file is required")
+        
+        shard = shard_router.shard_for(current_user.id) if shard_router is not None else None
+        file_path = StorageService.attachment_path(UPLOAD_DIR, shard, task_id, file.filename)
+        # Written beside the target first, so a rejected upload never truncates an existing file
+        partial_path = f"{file_path}.{uuid.uuid4().hex}.part"
+        size = 0
+        try:
+            with open(partial_path, "wb") as f:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > remaining:
+                        raise quota_exceeded()
+                    f.write(chunk)
+            # Concurrent uploads may have used the space in the meantime
+            if not StorageService.reserve(db, current_user, size):
+                raise quota_exceeded()
+            os.replace(partial_path, file_path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+    finally:
+        await form.close()
     
+    make_thumbnail = (
+        settings.THUMBNAILS_ENABLED
+        and thumbnail_pipeline.supports(file.content_type)
+        and thumbnail_pipeline.has_capacity()
+    )
     attachment = TaskAttachment(
         filename=file.filename,
         file_path=file_path,
         content_type=file.content_type,
+        size_bytes=size,
+        thumbnail_status="pending" if make_thumbnail else None,
         task_id=task_id
     )
     
     db.add(attachment)
+    # Attachments are part of the task as clients sync it
+    task.updated_at = datetime.utcnow()
+    db.flush()
+    change_feed.publish(
+        db,
+        current_user.id,
+        "task.updated",
+        {**task_event_data(task), "attachment": {"id": attachment.id, "filename": attachment.filename}}
+    )
     db.commit()
-    return {"filename": file.filename}
+    if make_thumbnail:
+        # Rendered in a worker process once the response is on its way
+        thumbnail_pipeline.submit(attachment.id, file_path, file.content_type, current_user.id)
+    return {"id": attachment.id, "filename": file.filename}
 
 @router.get("/{task_id}/attachments/{attachment_id}")
 async def download_attachment(
     task_id: int,
     attachment_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Download task attachment."""
@@ -121,21 +341,66 @@ async def download_attachment(
         media_type=attachment.content_type
     )
 
-@router.delete("/{task_id}")
-async def delete_task(
+@router.get("/{task_id}/attachments/{attachment_id}/thumbnail")
+async def download_thumbnail(
     task_id: int,
-    db: Session = Depends(get_db),
+    attachment_id: int,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Delete a task."""
-    task = db.query(Task).filter(
+    """Download the JPEG thumbnail of an image or PDF attachment."""
+    attachment = db.query(TaskAttachment).join(Task).filter(
+        TaskAttachment.id == attachment_id,
         Task.id == task_id,
         Task.user_id == current_user.id
     ).first()
     
-    if not task:
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    
+    if attachment.thumbnail_status == "pending":
+        raise HTTPException(
+            status_code=404,
+            detail="Thumbnail not ready",
+            headers={"Retry-After": "2"}
+        )
+    if attachment.thumbnail_status != "ready":
+        raise HTTPException(status_code=404, detail="No thumbnail for this attachment")
+    
+    # Attachments never change, so neither does their thumbnail
+    return FileResponse(
+        attachment.thumbnail_path,
+        media_type=THUMBNAIL_MEDIA_TYPE,
+        headers={"Cache-Control": f"private, max-age={settings.THUMBNAIL_CACHE_MAX_AGE}, immutable"}
+    )
+
+@router.delete("/{task_id}")
+async def delete_task(
+    task_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Delete a task.
+
+    Rows are removed with bulk statements instead of loading the task and
+    its attachments through the ORM cascade; attachment files are queued
+    and removed from disk by the background purger.
+    """
+    exists = db.scalar(
+        select(Task.id).where(Task.id == task_id, Task.user_id == current_user.id)
+    )
+    
+    if not exists:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    db.delete(task)
+    # Queue the files before their rows go, then delete the attachment rows
+    # and release exactly what was deleted; the database cascade would
+    # take them without adjusting the quota
+    FilePurgeService.enqueue_task_files(db, task_id)
+    StorageService.release_task(db, current_user.id, task_id)
+    db.execute(delete(Task).where(Task.id == task_id))
+    db.add(TaskTombstone(task_id=task_id, user_id=current_user.id))
+    change_feed.publish(db, current_user.id, "task.deleted", {"id": task_id})
     db.commit()
     return {"message": "Task deleted"}
\ No newline at end of file
@@ -0,0 +1,236 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from app.core.database import SessionLocal, engine
+from app.core.config import get_settings
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+# NOTIFY payloads must stay under 8000 bytes
+MAX_PAYLOAD_BYTES = 7900
+
+class Subscription:
+    """One client connection's bounded queue of events."""
+
+    def __init__(self, user_id: int, queue_size: int) -> None:
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def put(self, message: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A client this far behind has to refetch anyway, replace the backlog with a reset
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"event": "reset", "data": {}})
+
+class ChangeFeed:
+    """
+    Per-user task change notifications fanned out to streaming clients.
+
+    Writes call publish() inside their transaction. On Postgres that issues
+    a pg_notify, which is delivered only if the transaction commits; each
+    worker holds one dedicated LISTEN connection, watched by the event loop,
+    and fans notifications out to its local subscribers. Other databases
+    are treated as single-process: events are kept on the session and
+    delivered locally after commit.
+    """
+
+    def __init__(self, channel: str, queue_size: int) -> None:
+        self.channel = channel
+        self.queue_size = queue_size
+        self.subscribers: Dict[int, Set[Subscription]] = {}
+        self.delivered = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listen_engine = None
+        self._listen_conn = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    @property
+    def uses_notify(self) -> bool:
+        return engine.dialect.name == "postgresql"
+
+    def publish(self, db: Session, user_id: int, event_type: str, data: Dict[str, Any]) -> None:
+        """
+        Queue a change event for delivery when the session commits.
+
+        Args:
+            db: Session of the write transaction
+            user_id: Owner of the changed task
+            event_type: Event name, e.g. task.created
+            data: JSON-serializable event data
+        """
+        message = {"user_id": user_id, "event": event_type, "data": data}
+        if not self.uses_notify:
+            db.info.setdefault("change_events", []).append(message)
+            return
+
+        payload = json.dumps(message, separators=(",", ":"), default=str)
+        if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+            # Too large to notify, send the id only and let the client refetch
+            message["data"] = {"id": data.get("id")}
+            payload = json.dumps(message, separators=(",", ":"), default=str)
+        db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": self.channel, "payload": payload}
+        )
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id, self.queue_size)
+        self.subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self.subscribers.get(subscription.user_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self.subscribers[subscription.user_id]
+
+    def dispatch(self, message: Dict[str, Any]) -> None:
+        """Deliver an event to the user's subscribers; must run on the event loop."""
+        for subscription in list(self.subscribers.get(message["user_id"], ())):
+            subscription.put({"event": message["event"], "data": message["data"]})
+            self.delivered += 1
+
+    def deliver_local(self, messages: List[Dict[str, Any]]) -> None:
+        """Deliver committed events from any thread."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        for message in messages:
+            self._loop.call_soon_threadsafe(self.dispatch, message)
+
+    async def start(self) -> None:
+        """Bind to the running event loop and, on Postgres, start listening."""
+        self._loop = asyncio.get_running_loop()
+        if self.uses_notify:
+            await asyncio.to_thread(self._listen)
+
+    async def stop(self) -> None:
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        self._close_listener()
+        self._loop = None
+
+    def _listen(self) -> None:
+        if self._listen_engine is None:
+            # Dedicated, unpooled connection so listening never holds a request slot
+            self._listen_engine = create_engine(
+                engine.url,
+                poolclass=NullPool,
+                isolation_level="AUTOCOMMIT"
+            )
+        conn = self._listen_engine.raw_connection()
+        driver_conn = conn.driver_connection
+        cursor = driver_conn.cursor()
+        cursor.execute(f'LISTEN "{self.channel}"')
+        cursor.close()
+        self._listen_conn = conn
+        self._loop.call_soon_threadsafe(self._loop.add_reader, driver_conn.fileno(), self._on_readable)
+        logger.info(f"Listening for task changes on {self.channel}")
+
+    def _on_readable(self) -> None:
+        driver_conn = self._listen_conn.driver_connection
+        try:
+            driver_conn.poll()
+        except Exception as e:
+            logger.warning(f"Change feed listener connection lost: {str(e)}")
+            self._close_listener()
+            self._reconnect_task = self._loop.create_task(self._reconnect())
+            return
+
+        while driver_conn.notifies:
+            notify = driver_conn.notifies.pop(0)
+            try:
+                self.dispatch(json.loads(notify.payload))
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Ignoring malformed change notification: {str(e)}")
+
+    async def _reconnect(self) -> None:
+        # Tell clients they may miss events while disconnected
+        for subscriptions in list(self.subscribers.values()):
+            for subscription in subscriptions:
+                subscription.put({"event": "reset", "data": {}})
+
+        delay = 1.0
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await asyncio.to_thread(self._listen)
+                return
+            except Exception as e:
+                logger.error(f"Change feed reconnect failed: {str(e)}")
+                delay = min(delay * 2, 30.0)
+
+    def _close_listener(self) -> None:
+        if self._listen_conn is None:
+            return
+        try:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.remove_reader(self._listen_conn.driver_connection.fileno())
+        except Exception:
+            pass
+        try:
+            self._listen_conn.close()
+        except Exception as e:
+            logger.warning(f"Error closing change feed listener: {str(e)}")
+        finally:
+            self._listen_conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "channel": self.channel,
+            "listening": self._listen_conn is not None,
+            "users": len(self.subscribers),
+            "connections": sum(len(s) for s in self.subscribers.values()),
+            "delivered": self.delivered
+        }
+
+async def event_stream(
+    subscription: Subscription,
+    is_disconnected: Callable[[], Awaitable[bool]],
+    heartbeat_seconds: float
+) -> AsyncIterator[str]:
+    """
+    Render a subscription as Server-Sent Events.
+
+    Args:
+        subscription: Subscription to read from
+        is_disconnected: Returns True once the client has gone away
+        heartbeat_seconds: Idle time after which a comment keeps proxies from
+            closing the connection
+
+    Yields:
+        str: SSE frames
+    """
+    yield "retry: 3000\n\n"
+    while not await is_disconnected():
+        try:
+            message = await asyncio.wait_for(subscription.queue.get(), heartbeat_seconds)
+        except asyncio.TimeoutError:
+            yield ": keepalive\n\n"
+            continue
+        data = json.dumps(message["data"], separators=(",", ":"), default=str)
+        yield f"event: {message['event']}\ndata: {data}\n\n"
+
+@event.listens_for(SessionLocal, "after_commit")
+def _deliver_committed_events(session: Session) -> None:
+    messages = session.info.pop("change_events", None)
+    if messages:
+        change_feed.deliver_local(messages)
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _discard_rolled_back_events(session: Session, previous_transaction: Any) -> None:
+    session.info.pop("change_events", None)
+
+change_feed = ChangeFeed(
+    channel=settings.CHANGE_FEED_CHANNEL,
+    queue_size=settings.CHANGE_FEED_QUEUE_SIZE
+)
@@ -12,6 +12,30 @@ class Settings(BaseSettings):
         API_V1_STR: API version string for URL
         SECRET_KEY: Secret key for token generation
         DATABASE_URL: Database connection string
+        DB_POOL_MODE: queue (FIFO pool), lifo (reuse the most recent
+            connection, pre-warmed) or null (no pooling, e.g. behind PgBouncer)
+        DB_POOL_SIZE: Connections kept open per worker process
+        DB_MAX_OVERFLOW: Extra connections per worker under load
+        DB_POOL_TIMEOUT: Seconds to wait for a free pooled connection
+        DB_POOL_WARM_SIZE: Connections opened at startup, capped at pool size;
+            0 warms the whole pool in lifo mode and nothing otherwise
+        DATABASE_REPLICA_URL: Read replica connection string
+        DB_REPLICA_HOST: Read replica host, used with the DB_* credentials
+            when DATABASE_REPLICA_URL is not set
+        REPLICA_MAX_LAG_SECONDS: Replication lag above which reads fall back
+            to the primary
+        REPLICA_LAG_CHECK_SECONDS: How often replica lag is measured
+        REPLICA_STICKY_SECONDS: How long a user's reads stay on the primary
+            after they write
+        SHARDS: Shard map from shard name to connection string; tasks and
+            their attachments live on the shard their owner hashes to. Empty
+            keeps everything on the primary
+        SHARD_VIRTUAL_NODES: Points per shard on the consistent hash ring
+        LAMBDA_DB_POOL: Lambda pool, single connection reused across
+            invocations or null for a connection per request
+        LAMBDA_DB_POOL_RECYCLE: Seconds before a Lambda connection is recycled
+        STARTUP_SCHEMA_MODE: create_all creates missing tables, check only
+            compares the alembic revision stamp, skip does neither
         EMAIL_TEMPLATES_DIR: Directory containing email templates
         EMAILS_FROM_EMAIL: Default sender email address
         EMAILS_FROM_NAME: Default sender name
@@ -23,6 +47,99 @@ class Settings(BaseSettings):
         SMTP_USER: SMTP user
         SMTP_PASSWORD: SMTP password
         RATE_LIMIT_PER_MINUTE: Default rate limit per minute
+        RATE_LIMIT_BACKEND: memory (per worker process) or shm (a memory-mapped
+            table shared by all workers on the host)
+        RATE_LIMIT_SHM_PATH: File backing the shm table, defaults to /dev/shm
+        RATE_LIMIT_SHM_SLOTS: Number of client/path counters in the shm table
+        RATE_LIMIT_SHM_STRIPES: Number of locks guarding the shm table
+        IDEMPOTENCY_ENABLED: Replay stored responses to POSTs retried with
+            the same Idempotency-Key
+        IDEMPOTENCY_BACKEND: database (shared by all workers) or memory (per
+            worker process)
+        IDEMPOTENCY_TTL_SECONDS: How long a response is kept for replay
+        IDEMPOTENCY_LOCK_SECONDS: How long a running request holds its key
+            before a retry may run it again
+        IDEMPOTENCY_MAX_KEYS: Keys kept by the memory backend
+        IDEMPOTENCY_MAX_RESPONSE_BYTES: Largest response stored for replay
+        IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS: Interval between deletions of
+            expired keys from the database backend
+        IDEMPOTENCY_CLEANUP_BATCH_SIZE: Keys deleted per cleanup statement
+        PASSWORD_HASH_ALGORITHM: bcrypt or argon2id for new password hashes;
+            hashes made otherwise or with a lower cost are replaced on the
+            user's next login
+        PASSWORD_HASH_TARGET_MS: If set, hashing time the work factor is
+            raised towards at startup; 0 keeps the configured work factor
+        PASSWORD_BCRYPT_ROUNDS: Minimum bcrypt cost
+        PASSWORD_ARGON2_TIME_COST: Minimum argon2id passes
+        PASSWORD_ARGON2_MEMORY_KIB: argon2id memory per hash, in KiB
+        PASSWORD_ARGON2_PARALLELISM: argon2id lanes per hash
+        REFRESH_TOKEN_REUSE_GRACE_SECONDS: Window in which reusing a rotated
+            refresh token counts as a concurrent retry rather than theft
+        ADMISSION_CONTROL_ENABLED: Cap in-flight requests per route class and
+            shed load with 503 when queueing time passes the target
+        ADMISSION_AUTH_CONCURRENCY: In-flight auth requests per worker
+        ADMISSION_TASKS_CONCURRENCY: In-flight task requests per worker
+        ADMISSION_ATTACHMENTS_CONCURRENCY: In-flight attachment requests per worker
+        ADMISSION_BULK_CONCURRENCY: In-flight task exports and imports per
+            worker, the admin export included
+        ADMISSION_QUEUE_FACTOR: Queue length per route class, as a multiple
+            of its concurrency
+        ADMISSION_QUEUE_TARGET_MS: Average queueing time above which requests
+            that would queue are rejected
+        ADMISSION_MAX_WAIT_MS: Longest a single request waits for a slot
+        COMPRESSION_ENABLED: Compress JSON, NDJSON and CSV responses with the
+            best coding the client accepts (zstd, br or gzip)
+        COMPRESSION_MIN_SIZE: Smallest complete response body compressed, in bytes
+        CHANGE_FEED_ENABLED: Serve the task change stream
+        CHANGE_FEED_CHANNEL: Postgres NOTIFY channel for task changes
+        CHANGE_FEED_QUEUE_SIZE: Events buffered per client before it is reset
+        CHANGE_FEED_HEARTBEAT_SECONDS: Idle time between keepalive comments
+        SYNC_MAX_PAGE_SIZE: Most changes returned per delta sync call
+        SYNC_COMMIT_GRACE_SECONDS: Changes younger than this are left for the
+            next sync call, so in-flight transactions are not skipped
+        SYNC_TOMBSTONE_RETENTION_DAYS: How long deleted tasks are remembered;
+            older sync cursors require a full sync
+        TOMBSTONE_CLEANUP_INTERVAL_SECONDS: Interval between tombstone cleanups
+        TOMBSTONE_CLEANUP_BATCH_SIZE: Tombstones deleted per cleanup statement
+        UPLOAD_DIR: Directory attachment files are stored in
+        FILE_PURGE_INTERVAL_SECONDS: Interval between purges of deleted
+            attachment files
+        FILE_PURGE_BATCH_SIZE: Files handled per purge transaction
+        ORPHAN_RECONCILE_INTERVAL_SECONDS: Interval between scans of the upload
+            directory for files no attachment references
+        ORPHAN_FILE_MIN_AGE_SECONDS: Files younger than this are never treated
+            as orphans, so uploads in progress are safe
+        THUMBNAILS_ENABLED: Generate thumbnails for image and PDF attachments
+        THUMBNAIL_WORKERS: Worker processes rendering thumbnails, the cap on
+            concurrent jobs
+        THUMBNAIL_MAX_PENDING: Thumbnail jobs queued per server process
+        THUMBNAIL_MAX_SIZE: Longest side of a thumbnail in pixels
+        THUMBNAIL_MAX_PIXELS: Largest source image decoded
+        THUMBNAIL_MEMORY_LIMIT_MB: Address space limit of each worker process
+        THUMBNAIL_CACHE_MAX_AGE: Cache-Control max-age of thumbnail downloads
+        STORAGE_QUOTA_BYTES: Attachment storage per user, unless overridden
+            on the user
+        IMPORT_BATCH_SIZE: Rows validated and loaded per batch by task imports
+        IMPORT_MAX_ROWS: Most tasks accepted by one import request
+        IMPORT_MAX_ERRORS: Rejected rows reported in detail per import
+        ENABLE_DIAGNOSTICS: Mount the admin-only diagnostics endpoints
+        MEMORY_TRACE_FRAMES: Traceback depth recorded by tracemalloc
+        MEMORY_MAX_SNAPSHOTS: Number of tracemalloc snapshots kept in memory
+        SCHEDULER_ENABLED: Run periodic background jobs in this process
+        SCHEDULER_LOCK_ID: Postgres advisory lock key used for leader election
+        SCHEDULER_TICK_SECONDS: How often the scheduler checks for due jobs
+        REMINDERS_ENABLED: Send due-date reminder emails from the scheduler
+        REMINDER_LEAD_MINUTES: How long before the due date reminders are sent
+        REMINDER_INTERVAL_SECONDS: Interval between reminder runs
+        REMINDER_SCAN_INTERVAL_SECONDS: Interval between index scans for
+            upcoming reminders; each scan looks twice this far ahead
+        REMINDER_MAX_LATE_MINUTES: Reminders later than this are dropped, e.g.
+            after downtime or for tasks created already overdue
+        REMINDER_BATCH_SIZE: Reminders claimed per UPDATE
+        REMINDER_QUEUE_MAX: Most reminders held in memory per scan
+        REMINDER_SEND_CONCURRENCY: Reminder emails sent concurrently
+        TOKEN_CLEANUP_INTERVAL_SECONDS: Interval between expired token cleanups
+        TOKEN_CLEANUP_BATCH_SIZE: Rows deleted per cleanup statement
     """
     
     PROJECT_NAME: str = "FastAPI Todo App"
@@ -44,7 +161,23 @@ class Settings(BaseSettings):
     DB_POOL_SIZE: int = 5
     DB_MAX_OVERFLOW: int = 10
     DB_POOL_TIMEOUT: int = 30
+    DB_POOL_MODE: str = "queue"
     DATABASE_URL: Optional[str] = None
+    DB_POOL_WARM_SIZE: int = 0
+    
+    # Read replica, reads fall back to the primary when it lags
+    DATABASE_REPLICA_URL: Optional[str] = None
+    DB_REPLICA_HOST: Optional[str] = None
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_SECONDS: float = 5.0
+    REPLICA_STICKY_SECONDS: float = 10.0
+    
+    # Task shards, chosen by user_id on a consistent hash ring
+    SHARDS: Dict[str, str] = {}
+    SHARD_VIRTUAL_NODES: int = 100
+    
+    # Startup: create_all, check (alembic stamp only) or skip
+    STARTUP_SCHEMA_MODE: str = "create_all"
     
     # Email settings
     EMAILS_FROM_EMAIL: str
@@ -59,11 +192,85 @@ class Settings(BaseSettings):
     
     # Rate limiting
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_SHM_PATH: Optional[str] = None
+    RATE_LIMIT_SHM_SLOTS: int = 65536
+    RATE_LIMIT_SHM_STRIPES: int = 64
+    
+    # Idempotency keys
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_BACKEND: str = "database"
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_LOCK_SECONDS: int = 60
+    IDEMPOTENCY_MAX_KEYS: int = 10000
+    IDEMPOTENCY_MAX_RESPONSE_BYTES: int = 65536
+    IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS: int = 3600
+    IDEMPOTENCY_CLEANUP_BATCH_SIZE: int = 1000
+    
+    # Password hashing
+    PASSWORD_HASH_ALGORITHM: str = "bcrypt"
+    PASSWORD_HASH_TARGET_MS: float = 0.0
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_ARGON2_TIME_COST: int = 3
+    PASSWORD_ARGON2_MEMORY_KIB: int = 65536
+    PASSWORD_ARGON2_PARALLELISM: int = 1
+    
+    # Admission control
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_AUTH_CONCURRENCY: int = 8
+    ADMISSION_TASKS_CONCURRENCY: int = 32
+    ADMISSION_ATTACHMENTS_CONCURRENCY: int = 8
+    ADMISSION_BULK_CONCURRENCY: int = 2
+    ADMISSION_QUEUE_FACTOR: int = 4
+    ADMISSION_QUEUE_TARGET_MS: float = 100.0
+    ADMISSION_MAX_WAIT_MS: float = 1000.0
+    
+    # Response compression
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 500
+
+    # Task change feed
+    CHANGE_FEED_ENABLED: bool = True
+    CHANGE_FEED_CHANNEL: str = "task_changes"
+    CHANGE_FEED_QUEUE_SIZE: int = 100
+    CHANGE_FEED_HEARTBEAT_SECONDS: float = 15.0
+
+    # Delta sync
+    SYNC_MAX_PAGE_SIZE: int = 1000
+    SYNC_COMMIT_GRACE_SECONDS: float = 2.0
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+    TOMBSTONE_CLEANUP_INTERVAL_SECONDS: int = 3600
+    TOMBSTONE_CLEANUP_BATCH_SIZE: int = 1000
+
+    # Attachment files
+    UPLOAD_DIR: str = "uploads"
+    FILE_PURGE_INTERVAL_SECONDS: int = 60
+    FILE_PURGE_BATCH_SIZE: int = 500
+    ORPHAN_RECONCILE_INTERVAL_SECONDS: int = 86400
+    ORPHAN_FILE_MIN_AGE_SECONDS: int = 3600
+
+    # Attachment thumbnails
+    THUMBNAILS_ENABLED: bool = True
+    THUMBNAIL_WORKERS: int = 2
+    THUMBNAIL_MAX_PENDING: int = 100
+    THUMBNAIL_MAX_SIZE: int = 256
+    THUMBNAIL_MAX_PIXELS: int = 50_000_000
+    THUMBNAIL_MEMORY_LIMIT_MB: int = 512
+    THUMBNAIL_CACHE_MAX_AGE: int = 604800
+
+    # Storage quotas
+    STORAGE_QUOTA_BYTES: int = 1024 * 1024 * 1024
+
+    # Bulk task import
+    IMPORT_BATCH_SIZE: int = 5000
+    IMPORT_MAX_ROWS: int = 100_000
+    IMPORT_MAX_ERRORS: int = 100
 
     #JWT Settings
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: int = 10
 
     # Redis
     REDIS_URL: Optional[str] = None
@@ -73,9 +280,33 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: Optional[str] = None
     AWS_REGION: Optional[str] = None
     S3_BUCKET: Optional[str] = None
+    
+    # AWS Lambda database pool: single (one reused connection) or null
+    LAMBDA_DB_POOL: str = "single"
+    LAMBDA_DB_POOL_RECYCLE: int = 300
 
     # Metrics
     ENABLE_METRICS: bool = False
+
+    # Diagnostics
+    ENABLE_DIAGNOSTICS: bool = False
+    MEMORY_TRACE_FRAMES: int = 10
+    MEMORY_MAX_SNAPSHOTS: int = 5
+
+    # Background jobs
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_LOCK_ID: int = 720_301
+    SCHEDULER_TICK_SECONDS: int = 30
+    REMINDERS_ENABLED: bool = True
+    REMINDER_LEAD_MINUTES: int = 60
+    REMINDER_INTERVAL_SECONDS: int = 60
+    REMINDER_SCAN_INTERVAL_SECONDS: int = 300
+    REMINDER_MAX_LATE_MINUTES: int = 60
+    REMINDER_BATCH_SIZE: int = 500
+    REMINDER_QUEUE_MAX: int = 100_000
+    REMINDER_SEND_CONCURRENCY: int = 10
+    TOKEN_CLEANUP_INTERVAL_SECONDS: int = 3600
+    TOKEN_CLEANUP_BATCH_SIZE: int = 1000
     
     @property
     def BASE_URL(self) -> str:
@@ -1,35 +1,115 @@
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import get_settings
+from app.core.pool import get_pool_options
+from app.core.replica import ReplicaLagMonitor, ReplicaRouter, RoutingSession
+from app.core.sharding import ShardRouter
 
 settings = get_settings()
 
 # Construct Database URL
 def get_database_url():
     """Construct database URL from environment variables."""
-    try:
-        return (
-            f"postgresql+psycopg2://"
-            f"{settings.DB_USER}:{settings.DB_PASSWORD}@"
-            f"{settings.DB_HOST}:{settings.DB_PORT}/"
-            f"{settings.DB_NAME}"
-        )
-    
-    except AttributeError:
-        # Fallback to full DATABASE_URL if individual settings are not available
+    # An explicit DATABASE_URL wins, matching what alembic migrates against
+    if settings.DATABASE_URL:
         return settings.DATABASE_URL
     
+    return (
+        f"postgresql+psycopg2://"
+        f"{settings.DB_USER}:{settings.DB_PASSWORD}@"
+        f"{settings.DB_HOST}:{settings.DB_PORT}/"
+        f"{settings.DB_NAME}"
+    )
     
-engine = create_engine(
-    get_database_url(),
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-    echo=False
-)
+    
+def get_replica_url():
+    """Construct the read replica URL, if one is configured."""
+    if settings.DATABASE_REPLICA_URL:
+        return settings.DATABASE_REPLICA_URL
+    if not settings.DB_REPLICA_HOST:
+        return None
+    
+    return (
+        f"postgresql+psycopg2://"
+        f"{settings.DB_USER}:{settings.DB_PASSWORD}@"
+        f"{settings.DB_REPLICA_HOST}:{settings.DB_PORT}/"
+        f"{settings.DB_NAME}"
+    )
+
+def create_db_engine(url: str):
+    """Create an engine with the configured pool for a database URL."""
+    if url.startswith("sqlite"):
+        # Sessions are opened in the threadpool and used on the event loop
+        return create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            echo=False
+        )
+    
+    return create_engine(
+        url,
+        echo=False,
+        **get_pool_options(
+            settings.DB_POOL_MODE,
+            settings.DB_POOL_SIZE,
+            settings.DB_MAX_OVERFLOW,
+            settings.DB_POOL_TIMEOUT
+        )
+    )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+database_url = get_database_url()
+engine = create_db_engine(database_url)
+
+# Optional read replica, used only by sessions marked read-only
+replica_url = get_replica_url()
+replica_engine = create_db_engine(replica_url) if replica_url else None
+replica_router = None
+if replica_engine is not None:
+    replica_router = ReplicaRouter(
+        replica_engine,
+        ReplicaLagMonitor(
+            replica_engine,
+            settings.REPLICA_MAX_LAG_SECONDS,
+            settings.REPLICA_LAG_CHECK_SECONDS
+        ),
+        settings.REPLICA_STICKY_SECONDS
+    )
+
+# Optional task shards; a shard at the primary's URL shares its engine
+shard_router = None
+if settings.SHARDS:
+    shard_router = ShardRouter(
+        {
+            name: engine if url == database_url else create_db_engine(url)
+            for name, url in settings.SHARDS.items()
+        },
+        settings.SHARD_VIRTUAL_NODES
+    )
+
+def shard_names() -> List[Optional[str]]:
+    """Get the shard names, or [None] when tasks live on the primary."""
+    return shard_router.names if shard_router is not None else [None]
+
+@contextmanager
+def use_shard(db: Session, shard: Optional[str]) -> Iterator[Session]:
+    """Point a session's task statements at one shard for the enclosed block."""
+    previous = db.info.get("shard")
+    db.info["shard"] = shard
+    try:
+        yield db
+    finally:
+        db.info["shard"] = previous
+
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=RoutingSession,
+    info={"replica_router": replica_router, "shard_router": shard_router}
+)
 
 Base = declarative_base()
 
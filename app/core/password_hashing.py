@@ -0,0 +1,163 @@
+import math
+import time
+from typing import Any, Dict, Optional
+import bcrypt
+from app.core.config import get_settings
+from app.core.logging import setup_logger
+
+# Optional algorithm, bcrypt is always available
+try:
+    import argon2
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:  # pragma: no cover
+    argon2 = None
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+ALGORITHMS = ("bcrypt", "argon2id")
+
+# Calibration times bcrypt at this cost and never goes above the maximums
+CALIBRATION_BCRYPT_ROUNDS = 10
+MAX_BCRYPT_ROUNDS = 16
+MAX_ARGON2_TIME_COST = 10
+
+class PasswordHasher:
+    """
+    Password hashing policy: the algorithm and work factor for new hashes.
+
+    Hashes are self-describing, so any bcrypt or argon2id hash verifies
+    whatever the current policy, and needs_rehash tells whether a stored
+    hash is weaker than the policy or uses the other algorithm. Callers
+    rehash on login, when the plain password is at hand, which moves users
+    to a new algorithm or higher cost without forcing resets.
+
+    calibrate() raises the work factor to what this host can do within a
+    target hashing time, never below the configured one. Hosts calibrate
+    independently and entry points such as Lambda don't calibrate at all,
+    so hashes are only ever upgraded: a hash stronger than this host's
+    policy is left alone rather than flipped back and forth.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        bcrypt_rounds: int,
+        argon2_time_cost: int,
+        argon2_memory_kib: int,
+        argon2_parallelism: int
+    ) -> None:
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown password hash algorithm: {algorithm} (expected one of {ALGORITHMS})")
+        if algorithm == "argon2id" and argon2 is None:
+            raise ValueError("argon2id password hashing requires the argon2-cffi package")
+        self.algorithm = algorithm
+        self.bcrypt_rounds = bcrypt_rounds
+        self.argon2_time_cost = argon2_time_cost
+        self.argon2_memory_kib = argon2_memory_kib
+        self.argon2_parallelism = argon2_parallelism
+
+    def _argon2(self, time_cost: Optional[int] = None) -> "argon2.PasswordHasher":
+        return argon2.PasswordHasher(
+            time_cost=time_cost or self.argon2_time_cost,
+            memory_cost=self.argon2_memory_kib,
+            parallelism=self.argon2_parallelism,
+            type=argon2.Type.ID
+        )
+
+    def hash(self, password: str) -> str:
+        if self.algorithm == "argon2id":
+            return self._argon2().hash(password)
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(self.bcrypt_rounds)).decode()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        """Verify a password against a bcrypt or argon2id hash."""
+        if hashed.startswith("$argon2"):
+            if argon2 is None:
+                logger.error("Cannot verify an argon2 hash, argon2-cffi is not installed")
+                return False
+            try:
+                # Parameters are read from the hash, not the policy
+                return argon2.PasswordHasher().verify(hashed, password)
+            except (VerificationError, InvalidHashError):
+                return False
+        return bcrypt.checkpw(password.encode(), hashed.encode())
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """
+        Check whether a stored hash is weaker than the policy or uses the
+        other algorithm.
+
+        Returns:
+            bool: True if the hash should be replaced on the next login
+        """
+        if hashed.startswith("$argon2"):
+            if self.algorithm != "argon2id":
+                return True
+            params = argon2.extract_parameters(hashed)
+            current = (params.time_cost, params.memory_cost, params.parallelism)
+            wanted = (self.argon2_time_cost, self.argon2_memory_kib, self.argon2_parallelism)
+        else:
+            if self.algorithm != "bcrypt":
+                return True
+            # $2b$12$...
+            current = (int(hashed.split("$")[2]),)
+            wanted = (self.bcrypt_rounds,)
+
+        return any(have < want for have, want in zip(current, wanted))
+
+    def calibrate(self, target_ms: float) -> Dict[str, Any]:
+        """
+        Raise the work factor to what hashes within target_ms on this host.
+
+        bcrypt cost doubles per round, so the rounds are extrapolated from
+        one timing at a low cost; argon2id cost grows linearly with the time
+        cost at the configured memory, so that is scaled from one pass. The
+        configured work factor is kept if the host is too slow for more.
+
+        Args:
+            target_ms: Hashing time to aim for
+
+        Returns:
+            Dict[str, Any]: The calibrated policy
+        """
+        if self.algorithm == "argon2id":
+            hasher = self._argon2(time_cost=1)
+            elapsed = self._measure(lambda: hasher.hash("calibration"))
+            time_cost = min(MAX_ARGON2_TIME_COST, math.floor(target_ms / elapsed))
+            self.argon2_time_cost = max(self.argon2_time_cost, time_cost)
+        else:
+            salt = bcrypt.gensalt(CALIBRATION_BCRYPT_ROUNDS)
+            elapsed = self._measure(lambda: bcrypt.hashpw(b"calibration", salt))
+            rounds = CALIBRATION_BCRYPT_ROUNDS + math.floor(math.log2(target_ms / elapsed))
+            self.bcrypt_rounds = max(self.bcrypt_rounds, min(MAX_BCRYPT_ROUNDS, rounds))
+        logger.info(f"Password hashing calibrated for {target_ms}ms: {self.policy()}")
+        return self.policy()
+
+    @staticmethod
+    def _measure(func) -> float:
+        """Best of three runs in milliseconds, the least disturbed by other load."""
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return min(timings)
+
+    def policy(self) -> Dict[str, Any]:
+        if self.algorithm == "argon2id":
+            return {
+                "algorithm": self.algorithm,
+                "time_cost": self.argon2_time_cost,
+                "memory_kib": self.argon2_memory_kib,
+                "parallelism": self.argon2_parallelism
+            }
+        return {"algorithm": self.algorithm, "rounds": self.bcrypt_rounds}
+
+password_hasher = PasswordHasher(
+    algorithm=settings.PASSWORD_HASH_ALGORITHM,
+    bcrypt_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    argon2_time_cost=settings.PASSWORD_ARGON2_TIME_COST,
+    argon2_memory_kib=settings.PASSWORD_ARGON2_MEMORY_KIB,
+    argon2_parallelism=settings.PASSWORD_ARGON2_PARALLELISM
+)
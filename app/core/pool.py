@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, Pool, QueuePool
+
+POOL_MODES = ("queue", "lifo", "null")
+
+# Recent checkout waits kept for the percentile estimate
+WAIT_SAMPLES = 1000
+
+class PoolStats:
+    """Thread-safe counters for one connection pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.peak_checked_out = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    @property
+    def checked_out(self) -> int:
+        return self.checkouts - self.checkins
+
+    def record_checkout(self, wait_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            self._waits.append(wait_ms)
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    # Pool event listeners
+    def on_checkin(self, dbapi_connection: Any, connection_record: Any) -> None:
+        self.record_checkin()
+
+    def on_connect(self, dbapi_connection: Any, connection_record: Any) -> None:
+        self.record_connect()
+
+    def wait_percentile(self, percentile: float) -> float:
+        with self._lock:
+            waits = sorted(self._waits)
+        if not waits:
+            return 0.0
+        return waits[min(len(waits) - 1, int(len(waits) * percentile))]
+
+class InstrumentedPoolMixin:
+    """
+    Records checkouts, checkins, new connections and checkout latency.
+
+    Checkins and new connections come from pool events. No event reports
+    how long a checkout waited for a free connection, so the public
+    connect() is timed instead; the latency includes opening a new
+    connection and the pre-ping when the pool needs one.
+    """
+
+    stats: PoolStats
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+        event.listen(self, "checkin", self.stats.on_checkin)
+        event.listen(self, "connect", self.stats.on_connect)
+
+    def recreate(self) -> Pool:
+        # Keep counting across dispose() and invalidation. The new pool
+        # inherits our listeners, so it drops the ones it registered itself.
+        pool = super().recreate()
+        event.remove(pool, "checkin", pool.stats.on_checkin)
+        event.remove(pool, "connect", pool.stats.on_connect)
+        pool.stats = self.stats
+        return pool
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except PoolTimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_checkout((time.perf_counter() - start) * 1000)
+        return conn
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    def __init__(self, *args: Any, max_overflow: int = 10, **kwargs: Any) -> None:
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        # QueuePool has no public accessor for it
+        self.max_overflow = max_overflow
+
+class InstrumentedNullPool(InstrumentedPoolMixin, NullPool):
+    pass
+
+def get_pool_options(
+    mode: str,
+    pool_size: int,
+    max_overflow: int,
+    pool_timeout: int
+) -> Dict[str, Any]:
+    """
+    Get create_engine pool arguments for a pool mode.
+
+    Args:
+        mode: queue (FIFO QueuePool), lifo (QueuePool reusing the most
+            recently returned connection, so surplus ones go idle and are
+            recycled) or null (no pooling, for PgBouncer transaction pooling)
+        pool_size: Connections kept open per process
+        max_overflow: Extra connections allowed under load
+        pool_timeout: Seconds to wait for a free connection
+
+    Returns:
+        Dict[str, Any]: Keyword arguments for create_engine
+
+    Raises:
+        ValueError: If mode is unknown
+    """
+    if mode == "null":
+        return {"poolclass": InstrumentedNullPool}
+    if mode not in POOL_MODES:
+        raise ValueError(f"Unknown DB_POOL_MODE: {mode} (expected one of {POOL_MODES})")
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_pre_ping": True,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_use_lifo": mode == "lifo",
+    }
+
+def get_pool_stats(engine: Engine, mode: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get live statistics for an engine's pool in this worker process.
+
+    Args:
+        engine: Engine to inspect
+        mode: Configured pool mode, reported as is
+
+    Returns:
+        Dict[str, Any]: Pool configuration, occupancy and checkout wait times
+    """
+    pool = engine.pool
+    result: Dict[str, Any] = {
+        "pid": os.getpid(),
+        "mode": mode,
+        "pool_class": type(pool).__name__,
+    }
+
+    if isinstance(pool, QueuePool):
+        size = pool.size()
+        max_overflow = getattr(pool, "max_overflow", None)
+        result.update({
+            "size": size,
+            "max_overflow": max_overflow,
+            "max_connections": size + max_overflow if max_overflow is not None else None,
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "timeout": pool.timeout(),
+        })
+
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        result.update({
+            "checked_out": stats.checked_out,
+            "peak_checked_out": stats.peak_checked_out,
+            "checkouts": stats.checkouts,
+            "connects": stats.connects,
+            "timeouts": stats.timeouts,
+            "wait_ms": {
+                "avg": round(stats.wait_total_ms / stats.checkouts, 3) if stats.checkouts else 0.0,
+                "p95": round(stats.wait_percentile(0.95), 3),
+                "max": round(stats.wait_max_ms, 3),
+            },
+        })
+    else:
+        result["status"] = pool.status()
+
+    return result
@@ -0,0 +1,159 @@
+import threading
+import time
+from typing import Dict, Optional
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.core.logging import setup_logger
+from app.core.sharding import ShardRouter, is_sharded
+
+logger = setup_logger(__name__)
+
+class ReplicaLagMonitor:
+    """
+    Tracks replication lag of a read replica.
+
+    Lag is measured on demand, at most once per check interval, by whichever
+    request routes a read first; other threads use the last measurement. A
+    failed check marks the replica unhealthy until the next successful one.
+    """
+
+    def __init__(self, engine: Engine, max_lag_seconds: float, check_interval_seconds: float) -> None:
+        self.engine = engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.lag_seconds: Optional[float] = None
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def measure(self) -> float:
+        """
+        Query the replica's replay lag.
+
+        Returns:
+            float: Seconds behind the primary, 0 when fully caught up
+        """
+        if self.engine.dialect.name != "postgresql":
+            # No replication to measure, e.g. local test databases
+            return 0.0
+
+        with self.engine.connect() as conn:
+            lag = conn.execute(text(
+                "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+            )).scalar()
+        return float(lag or 0.0)
+
+    def is_healthy(self) -> bool:
+        """
+        Check whether the replica is close enough to the primary to serve reads.
+
+        Returns:
+            bool: True if the last measured lag is within the limit
+        """
+        now = time.monotonic()
+        if now - self.checked_at >= self.check_interval_seconds and self._lock.acquire(blocking=False):
+            try:
+                self.lag_seconds = self.measure()
+            except Exception as e:
+                logger.warning(f"Replica lag check failed: {str(e)}")
+                self.lag_seconds = None
+            finally:
+                self.checked_at = now
+                self._lock.release()
+
+        return self.lag_seconds is not None and self.lag_seconds <= self.max_lag_seconds
+
+class ReplicaRouter:
+    """
+    Decides whether a read may go to the replica.
+
+    Users who committed a write recently are pinned to the primary for
+    sticky_seconds so they read their own writes. The pin is per worker
+    process; keep sticky_seconds above the lag limit.
+    """
+
+    def __init__(self, replica: Engine, monitor: ReplicaLagMonitor, sticky_seconds: float) -> None:
+        self.replica = replica
+        self.monitor = monitor
+        self.sticky_seconds = sticky_seconds
+        self._recent_writers: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def mark_write(self, user_id: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._recent_writers[user_id] = now + self.sticky_seconds
+            # Drop expired pins so the map stays bounded by recent writers
+            if len(self._recent_writers) > 10_000:
+                self._recent_writers = {
+                    uid: until for uid, until in self._recent_writers.items() if until > now
+                }
+
+    def wrote_recently(self, user_id: Optional[int]) -> bool:
+        if user_id is None:
+            return False
+        until = self._recent_writers.get(user_id)
+        return until is not None and until > time.monotonic()
+
+    def get_replica(self, user_id: Optional[int]) -> Optional[Engine]:
+        """
+        Get the replica engine for a read, if it may be used.
+
+        Args:
+            user_id: User the read is for, if known
+
+        Returns:
+            Optional[Engine]: Replica engine, or None to use the primary
+        """
+        if self.wrote_recently(user_id) or not self.monitor.is_healthy():
+            return None
+        return self.replica
+
+class RoutingSession(Session):
+    """
+    Session that can send reads to a replica and task tables to shards.
+
+    With shards configured, statements on the sharded tables go to the
+    shard of session.info["shard"] if set, else of the user in
+    session.info["user_id"]; one session may then span the primary and a
+    shard, committed one after the other. Other statements use the primary
+    unless the session is marked read-only through session.info["read_only"]
+    (see get_read_db). Even then, flushes, non-SELECT statements and
+    everything after the session's first write stay on the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        shard_router: Optional[ShardRouter] = self.info.get("shard_router")
+        if shard_router is not None and is_sharded(mapper, clause):
+            return shard_router.get_engine(self.info.get("user_id"), self.info.get("shard"))
+
+        router: Optional[ReplicaRouter] = self.info.get("replica_router")
+        if (
+            router is not None
+            and self.info.get("read_only")
+            and not self.info.get("wrote")
+            and not self._flushing
+            and getattr(clause, "is_select", False)
+        ):
+            replica = router.get_replica(self.info.get("user_id"))
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+@event.listens_for(RoutingSession, "after_flush")
+def _record_write(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _record_bulk_write(orm_execute_state) -> None:
+    # Bulk UPDATE/DELETE and INSERT statements bypass the flush
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+@event.listens_for(RoutingSession, "after_commit")
+def _pin_writer(session: Session) -> None:
+    router: Optional[ReplicaRouter] = session.info.get("replica_router")
+    user_id = session.info.get("user_id")
+    if router is not None and user_id is not None and session.info.get("wrote"):
+        router.mark_write(user_id)
@@ -0,0 +1,180 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from app.core.database import SessionLocal, engine
+from app.core.config import get_settings
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+@dataclass
+class PeriodicJob:
+    """
+    A job run by the scheduler at a fixed interval.
+
+    Attributes:
+        name: Job name used in logs
+        interval_seconds: Minimum time between runs
+        func: Callable receiving a fresh database session
+        shard: Shard the session's task statements go to, for jobs run
+            once per shard
+        next_run_at: Monotonic time of the next run
+    """
+    name: str
+    interval_seconds: float
+    func: Callable[[Session], Any]
+    shard: Optional[str] = None
+    next_run_at: float = 0.0
+
+class Scheduler:
+    """
+    In-app periodic job scheduler with Postgres leader election.
+
+    Every worker runs the scheduler loop, but only the worker holding the
+    session-level advisory lock runs jobs. The lock lives on a dedicated
+    connection outside the request pool, so it is released as soon as the
+    leader exits or loses its connection, and another worker takes over on
+    its next tick. Non-Postgres databases are treated as single-process.
+    """
+
+    def __init__(self, lock_id: int, tick_seconds: float) -> None:
+        self.lock_id = lock_id
+        self.tick_seconds = tick_seconds
+        self._jobs: List[PeriodicJob] = []
+        self._task: Optional[asyncio.Task] = None
+        self._leader_engine: Optional[Engine] = None
+        self._leader_conn: Optional[Connection] = None
+
+    def add_job(
+        self,
+        name: str,
+        interval_seconds: float,
+        func: Callable[[Session], Any],
+        shard: Optional[str] = None
+    ) -> None:
+        """
+        Register a periodic job.
+
+        Args:
+            name: Job name used in logs
+            interval_seconds: Minimum time between runs
+            func: Callable receiving a fresh database session
+            shard: Shard for the session's task statements
+        """
+        self._jobs.append(PeriodicJob(name, interval_seconds, func, shard))
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader_conn is not None or engine.dialect.name != "postgresql"
+
+    async def start(self) -> None:
+        """Start the scheduler loop on the running event loop."""
+        if self._task is None and self._jobs:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Scheduler started with jobs: {', '.join(j.name for j in self._jobs)}")
+
+    async def stop(self) -> None:
+        """Stop the scheduler loop and give up leadership."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self._release_leadership)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # Jobs use the synchronous session, keep them off the event loop
+                await asyncio.to_thread(self._tick)
+            except Exception as e:
+                logger.error(f"Scheduler tick failed: {str(e)}")
+            await asyncio.sleep(self.tick_seconds)
+
+    def _tick(self) -> None:
+        if not self._ensure_leadership():
+            return
+
+        for job in self._jobs:
+            if time.monotonic() < job.next_run_at:
+                continue
+            self._run_job(job)
+            job.next_run_at = time.monotonic() + job.interval_seconds
+
+    def _run_job(self, job: PeriodicJob) -> None:
+        start = time.perf_counter()
+        db = SessionLocal()
+        if job.shard is not None:
+            db.info["shard"] = job.shard
+        try:
+            result = job.func(db)
+            duration = (time.perf_counter() - start) * 1000
+            logger.info(f"Job {job.name} finished in {duration:.2f}ms: {result}")
+        except Exception as e:
+            logger.error(f"Job {job.name} failed: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def _ensure_leadership(self) -> bool:
+        if engine.dialect.name != "postgresql":
+            return True
+
+        if self._leader_conn is not None:
+            try:
+                self._leader_conn.execute(text("SELECT 1"))
+                return True
+            except Exception as e:
+                logger.warning(f"Lost scheduler leader connection: {str(e)}")
+                self._release_leadership()
+
+        if self._leader_engine is None:
+            # Dedicated, unpooled connection so leadership never holds a request slot
+            self._leader_engine = create_engine(
+                engine.url,
+                poolclass=NullPool,
+                isolation_level="AUTOCOMMIT"
+            )
+
+        conn = None
+        try:
+            conn = self._leader_engine.connect()
+            acquired = conn.execute(
+                text("SELECT pg_try_advisory_lock(:lock_id)"),
+                {"lock_id": self.lock_id}
+            ).scalar()
+            if acquired:
+                self._leader_conn = conn
+                logger.info("Acquired scheduler leadership")
+                return True
+            conn.close()
+            return False
+        except Exception as e:
+            logger.error(f"Scheduler leader election failed: {str(e)}")
+            if conn is not None:
+                conn.close()
+            return False
+
+    def _release_leadership(self) -> None:
+        if self._leader_conn is None:
+            return
+        try:
+            # Closing the session releases its advisory locks
+            self._leader_conn.close()
+        except Exception as e:
+            logger.warning(f"Error releasing scheduler leadership: {str(e)}")
+        finally:
+            self._leader_conn = None
+
+scheduler = Scheduler(
+    lock_id=settings.SCHEDULER_LOCK_ID,
+    tick_seconds=settings.SCHEDULER_TICK_SECONDS
+)
@@ -1,12 +1,15 @@
 from datetime import datetime, timedelta
-import bcrypt
 from jose import jwt, JWTError
 from typing import Optional
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
+import hashlib
 import secrets
 from .logging import setup_logger
+from app.core.password_hashing import password_hasher
 from app.core.config import get_settings
+from app.models.user import User
 
 logger = setup_logger(__name__)
 settings = get_settings()
@@ -51,10 +54,35 @@ class SecurityService:
             logger.error(f"Error generating verification token: {str(e)}")
             raise
     
+    @staticmethod
+    def generate_refresh_token() -> str:
+        """
+        Generate an opaque refresh token.
+        
+        Returns:
+            str: Random refresh token
+        """
+        return secrets.token_urlsafe(32)
+    
+    @staticmethod
+    def hash_token(token: str) -> bytes:
+        """
+        Digest a high-entropy token for storage and lookup.
+        
+        A fast hash is sufficient because tokens are random, unlike passwords.
+        
+        Args:
+            token: Plain token
+            
+        Returns:
+            bytes: 32-byte SHA-256 digest
+        """
+        return hashlib.sha256(token.encode()).digest()
+    
     @staticmethod
     def get_password_hash(password: str) -> str:
         """
-        Generate password hash using bcrypt.
+        Generate password hash with the configured algorithm and work factor.
         
         Args:
             password: Plain text password
@@ -63,8 +91,7 @@ class SecurityService:
             str: Hashed password
         """
         try:
-            salt = bcrypt.gensalt()
-            return bcrypt.hashpw(password.encode(), salt).decode()
+            return password_hasher.hash(password)
         except Exception as e:
             logger.error(f"Error hashing password: {str(e)}")
             raise
@@ -72,7 +99,7 @@ class SecurityService:
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
         """
-        Verify password against hash using bcrypt.
+        Verify password against a bcrypt or argon2id hash.
         
         Args:
             plain_password: Plain text password to verify
@@ -82,13 +109,23 @@ class SecurityService:
             bool: True if password matches, False otherwise
         """
         try:
-            return bcrypt.checkpw(
-                plain_password.encode(), 
-                hashed_password.encode()
-            )
+            return password_hasher.verify(plain_password, hashed_password)
         except Exception as e:
             logger.error(f"Error verifying password: {str(e)}")
             return False
+
+    @staticmethod
+    def password_needs_rehash(hashed_password: str) -> bool:
+        """
+        Check whether a hash was made with other parameters than the current policy.
+        
+        Args:
+            hashed_password: Stored password hash
+            
+        Returns:
+            bool: True if the hash should be replaced
+        """
+        return password_hasher.needs_rehash(hashed_password)
         
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -144,4 +181,27 @@ class SecurityService:
             logger.error(f"Error decoding token: {str(e)}")
             raise
 
+    @staticmethod
+    def get_user_from_token(db: Session, token: str) -> Optional[User]:
+        """
+        Resolve the user referenced by a JWT access token.
+        
+        Args:
+            db: Database session
+            token: JWT access token
+            
+        Returns:
+            Optional[User]: User from the token subject, or None if invalid
+        """
+        try:
+            payload = SecurityService.decode_token(token)
+        except JWTError:
+            return None
+        
+        email = payload.get("sub")
+        if not email:
+            return None
+        
+        return db.query(User).filter(User.email == email).first()
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
\ No newline at end of file
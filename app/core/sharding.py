@@ -0,0 +1,95 @@
+import bisect
+import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import MetaData, inspect
+from sqlalchemy.engine import Engine
+
+# Tables partitioned by task owner; everything else stays on the primary
+SHARDED_TABLES = frozenset({
+    "tasks", "task_attachments", "task_tombstones", "pending_file_deletions", "shard_moves"
+})
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode(), usedforsecurity=False).digest()[:8], "big")
+
+class HashRing:
+    """
+    Consistent hash ring mapping user IDs to shard names.
+
+    Each shard is placed on the ring at virtual_nodes points, and a user
+    belongs to the first point at or after the hash of their ID. Adding or
+    removing a shard only moves the users between its points and their
+    predecessors, about 1/N of all users, instead of rehashing everyone.
+    """
+
+    def __init__(self, names: Iterable[str], virtual_nodes: int) -> None:
+        points: List[Tuple[int, str]] = sorted(
+            (_hash(f"{name}#{i}"), name) for name in names for i in range(virtual_nodes)
+        )
+        if not points:
+            raise ValueError("A hash ring needs at least one shard")
+        self._hashes = [point for point, _ in points]
+        self._names = [name for _, name in points]
+
+    def locate(self, user_id: int) -> str:
+        index = bisect.bisect_left(self._hashes, _hash(str(user_id)))
+        return self._names[index % len(self._names)]
+
+class ShardRouter:
+    """Maps users to the engine of the shard holding their tasks."""
+
+    def __init__(self, engines: Dict[str, Engine], virtual_nodes: int) -> None:
+        self.engines = engines
+        self.ring = HashRing(engines, virtual_nodes)
+
+    @property
+    def names(self) -> List[str]:
+        return sorted(self.engines)
+
+    def shard_for(self, user_id: int) -> str:
+        return self.ring.locate(user_id)
+
+    def get_engine(self, user_id: Optional[int] = None, shard: Optional[str] = None) -> Engine:
+        """
+        Get the engine for a sharded statement.
+
+        Args:
+            user_id: Owner the statement is for
+            shard: Explicit shard, which wins over user_id
+
+        Raises:
+            RuntimeError: If neither identifies a shard
+        """
+        if shard is None:
+            if user_id is None:
+                raise RuntimeError(
+                    "Sharded tables need session.info['user_id'] or session.info['shard']"
+                )
+            shard = self.shard_for(user_id)
+        return self.engines[shard]
+
+def is_sharded(mapper=None, clause=None) -> bool:
+    """Check whether a statement targets one of the sharded tables."""
+    if mapper is not None:
+        # A mapped class or its mapper
+        return inspect(mapper).local_table.name in SHARDED_TABLES
+    table = getattr(clause, "table", None)
+    return getattr(table, "name", None) in SHARDED_TABLES
+
+def shard_metadata(metadata: MetaData) -> MetaData:
+    """
+    Copy the sharded tables for creating a shard's schema.
+
+    Foreign keys to tables outside the shard, the owner's user row, cannot
+    be enforced across databases and are left out.
+    """
+    shard = MetaData()
+    for name in sorted(SHARDED_TABLES):
+        table = metadata.tables[name].to_metadata(shard)
+        for constraint in list(table.foreign_key_constraints):
+            if constraint.elements[0].target_fullname.split(".")[0] not in SHARDED_TABLES:
+                table.constraints.discard(constraint)
+                for element in constraint.elements:
+                    element.parent.foreign_keys.discard(element)
+                    table.foreign_keys.discard(element)
+    return shard
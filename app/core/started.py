@@ -0,0 +1,9 @@
+"""
+Process start mark for the startup report.
+
+Imported first by the entry point, before anything heavy, so the report
+includes import time. Kept free of other imports for that reason.
+"""
+import time
+
+STARTED_AT = time.perf_counter()
@@ -0,0 +1,158 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from app.core.database import Base, engine, shard_router
+from app.core.sharding import shard_metadata
+from app.core.config import get_settings
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+SCHEMA_MODES = ("create_all", "check", "skip")
+
+class StartupTimer:
+    """Records how long each startup phase takes."""
+
+    def __init__(self, started_at: Optional[float] = None) -> None:
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    def record(self, name: str, duration_ms: float) -> None:
+        self.phases[name] = round(duration_ms, 2)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as a named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def report(self) -> Dict[str, float]:
+        """
+        Get the per-phase breakdown.
+
+        Returns:
+            Dict[str, float]: Phase durations plus total, in milliseconds
+        """
+        total = (time.perf_counter() - self.started_at) * 1000
+        return {**self.phases, "total": round(total, 2)}
+
+    def summary(self) -> str:
+        return ", ".join(f"{name}={ms:.2f}ms" for name, ms in self.report().items())
+
+def get_alembic_heads() -> set:
+    """
+    Get the head revisions of the migration scripts.
+
+    Returns:
+        set: Head revision identifiers
+    """
+    # Imported lazily, alembic is only needed in check mode
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+def check_schema_revision() -> None:
+    """
+    Verify the database is stamped with the current alembic head.
+
+    Raises:
+        RuntimeError: If the database revision does not match the scripts
+    """
+    heads = get_alembic_heads()
+    with engine.connect() as conn:
+        try:
+            current = set(conn.execute(text("SELECT version_num FROM alembic_version")).scalars())
+        except Exception:
+            current = set()
+
+    if current != heads:
+        raise RuntimeError(
+            f"Database schema revision {sorted(current) or 'none'} does not match "
+            f"migration head {sorted(heads)}; run 'alembic upgrade head'"
+        )
+    logger.info(f"Database schema at revision {', '.join(sorted(current))}")
+
+def prepare_schema(mode: str) -> None:
+    """
+    Prepare the database schema according to the startup mode.
+
+    Args:
+        mode: create_all (reflect and create missing tables, on the shards
+            too), check (compare the alembic stamp only) or skip (no
+            database access)
+
+    Raises:
+        ValueError: If mode is unknown
+        RuntimeError: In check mode, if the schema is not migrated
+    """
+    if mode == "create_all":
+        logger.info("Creating database tables...")
+        Base.metadata.create_all(bind=engine)
+        if shard_router is not None:
+            shard_schema = shard_metadata(Base.metadata)
+            for shard_engine in shard_router.engines.values():
+                if shard_engine is not engine:
+                    shard_schema.create_all(bind=shard_engine)
+        logger.info("Database tables created successfully")
+    elif mode == "check":
+        check_schema_revision()
+    elif mode != "skip":
+        raise ValueError(f"Unknown STARTUP_SCHEMA_MODE: {mode} (expected one of {SCHEMA_MODES})")
+
+def get_warm_size() -> int:
+    """
+    Get how many connections to open at startup.
+
+    Returns:
+        int: DB_POOL_WARM_SIZE, or the full pool in lifo mode when unset
+    """
+    if settings.DB_POOL_WARM_SIZE:
+        return settings.DB_POOL_WARM_SIZE
+    return settings.DB_POOL_SIZE if settings.DB_POOL_MODE == "lifo" else 0
+
+def warm_pool(size: int) -> int:
+    """
+    Open pool connections concurrently so first requests skip the handshake.
+
+    Args:
+        size: Number of connections to open, capped at the pool size
+
+    Returns:
+        int: Number of connections opened
+    """
+    pool_size = engine.pool.size() if hasattr(engine.pool, "size") else 0
+    size = min(size, pool_size)
+    if size <= 0:
+        return 0
+
+    def open_connection() -> Connection:
+        conn = engine.connect()
+        conn.execute(text("SELECT 1"))
+        return conn
+
+    connections = []
+    with ThreadPoolExecutor(max_workers=size) as executor:
+        futures = [executor.submit(open_connection) for _ in range(size)]
+        for future in futures:
+            try:
+                connections.append(future.result())
+            except Exception as e:
+                logger.warning(f"Pool warm-up connection failed: {str(e)}")
+
+    # Checked back in, the connections stay open in the pool
+    for conn in connections:
+        conn.close()
+    return len(connections)
@@ -1,5 +1,5 @@
 from mangum import Mangum
-from app.main import app
+from app.lambda_app import create_lambda_app
 
 # Create Lambda handler
-handler = Mangum(app, lifespan="off") 
\ No newline at end of file
+handler = Mangum(create_lambda_app(), lifespan="off")
@@ -0,0 +1,111 @@
+import importlib
+from typing import Optional
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool, QueuePool
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import get_settings
+from app.core.database import SessionLocal, get_database_url
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+# Routers are imported on the first request that needs them, so a cold
+# start only pays for the modules behind the route being called.
+LAZY_ROUTERS = [
+    ("/auth", "app.api.v1.endpoints.auth"),
+    ("/tasks", "app.api.v1.endpoints.tasks"),
+    ("/admin", "app.api.v1.endpoints.admin"),
+]
+
+_engine: Optional[Engine] = None
+
+class LazyRouter:
+    """ASGI app that imports a router module and builds it on first call."""
+
+    def __init__(self, module_path: str) -> None:
+        self.module_path = module_path
+        self._app: Optional[ASGIApp] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self._app is None:
+            self._app = self._load()
+        await self._app(scope, receive, send)
+
+    def _load(self) -> ASGIApp:
+        logger.info(f"Loading router {self.module_path}")
+        module = importlib.import_module(self.module_path)
+        sub_app = FastAPI(openapi_url=None)
+        sub_app.include_router(module.router)
+        return sub_app
+
+def get_lambda_engine() -> Engine:
+    """
+    Get the engine shared by all invocations of this Lambda container.
+
+    A container handles one request at a time, so "single" keeps one
+    connection open across warm invocations (a good fit for RDS Proxy)
+    and "null" opens a fresh connection per request.
+
+    Returns:
+        Engine: Database engine
+    """
+    global _engine
+    if _engine is None:
+        if settings.LAMBDA_DB_POOL == "null":
+            _engine = create_engine(get_database_url(), poolclass=NullPool)
+        else:
+            _engine = create_engine(
+                get_database_url(),
+                poolclass=QueuePool,
+                pool_size=1,
+                max_overflow=0,
+                pool_pre_ping=True,
+                pool_recycle=settings.LAMBDA_DB_POOL_RECYCLE
+            )
+    return _engine
+
+def create_lambda_app() -> FastAPI:
+    """
+    Create the FastAPI application for AWS Lambda.
+
+    Unlike main.app there is no lifespan: the database engine is bound
+    here, and schema management and background jobs are left to the
+    long-running deployment. Throttling is done by API Gateway, so the
+    per-process rate limiter is not installed.
+
+    Returns:
+        FastAPI: Application with lazily loaded routers
+    """
+    SessionLocal.configure(bind=get_lambda_engine())
+
+    app = FastAPI(
+        title=settings.PROJECT_NAME,
+        version=settings.VERSION,
+        openapi_url=None
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost", "http://localhost:8000"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    for prefix, module_path in LAZY_ROUTERS:
+        app.mount(f"{settings.API_V1_STR}{prefix}", LazyRouter(module_path))
+
+    @app.get("/", tags=["health"])
+    async def health_check():
+        """Health check without touching routers or the database."""
+        return {
+            "status": "healthy",
+            "message": f"Welcome to {settings.PROJECT_NAME}",
+            "version": settings.VERSION
+        }
+
+    return app
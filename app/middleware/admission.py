@@ -0,0 +1,209 @@
+import asyncio
+import math
+import time
+from typing import Any, Dict, Optional
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import get_settings
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+# Weight of the newest sample in the moving averages
+EWMA_ALPHA = 0.2
+
+class RouteClass:
+    """
+    Concurrency limit and queueing statistics for one class of routes.
+
+    Requests beyond max_concurrency wait in a queue. While the moving
+    average of queueing time is above target, requests that would have to
+    queue are rejected immediately instead, so the admitted ones keep their
+    latency; a request that waits longer than max_wait_ms is rejected too.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        target_ms: float,
+        max_wait_ms: float
+    ) -> None:
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.target_ms = target_ms
+        self.max_wait_ms = max_wait_ms
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.queue_ms = 0.0
+        self.service_ms = 0.0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def overloaded(self) -> bool:
+        return self.queue_ms > self.target_ms
+
+    async def acquire(self) -> bool:
+        """
+        Wait for a slot.
+
+        Returns:
+            bool: True if admitted, False if the request should be shed
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Semaphores bind to one event loop; recreate for a new one
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+            self.in_flight = self.waiting = 0
+
+        start = time.perf_counter()
+        if self._slots.locked():
+            if self.overloaded or self.waiting >= self.max_queue:
+                self.rejected += 1
+                return False
+
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.max_wait_ms / 1000)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                self._record_queue_time(self.max_wait_ms)
+                return False
+            finally:
+                self.waiting -= 1
+        else:
+            await self._slots.acquire()
+
+        self._record_queue_time((time.perf_counter() - start) * 1000)
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self, service_ms: float) -> None:
+        self.in_flight -= 1
+        self.service_ms += EWMA_ALPHA * (service_ms - self.service_ms)
+        self._slots.release()
+
+    def retry_after(self) -> int:
+        """Estimate in seconds how long the current backlog takes to drain."""
+        backlog = self.in_flight + self.waiting
+        return max(1, math.ceil(backlog * self.service_ms / self.max_concurrency / 1000))
+
+    def _record_queue_time(self, queue_ms: float) -> None:
+        self.queue_ms += EWMA_ALPHA * (queue_ms - self.queue_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "queue_ms": round(self.queue_ms, 3),
+            "service_ms": round(self.service_ms, 3),
+            "overloaded": self.overloaded
+        }
+
+class AdmissionController:
+    """Maps request paths to route classes."""
+
+    def __init__(self, api_prefix: str, classes: Dict[str, RouteClass]) -> None:
+        self.api_prefix = api_prefix
+        self.classes = classes
+
+    def classify(self, path: str) -> Optional[RouteClass]:
+        """
+        Get the route class for a path.
+
+        Args:
+            path: Request path
+
+        Returns:
+            Optional[RouteClass]: None for paths outside admission control
+        """
+        if path.startswith(f"{self.api_prefix}/tasks"):
+            if path == f"{self.api_prefix}/tasks/events":
+                # The change stream is long-lived and would hold a slot for its whole lifetime
+                return None
+            if path in (f"{self.api_prefix}/tasks/export", f"{self.api_prefix}/tasks/import"):
+                # Bulk transfers run for minutes; their own class keeps them from starving CRUD
+                return self.classes.get("bulk")
+            if "/attachments" in path:
+                return self.classes.get("attachments")
+            return self.classes.get("tasks")
+        if path.startswith(f"{self.api_prefix}/auth"):
+            return self.classes.get("auth")
+        if path == f"{self.api_prefix}/admin/export":
+            return self.classes.get("bulk")
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: route_class.stats() for name, route_class in self.classes.items()}
+
+class AdmissionControlMiddleware:
+    """ASGI middleware rejecting requests with 503 when a route class is saturated."""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController) -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = self.controller.classify(scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await route_class.acquire():
+            retry_after = route_class.retry_after()
+            logger.warning(
+                f"Shedding {scope['method']} {scope['path']}: {route_class.name} overloaded "
+                f"(queue {route_class.queue_ms:.1f}ms, {route_class.waiting} waiting)"
+            )
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Service overloaded, retry later"},
+                headers={"Retry-After": str(retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route_class.release((time.perf_counter() - start) * 1000)
+
+def create_admission_controller() -> AdmissionController:
+    """Build the controller from the ADMISSION_* settings."""
+    limits = {
+        "auth": settings.ADMISSION_AUTH_CONCURRENCY,
+        "tasks": settings.ADMISSION_TASKS_CONCURRENCY,
+        "attachments": settings.ADMISSION_ATTACHMENTS_CONCURRENCY,
+        "bulk": settings.ADMISSION_BULK_CONCURRENCY
+    }
+    return AdmissionController(
+        settings.API_V1_STR,
+        {
+            name: RouteClass(
+                name,
+                max_concurrency=limit,
+                max_queue=limit * settings.ADMISSION_QUEUE_FACTOR,
+                target_ms=settings.ADMISSION_QUEUE_TARGET_MS,
+                max_wait_ms=settings.ADMISSION_MAX_WAIT_MS
+            )
+            for name, limit in limits.items()
+        }
+    )
+
+admission_controller = create_admission_controller()
@@ -0,0 +1,230 @@
+import re
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Pattern
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Optional codecs, gzip is always available
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+DEFAULT_CONTENT_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/problem+json",
+    "text/csv",
+    "text/plain",
+    "text/html",
+)
+
+class GzipEncoder:
+    def __init__(self) -> None:
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        # Sync flush emits what is buffered so streamed chunks reach the client
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+class BrotliEncoder:
+    def __init__(self) -> None:
+        self._compressor = brotli.Compressor(quality=4)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+class ZstdEncoder:
+    def __init__(self) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+def available_encoders() -> Dict[str, Callable]:
+    """Encoders installed in this environment, in server preference order."""
+    encoders: Dict[str, Callable] = {}
+    if zstandard is not None:
+        encoders["zstd"] = ZstdEncoder
+    if brotli is not None:
+        encoders["br"] = BrotliEncoder
+    encoders["gzip"] = GzipEncoder
+    return encoders
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    Parse an Accept-Encoding header into codings and their q-values.
+
+    Args:
+        header: Header value, e.g. "gzip, br;q=0.9, *;q=0"
+
+    Returns:
+        Dict[str, float]: q-value per lower-cased coding
+    """
+    accepted: Dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+def negotiate_encoding(header: str, encoders: Iterable[str]) -> Optional[str]:
+    """
+    Pick the coding with the highest q-value, ties broken by server preference.
+
+    Args:
+        header: Accept-Encoding header value
+        encoders: Supported codings in preference order
+
+    Returns:
+        Optional[str]: Chosen coding, or None for identity
+    """
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in encoders:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with gzip, brotli or zstd.
+
+    The coding is negotiated from Accept-Encoding. Only allowlisted content
+    types are compressed; responses that are already encoded, partial
+    content and excluded paths such as attachment downloads pass through.
+    Complete bodies below minimum_size are sent as is. Streaming responses
+    are compressed chunk by chunk and flushed after each chunk, so clients
+    still receive data as it is produced.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        content_types: Iterable[str] = DEFAULT_CONTENT_TYPES,
+        exclude_paths: Iterable[str] = ()
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        self.exclude_paths: List[Pattern] = [re.compile(pattern) for pattern in exclude_paths]
+        self.encoders = available_encoders()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or any(p.match(scope["path"]) for p in self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        coding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""),
+            self.encoders
+        )
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(self, coding, send)
+        await self.app(scope, receive, responder.send)
+
+    def should_compress(self, status: int, headers: Headers) -> bool:
+        if status < 200 or status in (204, 206, 304):
+            return False
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type.startswith(self.content_types)
+
+class _CompressingResponder:
+    """Per-response state: holds the start message until the first body chunk."""
+
+    def __init__(self, middleware: CompressionMiddleware, coding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.coding = coding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.encoder = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if self.middleware.should_compress(message["status"], headers):
+                # Wait for the body to decide, and mark the response as varying
+                self.start_message = {**message, "headers": list(message["headers"])}
+                MutableHeaders(raw=self.start_message["headers"]).add_vary_header("Accept-Encoding")
+            else:
+                self.passthrough = True
+                await self._send(message)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # Small complete body, compression would not pay off
+                self.passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+
+            self.encoder = self.middleware.encoders[self.coding]()
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.coding
+            del headers["Content-Length"]
+            if not more_body:
+                compressed = self.encoder.compress(body) + self.encoder.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            await self._send(start)
+
+        if more_body:
+            chunk = self.encoder.compress(body) + self.encoder.flush()
+        else:
+            chunk = self.encoder.compress(body) + self.encoder.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,260 @@
+import asyncio
+import hashlib
+import re
+from datetime import datetime
+from typing import Iterable, List, Optional, Pattern, Union
+from fastapi.concurrency import run_in_threadpool
+from jose import JWTError, jwt
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.middleware.idempotency_backends import (
+    DatabaseIdempotencyStore,
+    IdempotencyRecord,
+    MemoryIdempotencyStore
+)
+from app.core.config import get_settings
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+IdempotencyStore = Union[MemoryIdempotencyStore, DatabaseIdempotencyStore]
+
+MAX_KEY_LENGTH = 255
+MULTIPART_BOUNDARY = re.compile(r'multipart/[^;]+;.*\bboundary="?([^";]+)"?', re.IGNORECASE)
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware replaying the first response to a retried request.
+
+    A POST to one of the paths with an Idempotency-Key header claims the
+    key, scoped to the caller and the path, before the request reaches the
+    app. The caller is the subject of a valid bearer token, so a retry
+    after refreshing the access token still matches, or else the raw
+    Authorization header. The claim is renewed while the request runs, so
+    a long upload keeps it.
+
+    Once the request completes with a status below 500 the response is
+    stored for the store's retention period with a hash of the request
+    body. Retries with the same key and body get it back, marked
+    Idempotent-Replayed, without running the endpoint again; a different
+    body gets 422. A retry arriving while the first request is still
+    running gets 409. Server errors, exceptions, responses above
+    max_response_bytes and responses sent before the whole body was read,
+    such as an early quota 413, release the key so a retry runs normally.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: IdempotencyStore,
+        paths: Iterable[str] = (),
+        max_response_bytes: int = 65536
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.paths: List[Pattern] = [re.compile(pattern) for pattern in paths]
+        self.max_response_bytes = max_response_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not any(p.match(scope["path"]) for p in self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = headers.get("idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse(status_code=400, content={"detail": "Invalid Idempotency-Key"})
+            await response(scope, receive, send)
+            return
+
+        store_key = hashlib.sha256(
+            "\n".join((caller_scope(headers.get("authorization", "")), scope["path"], key)).encode()
+        ).digest()
+        record = await run_in_threadpool(self.store.begin, store_key, datetime.utcnow())
+        if record is not None:
+            await self._replay(record, scope, receive, send)
+            return
+
+        body = _BodyHasher(receive, headers.get("content-type", ""))
+        recorder = _ResponseRecorder(send, self.max_response_bytes)
+        keeper = asyncio.create_task(self._keep_claim(store_key))
+        try:
+            await self.app(scope, body.receive, recorder.send)
+        except BaseException:
+            await run_in_threadpool(self.store.release, store_key)
+            raise
+        finally:
+            keeper.cancel()
+        recorder.record.request_hash = body.request_hash()
+
+        if (
+            recorder.record.status_code is not None
+            and recorder.record.status_code < 500
+            and not recorder.too_large
+            # Answered before the body was read, e.g. an early 413: not tied to this body
+            and recorder.record.request_hash is not None
+        ):
+            await run_in_threadpool(self.store.complete, store_key, recorder.record, datetime.utcnow())
+        else:
+            if recorder.too_large:
+                logger.warning(f"Response to {scope['path']} too large to store for idempotent replay")
+            await run_in_threadpool(self.store.release, store_key)
+
+    async def _keep_claim(self, store_key: bytes) -> None:
+        """Renew the claim at half its length until cancelled."""
+        interval = self.store.lock.total_seconds() / 2
+        while True:
+            await asyncio.sleep(interval)
+            await run_in_threadpool(self.store.extend, store_key, datetime.utcnow())
+
+    async def _replay(self, record: IdempotencyRecord, scope: Scope, receive: Receive, send: Send) -> None:
+        if record.status_code is not None and record.request_hash is not None:
+            body = _BodyHasher(receive, Headers(scope=scope).get("content-type", ""))
+            await body.drain()
+            if body.request_hash() != record.request_hash:
+                response = JSONResponse(
+                    status_code=422,
+                    content={"detail": "Idempotency-Key was already used with a different request"}
+                )
+                await response(scope, receive, send)
+                return
+
+        if record.status_code is None:
+            response = JSONResponse(
+                status_code=409,
+                content={"detail": "A request with this Idempotency-Key is in progress"},
+                headers={"Retry-After": "1"}
+            )
+            await response(scope, receive, send)
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": record.status_code,
+            "headers": [*record.headers, (b"idempotent-replayed", b"true")]
+        })
+        await send({"type": "http.response.body", "body": record.body})
+
+def caller_scope(authorization: str) -> str:
+    """
+    Identify the caller a key belongs to.
+
+    Args:
+        authorization: Authorization header, possibly empty
+
+    Returns:
+        str: The token subject for a valid bearer token, else the header
+    """
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            subject = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]).get("sub")
+        except JWTError:
+            subject = None
+        if subject:
+            return f"sub:{subject}"
+    return f"authorization:{authorization}"
+
+class _BodyHasher:
+    """
+    Hashes the request body as the app reads it.
+
+    Clients pick a new multipart boundary when they rebuild a form for a
+    retry, so the boundary is masked out of multipart bodies.
+    """
+
+    def __init__(self, receive: Receive, content_type: str) -> None:
+        self._receive = receive
+        self._digest = hashlib.sha256()
+        self.complete = False
+        match = MULTIPART_BOUNDARY.search(content_type)
+        self._boundary = match.group(1).encode("latin-1") if match else None
+        self._tail = b""
+
+    async def receive(self) -> Message:
+        message = await self._receive()
+        if message["type"] == "http.request":
+            self._update(message.get("body", b""), final=not message.get("more_body", False))
+        return message
+
+    def _update(self, chunk: bytes, final: bool) -> None:
+        if self._boundary is None:
+            self._digest.update(chunk)
+        else:
+            data = (self._tail + chunk).replace(self._boundary, b"\0boundary\0")
+            # Hold back what could be the start of a boundary split across chunks
+            keep = 0 if final else min(len(data), len(self._boundary) - 1)
+            self._digest.update(data[:len(data) - keep])
+            self._tail = data[len(data) - keep:]
+        if final:
+            self.complete = True
+
+    async def drain(self) -> None:
+        """Read the rest of the body, for a request the app will not see."""
+        while not self.complete:
+            if (await self.receive())["type"] == "http.disconnect":
+                return
+
+    def request_hash(self) -> Optional[bytes]:
+        return self._digest.digest() if self.complete else None
+
+class _ResponseRecorder:
+    """Passes the response through while keeping a copy to store."""
+
+    def __init__(self, send: Send, max_bytes: int) -> None:
+        self._send = send
+        self.max_bytes = max_bytes
+        self.record = IdempotencyRecord()
+        self.too_large = False
+        self._chunks: List[bytes] = []
+        self._size = 0
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.record.status_code = message["status"]
+            self.record.headers = list(message.get("headers", []))
+        elif message["type"] == "http.response.body" and not self.too_large:
+            body = message.get("body", b"")
+            self._size += len(body)
+            if self._size > self.max_bytes:
+                self.too_large = True
+                self._chunks.clear()
+            else:
+                self._chunks.append(body)
+                if not message.get("more_body", False):
+                    self.record.body = b"".join(self._chunks)
+        await self._send(message)
+
+def create_store() -> IdempotencyStore:
+    """
+    Create the configured idempotency store.
+
+    Returns:
+        IdempotencyStore: memory (per worker) or database (shared by all workers)
+
+    Raises:
+        ValueError: If IDEMPOTENCY_BACKEND is unknown
+    """
+    if settings.IDEMPOTENCY_BACKEND == "memory":
+        return MemoryIdempotencyStore(
+            settings.IDEMPOTENCY_TTL_SECONDS,
+            settings.IDEMPOTENCY_LOCK_SECONDS,
+            settings.IDEMPOTENCY_MAX_KEYS
+        )
+    if settings.IDEMPOTENCY_BACKEND == "database":
+        return DatabaseIdempotencyStore(
+            settings.IDEMPOTENCY_TTL_SECONDS,
+            settings.IDEMPOTENCY_LOCK_SECONDS
+        )
+    raise ValueError(f"Unknown IDEMPOTENCY_BACKEND: {settings.IDEMPOTENCY_BACKEND}")
+
+idempotency_store = create_store()
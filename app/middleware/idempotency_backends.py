@@ -0,0 +1,210 @@
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.models.idempotency import IdempotencyKey
+
+@dataclass
+class IdempotencyRecord:
+    """
+    A stored response, or a request still running when status_code is None.
+
+    Attributes:
+        status_code: Response status
+        headers: Raw response header pairs
+        body: Response body
+        request_hash: SHA-256 of the request body, None if the app did not
+            read all of it
+    """
+    status_code: Optional[int] = None
+    headers: List[Tuple[bytes, bytes]] = field(default_factory=list)
+    body: bytes = b""
+    request_hash: Optional[bytes] = None
+
+class MemoryIdempotencyStore:
+    """
+    Per-process store of recent responses.
+
+    Retries must reach the same worker to be recognised, so this suits
+    single-process deployments and tests. The oldest keys are evicted
+    beyond max_keys.
+    """
+
+    def __init__(self, ttl_seconds: float, lock_seconds: float, max_keys: int) -> None:
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.lock = timedelta(seconds=lock_seconds)
+        self.max_keys = max_keys
+        self._entries: "OrderedDict[bytes, Tuple[datetime, IdempotencyRecord]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def begin(self, key: bytes, now: datetime) -> Optional[IdempotencyRecord]:
+        """
+        Claim a key for a new request.
+
+        Returns:
+            Optional[IdempotencyRecord]: None if claimed, else the stored
+                response or running request holding the key
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+            self._entries[key] = (now + self.lock, IdempotencyRecord())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+            return None
+
+    def extend(self, key: bytes, now: datetime) -> None:
+        """Renew the claim of a request that is still running."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1].status_code is None:
+                self._entries[key] = (now + self.lock, entry[1])
+
+    def complete(self, key: bytes, record: IdempotencyRecord, now: datetime) -> None:
+        with self._lock:
+            self._entries[key] = (now + self.ttl, record)
+
+    def release(self, key: bytes) -> None:
+        """Drop a claim whose request failed, so a retry runs it again."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1].status_code is None:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "keys": len(self._entries)}
+
+class DatabaseIdempotencyStore:
+    """
+    Store of recent responses in the idempotency_keys table, shared by all
+    workers and hosts.
+
+    A key is claimed by inserting its row, so of two concurrent requests
+    with the same key exactly one runs; the primary key constraint rejects
+    the other. Claims expire after lock_seconds, so a worker that dies
+    mid-request does not hold the key until retention ends; the middleware
+    extends the claim of requests that are still running.
+    """
+
+    def __init__(self, ttl_seconds: float, lock_seconds: float) -> None:
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.lock = timedelta(seconds=lock_seconds)
+
+    def begin(self, key: bytes, now: datetime) -> Optional[IdempotencyRecord]:
+        """
+        Claim a key for a new request.
+
+        Returns:
+            Optional[IdempotencyRecord]: None if claimed, else the stored
+                response or running request holding the key
+        """
+        db = SessionLocal()
+        try:
+            # An expired response or abandoned claim no longer holds the key
+            db.execute(delete(IdempotencyKey).where(
+                IdempotencyKey.key_hash == key,
+                IdempotencyKey.expires_at <= now
+            ))
+            db.add(IdempotencyKey(key_hash=key, created_at=now, expires_at=now + self.lock))
+            try:
+                db.commit()
+                return None
+            except IntegrityError:
+                db.rollback()
+
+            row = db.get(IdempotencyKey, key)
+            if row is None:
+                # Released between our insert and this read; treat as running
+                return IdempotencyRecord()
+            return self._to_record(row)
+        finally:
+            db.close()
+
+    def extend(self, key: bytes, now: datetime) -> None:
+        """Renew the claim of a request that is still running."""
+        self._execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key_hash == key, IdempotencyKey.status_code.is_(None))
+            .values(expires_at=now + self.lock)
+        )
+
+    def complete(self, key: bytes, record: IdempotencyRecord, now: datetime) -> None:
+        headers = json.dumps([[name.decode("latin-1"), value.decode("latin-1")] for name, value in record.headers])
+        self._execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key_hash == key)
+            .values(
+                status_code=record.status_code,
+                headers=headers,
+                body=record.body,
+                request_hash=record.request_hash,
+                expires_at=now + self.ttl
+            )
+        )
+
+    def release(self, key: bytes) -> None:
+        """Drop a claim whose request failed, so a retry runs it again."""
+        self._execute(delete(IdempotencyKey).where(
+            IdempotencyKey.key_hash == key,
+            IdempotencyKey.status_code.is_(None)
+        ))
+
+    def cleanup(self, db: Session, batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Scheduler job: delete expired keys in batches.
+
+        Args:
+            db: Database session
+            batch_size: Maximum rows deleted per statement
+
+        Returns:
+            Dict[str, int]: Number of deleted rows
+        """
+        now = datetime.utcnow()
+        total = 0
+        while True:
+            expired = (
+                select(IdempotencyKey.key_hash)
+                .where(IdempotencyKey.expires_at <= now)
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            count = db.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.key_hash.in_(expired))
+            ).rowcount
+            db.commit()
+            total += count
+            if count < batch_size:
+                break
+        return {"idempotency_keys": total}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "database"}
+
+    @staticmethod
+    def _to_record(row: IdempotencyKey) -> IdempotencyRecord:
+        if row.status_code is None:
+            return IdempotencyRecord()
+        return IdempotencyRecord(
+            status_code=row.status_code,
+            headers=[(name.encode("latin-1"), value.encode("latin-1")) for name, value in json.loads(row.headers)],
+            body=row.body or b"",
+            request_hash=row.request_hash
+        )
+
+    @staticmethod
+    def _execute(statement) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(statement)
+            db.commit()
+        finally:
+            db.close()
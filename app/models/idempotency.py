@@ -0,0 +1,27 @@
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, Text
+from app.core.database import Base
+
+class IdempotencyKey(Base):
+    """
+    IdempotencyKey model storing the first response to a keyed request.
+
+    Attributes:
+        key_hash: SHA-256 digest of the caller, path and Idempotency-Key
+        status_code: Response status; None while the first request runs
+        headers: Response headers as a JSON list of pairs
+        body: Response body
+        request_hash: SHA-256 of the request body, to refuse reuse of the
+            key for a different request
+        created_at: When the first request started
+        expires_at: When the key may be reused; a short lock while the
+            request runs, the retention period once it has completed
+    """
+    __tablename__ = "idempotency_keys"
+
+    key_hash = Column(LargeBinary(32), primary_key=True)
+    status_code = Column(Integer, nullable=True)
+    headers = Column(Text, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    request_hash = Column(LargeBinary(32), nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
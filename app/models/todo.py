@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import BigInteger, Column, Integer, String, Boolean, DateTime, ForeignKey, Index, Text, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
@@ -12,21 +12,38 @@ class Task(Base):
         title: Task title
         description: Task description
         created_at: Task creation timestamp
+        updated_at: Last modification timestamp, the delta sync cursor
         due_date: Task due date
         is_completed: Task completion status
         completed_at: Task completion timestamp
+        reminder_sent_at: When the due-date reminder was sent (claimed)
         user_id: Owner user ID
         attachments: Related file attachments
     """
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Per-user listings and exports in id order
+        Index("ix_tasks_user_id_id", "user_id", "id"),
+        # Delta sync: a user's changes in (updated_at, id) order
+        Index("ix_tasks_user_id_updated_at", "user_id", "updated_at", "id"),
+        # Reminder scans: only open tasks still waiting for a reminder
+        Index(
+            "ix_tasks_pending_reminder_due_date",
+            "due_date",
+            postgresql_where=text("NOT is_completed AND reminder_sent_at IS NULL"),
+            sqlite_where=text("NOT is_completed AND reminder_sent_at IS NULL")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     due_date = Column(DateTime, nullable=True)
     is_completed = Column(Boolean, default=False)
     completed_at = Column(DateTime, nullable=True)
+    reminder_sent_at = Column(DateTime, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     user = relationship("User", back_populates="tasks")
@@ -41,16 +58,79 @@ class TaskAttachment(Base):
         filename: Original filename
         file_path: Path to stored file
         content_type: File MIME type
+        size_bytes: File size, counted against the owner's storage quota
         created_at: Upload timestamp
+        thumbnail_path: Path to the generated thumbnail, if any
+        thumbnail_status: pending, ready or failed; None when not applicable
         task_id: Related task ID
     """
     __tablename__ = "task_attachments"
     
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String(255), nullable=False)
-    file_path = Column(String(255), nullable=False)
+    file_path = Column(String(255), nullable=False, index=True)
     content_type = Column(String(100), nullable=False)
+    size_bytes = Column(BigInteger, default=0, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
-    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    thumbnail_path = Column(String(255), nullable=True, index=True)
+    thumbnail_status = Column(String(20), nullable=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, index=True)
     
-    task = relationship("Task", back_populates="attachments")
\ No newline at end of file
+    task = relationship("Task", back_populates="attachments")
+
+class TaskTombstone(Base):
+    """
+    TaskTombstone model recording deleted tasks for delta sync.
+    
+    Attributes:
+        id: Unique identifier
+        task_id: ID of the deleted task
+        user_id: Owner user ID
+        deleted_at: Deletion timestamp
+    """
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        Index("ix_task_tombstones_user_id_deleted_at", "user_id", "deleted_at", "task_id"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+class PendingFileDeletion(Base):
+    """
+    PendingFileDeletion model queueing uploaded files for removal from disk.
+    
+    Attributes:
+        id: Unique identifier
+        file_path: Path of the file to remove
+        attempts: Failed removal attempts so far
+        created_at: Enqueue timestamp
+    """
+    __tablename__ = "pending_file_deletions"
+    
+    id = Column(Integer, primary_key=True)
+    file_path = Column(String(255), nullable=False, index=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class ShardMove(Base):
+    """
+    ShardMove model recording a user's tasks copied onto this shard by the
+    rebalancer, until the originals are deleted from the source shard.
+    
+    Attributes:
+        user_id: Owner user ID
+        source: Shard the tasks were copied from
+        task_ids: JSON object mapping source task IDs to their copies' IDs
+        tombstone_ids: JSON list of the source tombstones' task IDs
+        created_at: Copy timestamp
+    """
+    __tablename__ = "shard_moves"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    source = Column(String(64), nullable=False)
+    task_ids = Column(Text, nullable=False)
+    tombstone_ids = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
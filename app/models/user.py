@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import BigInteger, Column, Integer, String, Boolean, DateTime, ForeignKey, Text, LargeBinary, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from typing import List
@@ -14,9 +14,12 @@ class User(Base):
         email: User's email address
         password_hash: Hashed password
         is_verified: Email verification status
+        is_admin: Administrator flag for operational endpoints
         verification_token: Token for email verification
         token_expiry: Expiration time for verification token
         created_at: Account creation timestamp
+        storage_used_bytes: Running total of the user's attachment sizes
+        storage_quota_bytes: Per-user storage quota; None for the default
         refresh_tokens: Related refresh tokens
         tasks: Related tasks
     """
@@ -26,9 +29,12 @@ class User(Base):
     email = Column(String(255), unique=True, index=True)
     password_hash = Column(String(255))
     is_verified = Column(Boolean, default=False)
+    is_admin = Column(Boolean, default=False, nullable=False)
     verification_token = Column(String(255), unique=True)
     token_expiry = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
+    storage_used_bytes = Column(BigInteger, default=0, nullable=False)
+    storage_quota_bytes = Column(BigInteger, nullable=True)
     refresh_tokens = relationship("RefreshToken", back_populates="user", cascade="all, delete-orphan")
     tasks = relationship("Task", back_populates="user", cascade="all, delete-orphan")
 
@@ -36,18 +42,34 @@ class RefreshToken(Base):
     """
     RefreshToken model for database representation.
     
+    Only the SHA-256 digest of the token is stored, so lookups use a
+    fixed-width unique index and a database leak exposes no usable tokens.
+    
     Attributes:
         id: Unique identifier
-        token: Refresh token string
+        token_hash: SHA-256 digest of the refresh token
         expires_at: Token expiration timestamp
         user_id: Related user ID
         created_at: Token creation timestamp
+        is_revoked: Revocation status
+        revoked_at: Revocation timestamp
     """
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        Index("ix_refresh_tokens_user_id_expires_at", "user_id", "expires_at"),
+        # Active sessions per user, the hot path for listing and revocation
+        Index(
+            "ix_refresh_tokens_active_user_id",
+            "user_id",
+            "expires_at",
+            postgresql_where=text("NOT is_revoked"),
+            sqlite_where=text("NOT is_revoked")
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
-    token = Column(String(255), unique=True, nullable=False)
-    expires_at = Column(DateTime, nullable=False)
+    token_hash = Column(LargeBinary(32), unique=True, index=True, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     is_revoked = Column(Boolean, default=False)
@@ -62,4 +84,4 @@ class BlacklistedToken(Base):
     id = Column(Integer, primary_key=True)
     token = Column(String(255), unique=True, nullable=False)
     blacklisted_at = Column(DateTime, default=datetime.utcnow)
-    expires_at = Column(DateTime, nullable=False)
\ No newline at end of file
+    expires_at = Column(DateTime, nullable=False, index=True)
\ No newline at end of file
@@ -19,6 +19,7 @@ class TaskAttachmentResponse(BaseModel):
     filename: str
     content_type: str
     created_at: datetime
+    thumbnail_status: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -26,9 +27,16 @@ class TaskAttachmentResponse(BaseModel):
 class TaskResponse(TaskBase):
     id: int
     created_at: datetime
+    updated_at: datetime
     is_completed: bool
     completed_at: Optional[datetime]
     attachments: List[TaskAttachmentResponse]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class TaskChangesResponse(BaseModel):
+    changed: List[TaskResponse]
+    deleted: List[int]
+    cursor: str
+    has_more: bool
@@ -50,4 +50,20 @@ class UserResponse(UserBase):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class SessionResponse(BaseModel):
+    """
+    Schema for an active refresh token session.
+    
+    Attributes:
+        id: Session ID
+        created_at: Session start timestamp
+        expires_at: Session expiration timestamp
+    """
+    id: int
+    created_at: datetime
+    expires_at: datetime
+
+    class Config:
+        from_attributes = True
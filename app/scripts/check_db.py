@@ -28,6 +28,7 @@ def check_db() -> None:
             users = db.query(User).all()
             print(f"\nFound {len(users)} users:")
             for user in users:
+                db.info["user_id"] = user.id
                 tasks_count = db.query(Task).filter(Task.user_id == user.id).count()
                 print(f"- {user.email} (ID: {user.id}, Tasks: {tasks_count})")
         finally:
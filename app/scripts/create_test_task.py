@@ -16,6 +16,7 @@ def create_test_task() -> None:
         if not test_user:
             print("Test user not found!")
             return
+        db.info["user_id"] = test_user.id
             
         # Create test task
         test_task = Task(
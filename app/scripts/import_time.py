@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import argparse
+import subprocess
+from typing import List, Tuple
+
+ROOT = Path(__file__).parent.parent.parent
+
+def measure_import_time(module: str) -> Tuple[int, List[Tuple[int, int, str]]]:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Args:
+        module: Dotted module path, e.g. app.lambda
+
+    Returns:
+        Tuple[int, List[Tuple[int, int, str]]]: Total cumulative microseconds
+            and (self, cumulative, module) rows for every import
+    """
+    result = subprocess.run(
+        [
+            sys.executable, "-X", "importtime", "-c",
+            f"import importlib; importlib.import_module({module!r})"
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # Nested imports are indented below the module that triggered them
+        name = name[1:].rstrip()
+        rows.append((int(self_us), int(cumulative_us), name))
+
+    # Only top-level imports add up to the total, nested ones are included in them
+    total = sum(cumulative for _, cumulative, name in rows if not name.startswith(" "))
+    return total, rows
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report module import time")
+    parser.add_argument("module", nargs="?", default="app.lambda")
+    parser.add_argument("--top", type=int, default=25, help="Number of modules to list")
+    args = parser.parse_args()
+
+    total, rows = measure_import_time(args.module)
+    print(f"Importing {args.module} took {total / 1000:.1f}ms\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name.strip()}")
+
+if __name__ == "__main__":
+    main()
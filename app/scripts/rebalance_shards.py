@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import argparse
+from typing import Dict
+from sqlalchemy.engine import Engine
+from app.core.config import get_settings
+from app.core.database import Base, create_db_engine, engine, shard_router
+from app.core.sharding import shard_metadata
+# Registers the models with the metadata
+from app.models import todo, user  # noqa: F401
+from app.services.shard_service import ShardRebalancer
+
+settings = get_settings()
+
+def parse_draining(values) -> Dict[str, Engine]:
+    draining = {}
+    for value in values:
+        name, _, url = value.partition("=")
+        if not name or not url:
+            raise argparse.ArgumentTypeError(f"expected NAME=URL, got {value!r}")
+        draining[name] = create_db_engine(url)
+    return draining
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Move users' tasks to the shard SHARDS assigns them. Run after changing the shard map."
+    )
+    parser.add_argument(
+        "--drain",
+        action="append",
+        default=[],
+        metavar="NAME=URL",
+        help="Shard removed from SHARDS whose users should be moved off it; repeatable"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only report the users that would move")
+    parser.add_argument(
+        "--create-schema",
+        action="store_true",
+        help="Create missing task tables on the shards first"
+    )
+    args = parser.parse_args()
+
+    if shard_router is None:
+        parser.error("SHARDS is not configured")
+    try:
+        draining = parse_draining(args.drain)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    if args.create_schema:
+        shard_schema = shard_metadata(Base.metadata)
+        for shard_engine in shard_router.engines.values():
+            if shard_engine is not engine:
+                shard_schema.create_all(bind=shard_engine)
+
+    rebalancer = ShardRebalancer(shard_router, settings.UPLOAD_DIR, draining)
+    counts = rebalancer.run(dry_run=args.dry_run)
+    verb = "Would move" if args.dry_run else "Moved"
+    print(f"{verb} {counts['users']} users ({counts['tasks']} tasks, {counts['attachments']} attachments)")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
-from typing import List
+from typing import Any, Dict, List
+from html import escape
 from app.core.config import get_settings
 from app.core.logging import setup_logger
 from pathlib import Path
@@ -53,4 +54,42 @@ class EmailService:
             logger.info(f"Verification email sent to {email}")
         except Exception as e:
             logger.error(f"Failed to send verification email to {email}: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    @staticmethod
+    async def send_task_reminder(email: str, tasks: List[Dict[str, Any]]) -> None:
+        """
+        Send one reminder email listing a user's upcoming tasks.
+
+        Args:
+            email: Recipient email address
+            tasks: Tasks with title and due_date, soonest first
+        """
+        try:
+            items = "".join(
+                f"<li>{escape(task['title'])} (due {task['due_date']:%Y-%m-%d %H:%M} UTC)</li>"
+                for task in tasks
+            )
+            subject = (
+                f"Reminder: {tasks[0]['title']} is due soon"
+                if len(tasks) == 1
+                else f"Reminder: {len(tasks)} tasks are due soon"
+            )
+
+            message = MessageSchema(
+                subject=subject,
+                recipients=[email],
+                body=f"""
+                <h1>Upcoming tasks</h1>
+                <p>The following tasks are due soon:</p>
+                <ul>{items}</ul>
+                """,
+                subtype="html"
+            )
+
+            fm = FastMail(conf)
+            await fm.send_message(message)
+            logger.info(f"Reminder for {len(tasks)} tasks sent to {email}")
+        except Exception as e:
+            logger.error(f"Failed to send reminder email to {email}: {str(e)}")
+            raise
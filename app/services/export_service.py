@@ -0,0 +1,155 @@
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Dict, Iterator, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, shard_names, use_shard
+from app.models.todo import Task, TaskAttachment
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+TASK_FIELDS = [
+    "id", "user_id", "title", "description", "created_at",
+    "due_date", "is_completed", "completed_at",
+]
+
+CSV_FIELDS = TASK_FIELDS + ["attachment_count", "attachment_filenames"]
+
+# Rows fetched per round trip from the server-side cursor
+FETCH_SIZE = 1000
+
+# Output is sent in chunks of about this many bytes
+CHUNK_SIZE = 64 * 1024
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+class ExportService:
+    """Service for streaming task exports."""
+
+    @staticmethod
+    def iter_tasks(db: Session, user_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over tasks with their attachment metadata.
+
+        Rows are read through a server-side cursor FETCH_SIZE at a time as
+        plain rows, not ORM objects, so memory stays flat however many
+        tasks there are.
+
+        Args:
+            db: Database session
+            user_id: Owner to export, or None for all users
+
+        Yields:
+            Dict[str, Any]: Task fields plus an attachments list
+        """
+        stmt = (
+            select(
+                *(getattr(Task, field) for field in TASK_FIELDS),
+                TaskAttachment.id.label("attachment_id"),
+                TaskAttachment.filename,
+                TaskAttachment.content_type,
+                TaskAttachment.created_at.label("attachment_created_at"),
+            )
+            .outerjoin(TaskAttachment, TaskAttachment.task_id == Task.id)
+            .order_by(Task.id, TaskAttachment.id)
+            .execution_options(yield_per=FETCH_SIZE)
+        )
+        if user_id is not None:
+            stmt = stmt.where(Task.user_id == user_id)
+
+        # Attachments are joined in, so consecutive rows can belong to one task
+        for _, rows in groupby(db.execute(stmt), key=lambda row: row.id):
+            rows = list(rows)
+            first = rows[0]
+            task = {field: getattr(first, field) for field in TASK_FIELDS}
+            task["attachments"] = [
+                {
+                    "id": row.attachment_id,
+                    "filename": row.filename,
+                    "content_type": row.content_type,
+                    "created_at": row.attachment_created_at,
+                }
+                for row in rows
+                if row.attachment_id is not None
+            ]
+            yield task
+
+    @staticmethod
+    def to_ndjson(task: Dict[str, Any]) -> str:
+        record = {
+            **task,
+            "created_at": _isoformat(task["created_at"]),
+            "due_date": _isoformat(task["due_date"]),
+            "completed_at": _isoformat(task["completed_at"]),
+            "attachments": [
+                {**attachment, "created_at": _isoformat(attachment["created_at"])}
+                for attachment in task["attachments"]
+            ],
+        }
+        return json.dumps(record, separators=(",", ":")) + "\n"
+
+    @staticmethod
+    def to_csv_row(task: Dict[str, Any]) -> List[Any]:
+        return [
+            *(
+                _isoformat(task[field]) if isinstance(task[field], datetime) else task[field]
+                for field in TASK_FIELDS
+            ),
+            len(task["attachments"]),
+            ";".join(attachment["filename"] for attachment in task["attachments"]),
+        ]
+
+    @staticmethod
+    def stream_export(export_format: str, user_id: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Stream an export in NDJSON or CSV.
+
+        The generator owns its database session, since it outlives the
+        request handler, and reads from the replica when one is configured.
+
+        Args:
+            export_format: ndjson or csv
+            user_id: Owner to export, or None for all users
+
+        Yields:
+            bytes: UTF-8 encoded chunks of about CHUNK_SIZE bytes
+        """
+        db = SessionLocal()
+        db.info.update(read_only=True, user_id=user_id)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if export_format == "csv" else None
+        count = 0
+        try:
+            if writer is not None:
+                writer.writerow(CSV_FIELDS)
+
+            # One user's tasks are on their shard, all users' span every shard
+            for shard in (shard_names() if user_id is None else [None]):
+                with use_shard(db, shard):
+                    for task in ExportService.iter_tasks(db, user_id):
+                        if writer is not None:
+                            writer.writerow(ExportService.to_csv_row(task))
+                        else:
+                            buffer.write(ExportService.to_ndjson(task))
+                        count += 1
+
+                        if buffer.tell() >= CHUNK_SIZE:
+                            yield buffer.getvalue().encode()
+                            buffer.seek(0)
+                            buffer.truncate()
+
+            if buffer.tell():
+                yield buffer.getvalue().encode()
+            logger.info(f"Exported {count} tasks as {export_format} (user: {user_id or 'all'})")
+        finally:
+            db.close()
@@ -0,0 +1,185 @@
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Set
+from sqlalchemy import delete, insert, literal, select, update
+from sqlalchemy.orm import Session
+from app.models.todo import PendingFileDeletion, TaskAttachment
+from app.core.database import shard_names, use_shard
+from app.core.config import get_settings
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+# Files that still cannot be removed after this many attempts are dropped from the queue
+MAX_ATTEMPTS = 5
+
+class FilePurgeService:
+    """Service for removing attachment files from disk in the background."""
+
+    @staticmethod
+    def enqueue_task_files(db: Session, task_id: int) -> None:
+        """
+        Queue a task's attachment files and thumbnails for removal, in the
+        caller's transaction.
+
+        Args:
+            db: Database session
+            task_id: Task whose attachments are being deleted
+        """
+        for column in (TaskAttachment.file_path, TaskAttachment.thumbnail_path):
+            db.execute(
+                insert(PendingFileDeletion).from_select(
+                    ["file_path", "attempts", "created_at"],
+                    select(column, literal(0), literal(datetime.utcnow()))
+                    .where(TaskAttachment.task_id == task_id, column.isnot(None))
+                )
+            )
+
+    @staticmethod
+    def referenced_paths(db: Session, paths: Set[str]) -> Set[str]:
+        """Get which of the paths are attachment files or thumbnails on any shard."""
+        referenced: Set[str] = set()
+        for shard in shard_names():
+            with use_shard(db, shard):
+                referenced.update(db.scalars(
+                    select(TaskAttachment.file_path).where(TaskAttachment.file_path.in_(paths))
+                ))
+                referenced.update(db.scalars(
+                    select(TaskAttachment.thumbnail_path).where(TaskAttachment.thumbnail_path.in_(paths))
+                ))
+        return referenced
+
+    @staticmethod
+    def purge_files(db: Session, batch_size: int = 500) -> Dict[str, int]:
+        """
+        Remove queued files from disk, one batch per transaction.
+
+        A path that is referenced by an attachment again (a new upload
+        reusing the name) is dropped from the queue without touching the
+        file.
+
+        Args:
+            db: Database session
+            batch_size: Queue rows handled per transaction
+
+        Returns:
+            Dict[str, int]: removed, missing, kept and failed file counts
+        """
+        counts = {"removed": 0, "missing": 0, "kept": 0, "failed": 0}
+        last_id = 0
+        while True:
+            pending = db.execute(
+                select(PendingFileDeletion.id, PendingFileDeletion.file_path, PendingFileDeletion.attempts)
+                .where(PendingFileDeletion.id > last_id)
+                .order_by(PendingFileDeletion.id)
+                .limit(batch_size)
+            ).all()
+            if not pending:
+                break
+            last_id = pending[-1].id
+
+            referenced = FilePurgeService.referenced_paths(db, {row.file_path for row in pending})
+            done, failed = [], []
+            for row in pending:
+                if row.file_path in referenced:
+                    counts["kept"] += 1
+                    done.append(row.id)
+                    continue
+                try:
+                    os.remove(row.file_path)
+                    counts["removed"] += 1
+                    done.append(row.id)
+                except FileNotFoundError:
+                    counts["missing"] += 1
+                    done.append(row.id)
+                except OSError as e:
+                    counts["failed"] += 1
+                    if row.attempts + 1 >= MAX_ATTEMPTS:
+                        logger.error(f"Giving up removing {row.file_path}: {str(e)}")
+                        done.append(row.id)
+                    else:
+                        logger.warning(f"Failed to remove {row.file_path}: {str(e)}")
+                        failed.append(row.id)
+
+            if done:
+                db.execute(delete(PendingFileDeletion).where(PendingFileDeletion.id.in_(done)))
+            if failed:
+                db.execute(
+                    update(PendingFileDeletion)
+                    .where(PendingFileDeletion.id.in_(failed))
+                    .values(attempts=PendingFileDeletion.attempts + 1)
+                )
+            db.commit()
+
+            if len(pending) < batch_size:
+                break
+        return counts
+
+    @staticmethod
+    def iter_upload_files(upload_dir: str, min_age_seconds: float) -> Iterator[str]:
+        """Yield paths of regular files in upload_dir older than min_age_seconds."""
+        cutoff = time.time() - min_age_seconds
+        try:
+            entries = os.scandir(upload_dir)
+        except FileNotFoundError:
+            return
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_file(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                        # Same form as the paths stored on attachments
+                        yield os.path.join(upload_dir, entry.name)
+                except OSError:
+                    continue
+
+    @staticmethod
+    def reconcile_orphaned_files(db: Session, batch_size: int = 500) -> Dict[str, int]:
+        """
+        Queue files in the upload directory that no attachment or thumbnail
+        references.
+
+        Files younger than ORPHAN_FILE_MIN_AGE_SECONDS are skipped, since an
+        upload writes its file before the attachment row commits.
+
+        Args:
+            db: Database session
+            batch_size: Paths checked per query
+
+        Returns:
+            Dict[str, int]: scanned files and newly queued orphans
+        """
+        counts = {"scanned": 0, "orphaned": 0}
+        batch: List[str] = []
+
+        def flush() -> None:
+            paths = set(batch)
+            known = FilePurgeService.referenced_paths(db, paths)
+            for shard in shard_names():
+                with use_shard(db, shard):
+                    known.update(db.scalars(
+                        select(PendingFileDeletion.file_path).where(PendingFileDeletion.file_path.in_(paths))
+                    ))
+            orphans = sorted(paths - known)
+            if orphans:
+                now = datetime.utcnow()
+                db.execute(
+                    insert(PendingFileDeletion),
+                    [{"file_path": path, "attempts": 0, "created_at": now} for path in orphans]
+                )
+                db.commit()
+            counts["orphaned"] += len(orphans)
+            batch.clear()
+
+        for path in FilePurgeService.iter_upload_files(settings.UPLOAD_DIR, settings.ORPHAN_FILE_MIN_AGE_SECONDS):
+            counts["scanned"] += 1
+            batch.append(path)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+        if counts["orphaned"]:
+            logger.warning(f"Found {counts['orphaned']} orphaned upload files")
+        return counts
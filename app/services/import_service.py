@@ -0,0 +1,340 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from pydantic import ValidationError
+from sqlalchemy import insert, text, update
+from sqlalchemy.orm import Session
+from app.models.todo import Task
+from app.schemas.todo import TaskCreate
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+IMPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+IMPORT_FIELDS = ("title", "description", "due_date")
+
+class RowParser:
+    """
+    Incremental CSV or NDJSON parser.
+
+    Bytes are fed in arbitrary chunks, as they arrive from a request body
+    or file, and complete records are returned as soon as they are seen.
+    CSV needs a header row; quoted fields may span lines.
+    """
+
+    def __init__(self, import_format: str) -> None:
+        if import_format not in IMPORT_MEDIA_TYPES:
+            raise ValueError(f"Unsupported import format: {import_format}")
+        self.import_format = import_format
+        self.header: Optional[List[str]] = None
+        self.line_number = 0
+        self._buffer = b""
+        self._pending: List[str] = []
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        """
+        Parse a chunk of input.
+
+        Args:
+            chunk: Raw bytes, possibly ending mid-line
+
+        Returns:
+            List[Dict[str, Any]]: Records completed by this chunk, each with
+                its starting line number under "_line"
+        """
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split(b"\n")
+        return self._parse_lines(lines)
+
+    def close(self) -> List[Dict[str, Any]]:
+        """Parse whatever is left once the input ends."""
+        lines, self._buffer = [self._buffer], b""
+        records = self._parse_lines(lines)
+        if self._pending:
+            raise ValueError(f"Unterminated quoted field starting at line {self.line_number - len(self._pending) + 1}")
+        return records
+
+    def _parse_lines(self, lines: List[bytes]) -> List[Dict[str, Any]]:
+        records = []
+        for raw in lines:
+            self.line_number += 1
+            line = raw.decode("utf-8-sig" if self.line_number == 1 else "utf-8").rstrip("\r")
+            if self.import_format == "ndjson":
+                if line.strip():
+                    record = json.loads(line)
+                    if not isinstance(record, dict):
+                        raise ValueError(f"Line {self.line_number}: expected a JSON object")
+                    record["_line"] = self.line_number
+                    records.append(record)
+                continue
+
+            # A CSV record is complete once its quotes are balanced
+            self._pending.append(line)
+            if sum(part.count('"') for part in self._pending) % 2:
+                continue
+            record_text = "\n".join(self._pending)
+            start_line = self.line_number - len(self._pending) + 1
+            self._pending = []
+            if not record_text.strip():
+                continue
+
+            values = next(csv.reader([record_text]))
+            if self.header is None:
+                self.header = [name.strip() for name in values]
+                continue
+            record = dict(zip(self.header, values))
+            record["_line"] = start_line
+            records.append(record)
+        return records
+
+def validate_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate a parsed record against TaskCreate.
+
+    Args:
+        record: Parsed CSV or NDJSON record
+
+    Returns:
+        Dict[str, Any]: Task fields ready to insert
+
+    Raises:
+        ValidationError: If the record is not a valid task
+    """
+    # Empty CSV cells mean "not set"
+    data = {field: record.get(field) if record.get(field) != "" else None for field in IMPORT_FIELDS}
+    row = TaskCreate(**data).dict()
+    if row["due_date"] is not None and row["due_date"].tzinfo is not None:
+        # Stored as naive UTC, like the rest of the timestamps
+        row["due_date"] = row["due_date"].astimezone(timezone.utc).replace(tzinfo=None)
+    return row
+
+class TaskImporter:
+    """
+    Loads validated tasks for one user inside a single transaction.
+
+    On Postgres with psycopg2, batches are streamed with COPY into a
+    temporary staging table and merged into tasks with one INSERT ... SELECT
+    at the end. Other databases (SQLite) get an executemany INSERT per
+    batch. Nothing is visible to other sessions until finish() commits.
+
+    Delta sync reads updated_at, so imported tasks are stamped right before
+    the commit: a stream that took minutes must not show up with times a
+    sync cursor has already passed.
+    """
+
+    def __init__(self, db: Session, user_id: int) -> None:
+        self.db = db
+        self.user_id = user_id
+        self.staged = 0
+        # Tasks may live on a shard, resolve the connection through the Task mapper
+        bind = db.get_bind(Task)
+        self.use_copy = bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2"
+        self._staging_ready = False
+        # Range of the IDs inserted by batches, restamped at commit
+        self._first_id: Optional[int] = None
+        self._last_id: Optional[int] = None
+
+    def add_batch(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Stage a batch of validated rows.
+
+        Args:
+            rows: Task fields from validate_row
+        """
+        if not rows:
+            return
+        if self.use_copy:
+            self._copy_batch(rows)
+        else:
+            now = datetime.utcnow()
+            ids = self.db.execute(
+                insert(Task).returning(Task.id),
+                [
+                    {**row, "user_id": self.user_id, "created_at": now, "updated_at": now, "is_completed": False}
+                    for row in rows
+                ]
+            ).scalars().all()
+            low, high = min(ids), max(ids)
+            self._first_id = low if self._first_id is None else min(self._first_id, low)
+            self._last_id = high if self._last_id is None else max(self._last_id, high)
+        self.staged += len(rows)
+
+    def finish(self) -> int:
+        """
+        Merge staged rows and commit.
+
+        Returns:
+            int: Number of tasks imported
+        """
+        if self.use_copy and self._staging_ready:
+            # now() is the transaction start, clock_timestamp() the time of the merge
+            self.db.execute(
+                text(
+                    "INSERT INTO tasks (title, description, due_date, created_at, updated_at, is_completed, user_id) "
+                    "SELECT title, description, due_date, timezone('utc', now()), timezone('utc', clock_timestamp()), "
+                    "false, :user_id FROM task_import_staging ORDER BY seq"
+                ),
+                {"user_id": self.user_id},
+                bind_arguments={"mapper": Task}
+            )
+        elif self._first_id is not None:
+            # Other tasks of the user created meanwhile may fall in the range;
+            # a later updated_at only sends them to sync clients again
+            self.db.execute(
+                update(Task)
+                .where(
+                    Task.user_id == self.user_id,
+                    Task.id.between(self._first_id, self._last_id)
+                )
+                .values(updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+        self.db.commit()
+        logger.info(f"Imported {self.staged} tasks for user {self.user_id}")
+        return self.staged
+
+    def abort(self) -> None:
+        self.db.rollback()
+
+    def _copy_batch(self, rows: List[Dict[str, Any]]) -> None:
+        # The raw psycopg2 connection of the session's transaction
+        cursor = self.db.connection(bind_arguments={"mapper": Task}).connection.driver_connection.cursor()
+        try:
+            if not self._staging_ready:
+                cursor.execute(
+                    "CREATE TEMP TABLE task_import_staging ("
+                    "seq bigserial, title varchar(100), description text, due_date timestamp"
+                    ") ON COMMIT DROP"
+                )
+                self._staging_ready = True
+
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                # Unquoted empty fields are NULL in COPY csv, quoted empty strings are not
+                writer.writerow([
+                    row["title"],
+                    row["description"],
+                    row["due_date"].isoformat() if row["due_date"] is not None else None,
+                ])
+            buffer.seek(0)
+            cursor.copy_expert(
+                "COPY task_import_staging (title, description, due_date) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+class ImportReport:
+    """Counts and the first errors of an import."""
+
+    def __init__(self, max_errors: int) -> None:
+        self.max_errors = max_errors
+        self.rejected = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def reject(self, line: Any, error: Exception) -> None:
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            if isinstance(error, ValidationError):
+                message = "; ".join(
+                    f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()
+                )
+            else:
+                message = str(error)
+            self.errors.append({"line": line, "error": message})
+
+def validate_batch(records: List[Dict[str, Any]], report: ImportReport) -> List[Dict[str, Any]]:
+    """
+    Validate parsed records, recording rejects in the report.
+
+    Args:
+        records: Records from RowParser
+        report: Report collecting rejected rows
+
+    Returns:
+        List[Dict[str, Any]]: Valid rows
+    """
+    rows = []
+    for record in records:
+        try:
+            rows.append(validate_row(record))
+        except (ValidationError, TypeError) as e:
+            report.reject(record.get("_line"), e)
+    return rows
+
+class ImportJob:
+    """
+    One import: parses fed chunks, validates them and loads them in batches.
+
+    The caller feeds raw bytes as they arrive and calls finish() at the end
+    of the input; any exception should be followed by abort().
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        user_id: int,
+        import_format: str,
+        batch_size: int,
+        max_errors: int,
+        max_rows: Optional[int] = None
+    ) -> None:
+        self.parser = RowParser(import_format)
+        self.importer = TaskImporter(db, user_id)
+        self.report = ImportReport(max_errors)
+        self.batch_size = batch_size
+        self.max_rows = max_rows
+        self._batch: List[Dict[str, Any]] = []
+
+    def feed(self, chunk: bytes) -> None:
+        """
+        Parse a chunk and load every full batch.
+
+        Raises:
+            ValueError: On malformed input or too many rows
+        """
+        self._add(self.parser.feed(chunk))
+
+    def finish(self, before_commit: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+        """
+        Load the last batch and commit.
+
+        Args:
+            before_commit: Called with the number of loaded tasks, inside the
+                import transaction
+
+        Returns:
+            Dict[str, Any]: imported and rejected counts and the first errors
+        """
+        self._add(self.parser.close())
+        self._flush()
+        if before_commit is not None:
+            before_commit(self.importer.staged)
+        imported = self.importer.finish()
+        return {
+            "imported": imported,
+            "rejected": self.report.rejected,
+            "errors": self.report.errors
+        }
+
+    def abort(self) -> None:
+        self.importer.abort()
+
+    def _add(self, records: List[Dict[str, Any]]) -> None:
+        self._batch.extend(validate_batch(records, self.report))
+        if self.max_rows is not None and self.importer.staged + len(self._batch) > self.max_rows:
+            raise ValueError(f"Import exceeds the limit of {self.max_rows} tasks")
+        while len(self._batch) >= self.batch_size:
+            self._batch, rows = self._batch[self.batch_size:], self._batch[:self.batch_size]
+            self.importer.add_batch(rows)
+
+    def _flush(self) -> None:
+        self.importer.add_batch(self._batch)
+        self._batch = []
@@ -0,0 +1,237 @@
+import gc
+import os
+import tracemalloc
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.database import Base
+from app.core.config import get_settings
+from app.core.logging import setup_logger
+from app.utils.rate_limit import rate_limiter
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+# Allocations made by tracemalloc itself or the import machinery are noise
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+KEY_TYPES = ("lineno", "filename", "traceback")
+
+class MemoryDiagnostics:
+    """
+    Tracemalloc-backed memory diagnostics for leak hunting.
+
+    Tracing is off until explicitly started, so the only cost in normal
+    operation is this object. Snapshots are kept in a bounded buffer.
+
+    Tracing and snapshots belong to one worker process, and a multi-worker
+    server spreads requests across workers. Responses carry the worker's
+    pid and snapshot IDs are prefixed with it ("<pid>-<n>"), so a request
+    for another worker's snapshot is refused rather than answered from an
+    unrelated process. For a leak hunt, run a single worker or retry until
+    the request reaches the worker holding the snapshot.
+    """
+
+    def __init__(self, max_snapshots: int, frames: int) -> None:
+        self.max_snapshots = max_snapshots
+        self.frames = frames
+        self._snapshots: "OrderedDict[str, Tuple[datetime, tracemalloc.Snapshot]]" = OrderedDict()
+        self._next_id = 1
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get current tracing status.
+
+        Returns:
+            Dict[str, Any]: Tracing flag, traced memory and stored snapshots
+        """
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "pid": os.getpid(),
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else self.frames,
+            "traced_current_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracing else 0,
+            "snapshots": [
+                {"id": snapshot_id, "taken_at": taken_at}
+                for snapshot_id, (taken_at, _) in self._snapshots.items()
+            ]
+        }
+
+    def start(self, frames: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Start tracing allocations.
+
+        Args:
+            frames: Traceback depth, defaults to MEMORY_TRACE_FRAMES
+
+        Returns:
+            Dict[str, Any]: Tracing status
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames or self.frames)
+            logger.info("Started tracemalloc memory tracing")
+        return self.status()
+
+    def stop(self) -> Dict[str, Any]:
+        """
+        Stop tracing and drop stored snapshots.
+
+        Returns:
+            Dict[str, Any]: Tracing status
+        """
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("Stopped tracemalloc memory tracing")
+        self._snapshots.clear()
+        return self.status()
+
+    def take_snapshot(self) -> Dict[str, Any]:
+        """
+        Take and store a filtered snapshot, evicting the oldest if full.
+
+        Returns:
+            Dict[str, Any]: Snapshot id, timestamp and traced size
+
+        Raises:
+            RuntimeError: If tracing is not started
+        """
+        snapshot = self._take_filtered_snapshot()
+
+        snapshot_id = f"{os.getpid()}-{self._next_id}"
+        self._next_id += 1
+        taken_at = datetime.utcnow()
+        self._snapshots[snapshot_id] = (taken_at, snapshot)
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+
+        return {
+            "id": snapshot_id,
+            "pid": os.getpid(),
+            "taken_at": taken_at,
+            "traced_bytes": sum(stat.size for stat in snapshot.statistics("filename"))
+        }
+
+    def top(
+        self,
+        limit: int = 10,
+        key_type: str = "lineno",
+        snapshot_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the top allocation sites.
+
+        Args:
+            limit: Number of sites to return
+            key_type: Grouping key (lineno, filename or traceback)
+            snapshot_id: Stored snapshot to inspect, defaults to a fresh one
+
+        Returns:
+            List[Dict[str, Any]]: Allocation sites ordered by size
+
+        Raises:
+            RuntimeError: If tracing is not started
+            KeyError: If snapshot does not exist
+            ValueError: If another worker took the snapshot
+        """
+        snapshot = (
+            self._get_snapshot(snapshot_id)
+            if snapshot_id is not None
+            else self._take_filtered_snapshot()
+        )
+        return [
+            {
+                "traceback": stat.traceback.format(),
+                "size_bytes": stat.size,
+                "count": stat.count
+            }
+            for stat in snapshot.statistics(key_type)[:limit]
+        ]
+
+    def diff(
+        self,
+        from_id: str,
+        to_id: Optional[str] = None,
+        limit: int = 10,
+        key_type: str = "lineno"
+    ) -> List[Dict[str, Any]]:
+        """
+        Compare two snapshots and return the largest growth sites.
+
+        Args:
+            from_id: Baseline snapshot id
+            to_id: Snapshot to compare, defaults to a fresh one
+            limit: Number of sites to return
+            key_type: Grouping key (lineno, filename or traceback)
+
+        Returns:
+            List[Dict[str, Any]]: Sites ordered by absolute size difference
+
+        Raises:
+            RuntimeError: If tracing is not started
+            KeyError: If a snapshot does not exist
+            ValueError: If another worker took a snapshot
+        """
+        baseline = self._get_snapshot(from_id)
+        current = (
+            self._get_snapshot(to_id)
+            if to_id is not None
+            else self._take_filtered_snapshot()
+        )
+        return [
+            {
+                "traceback": stat.traceback.format(),
+                "size_bytes": stat.size,
+                "size_diff_bytes": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff
+            }
+            for stat in current.compare_to(baseline, key_type)[:limit]
+        ]
+
+    @staticmethod
+    def object_counts() -> Dict[str, Any]:
+        """
+        Count live ORM instances and rate limiter buckets.
+
+        Returns:
+            Dict[str, Any]: Object counts by type
+        """
+        orm_classes = {mapper.class_ for mapper in Base.registry.mappers}
+        orm_counts: Counter = Counter()
+        for obj in gc.get_objects():
+            if type(obj) in orm_classes:
+                orm_counts[type(obj).__name__] += 1
+
+        return {
+            "gc_tracked_objects": len(gc.get_objects()),
+            "orm_instances": dict(orm_counts),
+            "rate_limiter": rate_limiter.backend.stats()
+        }
+
+    def _take_filtered_snapshot(self) -> tracemalloc.Snapshot:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("Memory tracing is not started")
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    def _get_snapshot(self, snapshot_id: str) -> tracemalloc.Snapshot:
+        pid, _, _ = snapshot_id.partition("-")
+        if pid.isdigit() and int(pid) != os.getpid():
+            raise ValueError(
+                f"Snapshot {snapshot_id} was taken by worker {pid}, this request reached worker {os.getpid()}"
+            )
+        if snapshot_id not in self._snapshots:
+            raise KeyError(snapshot_id)
+        return self._snapshots[snapshot_id][1]
+
+memory_diagnostics = MemoryDiagnostics(
+    max_snapshots=settings.MEMORY_MAX_SNAPSHOTS,
+    frames=settings.MEMORY_TRACE_FRAMES
+)
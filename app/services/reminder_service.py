@@ -0,0 +1,257 @@
+import asyncio
+import heapq
+import time
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import select, text, update
+from sqlalchemy.orm import Session
+from app.models.todo import Task
+from app.core.database import shard_names
+from app.models.user import User
+from app.services.email_service import EmailService
+from app.core.config import get_settings
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+# Spelled as in the ix_tasks_pending_reminder_due_date predicate; is_(False)
+# renders "IS false" (or "= 0" on SQLite), which the planner won't match to it
+NOT_COMPLETED = text("NOT tasks.is_completed")
+
+class ReminderQueue:
+    """
+    Min-heap of near-term reminders ordered by when they are due to be sent.
+
+    Only holds the reminders of the current scan window; the database
+    remains the source of truth and the heap is rebuilt on every scan.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[datetime, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def replace(self, reminders: List[Tuple[datetime, int]]) -> None:
+        """
+        Replace the queue contents.
+
+        Args:
+            reminders: (remind_at, task_id) pairs
+        """
+        self._heap = list(reminders)
+        heapq.heapify(self._heap)
+
+    def push(self, remind_at: datetime, task_id: int) -> None:
+        heapq.heappush(self._heap, (remind_at, task_id))
+
+    def pop_due(self, now: datetime) -> List[int]:
+        """
+        Remove and return the reminders due at now.
+
+        Returns:
+            List[int]: Task IDs, earliest reminder first
+        """
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[1])
+        return due
+
+class ReminderScheduler:
+    """
+    Sends due-date reminder emails lead minutes before tasks are due.
+
+    Every scan_interval seconds the open tasks due in the next window are
+    read through the partial index on pending reminders (a bounded index
+    range scan, never a full table scan) into an in-memory heap. Each run
+    pops the reminders that are due, claims them in the database with a
+    conditional UPDATE ... RETURNING and sends one email per user. The claim
+    only succeeds for rows whose reminder_sent_at is still NULL, so each
+    reminder is sent once even if two workers run the job at the same time;
+    claims of failed sends are released for the next run to retry.
+    """
+
+    def __init__(
+        self,
+        lead_minutes: int,
+        scan_interval_seconds: int,
+        max_late_minutes: int,
+        batch_size: int,
+        max_queue: int,
+        send_concurrency: int,
+        send: Optional[Callable[[str, List[Dict[str, Any]]], Awaitable[None]]] = None
+    ) -> None:
+        self.lead = timedelta(minutes=lead_minutes)
+        self.scan_interval = scan_interval_seconds
+        # Twice the scan interval, so consecutive windows overlap
+        self.window = timedelta(seconds=2 * scan_interval_seconds)
+        self.max_late = timedelta(minutes=max_late_minutes)
+        self.batch_size = batch_size
+        self.max_queue = max_queue
+        self.send_concurrency = send_concurrency
+        self.send = send or EmailService.send_task_reminder
+        self.queue = ReminderQueue()
+        self.horizon: Optional[datetime] = None
+        self._next_scan_at = 0.0
+
+    def run(self, db: Session) -> Dict[str, int]:
+        """
+        Scheduler job: rescan when due, then send the reminders that are due.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Dict[str, int]: Counts for the run
+        """
+        now = datetime.utcnow()
+        result = {}
+        # Also rescan early if a capped scan's horizon is about to be reached
+        if time.monotonic() >= self._next_scan_at or (
+            self.horizon is not None and now + self.lead >= self.horizon
+        ):
+            result["scanned"] = self.scan(db, now)
+            self._next_scan_at = time.monotonic() + self.scan_interval
+        result.update(self.dispatch(db, now))
+        return result
+
+    def scan(self, db: Session, now: datetime) -> int:
+        """
+        Load the reminders of the next window into the queue.
+
+        Args:
+            db: Database session
+            now: Current UTC time
+
+        Returns:
+            int: Number of reminders queued
+        """
+        window_end = now + self.lead + self.window
+        due_dates = db.execute(
+            select(Task.id, Task.due_date)
+            .where(
+                NOT_COMPLETED,
+                Task.reminder_sent_at.is_(None),
+                Task.due_date >= now - self.max_late,
+                Task.due_date < window_end
+            )
+            .order_by(Task.due_date)
+            .limit(self.max_queue)
+        ).all()
+
+        self.queue.replace([(due_date - self.lead, task_id) for task_id, due_date in due_dates])
+        # A capped scan only covers tasks up to the last one loaded
+        self.horizon = due_dates[-1].due_date if len(due_dates) == self.max_queue else window_end
+        return len(due_dates)
+
+    def dispatch(self, db: Session, now: datetime) -> Dict[str, int]:
+        """
+        Claim and send the reminders that are due.
+
+        Args:
+            db: Database session
+            now: Current UTC time
+
+        Returns:
+            Dict[str, int]: claimed, sent, skipped and failed task counts
+        """
+        task_ids = self.queue.pop_due(now)
+        claimed = []
+        for start in range(0, len(task_ids), self.batch_size):
+            claimed.extend(self._claim(db, task_ids[start:start + self.batch_size], now))
+        if not claimed:
+            return {"claimed": 0, "sent": 0, "skipped": 0, "failed": 0}
+        # Sent after all batches are claimed, so each user gets one email per run
+        return {"claimed": len(claimed), **self._send_reminders(db, claimed, now)}
+
+    def _claim(self, db: Session, task_ids: List[int], now: datetime) -> List[Any]:
+        # Conditions are rechecked: the task may have been completed, moved or claimed elsewhere
+        claimed = db.execute(
+            update(Task)
+            .where(
+                Task.id.in_(task_ids),
+                NOT_COMPLETED,
+                Task.reminder_sent_at.is_(None),
+                Task.due_date >= now - self.max_late,
+                Task.due_date <= now + self.lead
+            )
+            # Reminders are not a client-visible change, keep updated_at for delta sync
+            .values(reminder_sent_at=now, updated_at=Task.updated_at)
+            .returning(Task.id, Task.user_id, Task.title, Task.due_date)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+        return claimed
+
+    def _send_reminders(self, db: Session, claimed: List[Any], now: datetime) -> Dict[str, int]:
+        users = {
+            user.id: user
+            for user in db.execute(
+                select(User.id, User.email, User.is_verified)
+                .where(User.id.in_({row.user_id for row in claimed}))
+            )
+        }
+        reminders: Dict[str, List[Any]] = {}
+        skipped = 0
+        rows = sorted(claimed, key=lambda row: (row.user_id, row.due_date))
+        for user_id, user_rows in groupby(rows, key=lambda row: row.user_id):
+            user = users.get(user_id)
+            user_rows = list(user_rows)
+            if user is None or not user.is_verified:
+                # Claimed but never sent, unverified addresses get no mail
+                skipped += len(user_rows)
+                continue
+            reminders[user.email] = user_rows
+
+        # The scheduler runs jobs in a worker thread, which has no event loop of its own
+        failed = asyncio.run(self._send_all(reminders))
+        failed_ids = [row.id for email in failed for row in reminders[email]]
+        if failed_ids:
+            db.execute(
+                update(Task)
+                .where(Task.id.in_(failed_ids), Task.reminder_sent_at == now)
+                .values(reminder_sent_at=None, updated_at=Task.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            # Back into the queue for the next run
+            for email in failed:
+                for row in reminders[email]:
+                    self.queue.push(row.due_date - self.lead, row.id)
+
+        return {
+            "sent": sum(len(rows) for email, rows in reminders.items() if email not in failed),
+            "skipped": skipped,
+            "failed": len(failed_ids)
+        }
+
+    async def _send_all(self, reminders: Dict[str, List[Any]]) -> List[str]:
+        """Send the emails with bounded concurrency; returns the failed addresses."""
+        semaphore = asyncio.Semaphore(self.send_concurrency)
+
+        async def send_one(email: str, rows: List[Any]) -> Optional[str]:
+            async with semaphore:
+                try:
+                    await self.send(email, [{"title": row.title, "due_date": row.due_date} for row in rows])
+                    return None
+                except Exception:
+                    # EmailService has logged the error
+                    return email
+
+        results = await asyncio.gather(*(send_one(email, rows) for email, rows in reminders.items()))
+        return [email for email in results if email is not None]
+
+def create_reminder_scheduler() -> ReminderScheduler:
+    return ReminderScheduler(
+        lead_minutes=settings.REMINDER_LEAD_MINUTES,
+        scan_interval_seconds=settings.REMINDER_SCAN_INTERVAL_SECONDS,
+        max_late_minutes=settings.REMINDER_MAX_LATE_MINUTES,
+        batch_size=settings.REMINDER_BATCH_SIZE,
+        max_queue=settings.REMINDER_QUEUE_MAX,
+        send_concurrency=settings.REMINDER_SEND_CONCURRENCY
+    )
+
+# One queue per shard, task IDs are only unique within a shard
+reminder_schedulers = {shard: create_reminder_scheduler() for shard in shard_names()}
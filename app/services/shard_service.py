@@ -0,0 +1,229 @@
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import delete, insert, select, union
+from sqlalchemy.engine import Engine
+from app.models.todo import ShardMove, Task, TaskAttachment, TaskTombstone
+from app.services.storage_service import StorageService
+from app.services.thumbnail_service import ThumbnailPipeline
+from app.core.sharding import ShardRouter
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+class ShardRebalancer:
+    """
+    Moves users' tasks to the shard the hash ring assigns them.
+
+    Run it after deploying a changed shard map: from then on the app reads
+    and writes each user on their new shard, and this moves what they left
+    behind. Every shard in the map, plus any being drained out of it, is
+    scanned for users it no longer owns. A user is moved by copying their
+    tasks, attachments and tombstones to the new shard in one transaction,
+    renaming their files, then deleting the originals in a second
+    transaction. The copy is recorded in shard_moves on the target, so a
+    run interrupted between the two transactions finishes the move rather
+    than copying the user twice. Task IDs are only unique within a shard,
+    so copies get new IDs; tombstones for the old IDs and a fresh
+    updated_at make delta sync clients swap them over.
+    """
+
+    def __init__(
+        self,
+        router: ShardRouter,
+        upload_dir: str,
+        draining: Optional[Dict[str, Engine]] = None
+    ) -> None:
+        self.router = router
+        self.upload_dir = upload_dir
+        self.sources = {**(draining or {}), **router.engines}
+
+    def misplaced_users(self) -> Iterator[Tuple[str, int, str]]:
+        """
+        Find users with data on a shard other than their own.
+
+        Yields:
+            Tuple[str, int, str]: Source shard, user ID and target shard
+        """
+        for source in sorted(self.sources):
+            with self.sources[source].connect() as conn:
+                user_ids = conn.execute(
+                    union(
+                        select(Task.user_id),
+                        select(TaskTombstone.user_id)
+                    )
+                ).scalars().all()
+            for user_id in sorted(user_ids):
+                target = self.router.shard_for(user_id)
+                if target != source:
+                    yield source, user_id, target
+
+    def move_user(self, source: str, user_id: int, target: str) -> Dict[str, int]:
+        """
+        Move one user's tasks from source to target.
+
+        Resumes a move interrupted after the copy: the target's shard_moves
+        row says the source rows, if still exactly those, were already
+        copied, so only the files and the originals are left to handle.
+
+        Returns:
+            Dict[str, int]: Moved task and attachment counts
+        """
+        source_engine = self.sources[source]
+        target_engine = self.router.engines[target]
+
+        with source_engine.connect() as conn:
+            tasks = conn.execute(
+                select(Task.__table__).where(Task.user_id == user_id).order_by(Task.id)
+            ).mappings().all()
+            attachments = conn.execute(
+                select(TaskAttachment.__table__)
+                .join(Task, Task.id == TaskAttachment.task_id)
+                .where(Task.user_id == user_id)
+                .order_by(TaskAttachment.id)
+            ).mappings().all()
+            tombstones = conn.execute(
+                select(TaskTombstone.task_id, TaskTombstone.deleted_at)
+                .where(TaskTombstone.user_id == user_id)
+            ).all()
+
+        new_ids = self._copied_ids(target_engine, source, user_id, tasks, tombstones)
+        if new_ids is None:
+            new_ids = self._copy(target_engine, source, user_id, target, tasks, attachments, tombstones)
+        else:
+            logger.info(f"Resuming move of user {user_id} from shard {source} to {target}")
+
+        for attachment in attachments:
+            file_path = StorageService.attachment_path(
+                self.upload_dir, target, new_ids[attachment["task_id"]], attachment["filename"]
+            )
+            self._rename(attachment["file_path"], file_path, user_id)
+            if attachment["thumbnail_path"] is not None:
+                self._rename(attachment["thumbnail_path"], ThumbnailPipeline.thumbnail_path(file_path), user_id)
+
+        self._delete_source(source_engine, user_id, list(new_ids))
+        with target_engine.begin() as conn:
+            conn.execute(delete(ShardMove).where(ShardMove.user_id == user_id))
+
+        logger.info(f"Moved user {user_id} from shard {source} to {target}: {len(tasks)} tasks")
+        return {"tasks": len(tasks), "attachments": len(attachments)}
+
+    @staticmethod
+    def _copied_ids(
+        target_engine: Engine,
+        source: str,
+        user_id: int,
+        tasks: List,
+        tombstones: List
+    ) -> Optional[Dict[int, int]]:
+        """The new task IDs of a finished copy of these rows, or None."""
+        with target_engine.connect() as conn:
+            move = conn.execute(select(ShardMove).where(ShardMove.user_id == user_id)).first()
+        if move is None or move.source != source:
+            return None
+        new_ids = {int(old_id): new_id for old_id, new_id in json.loads(move.task_ids).items()}
+        # A stale record, e.g. the user moved back and wrote on the source since
+        if set(new_ids) != {task["id"] for task in tasks}:
+            return None
+        if sorted(json.loads(move.tombstone_ids)) != sorted(task_id for task_id, _ in tombstones):
+            return None
+        return new_ids
+
+    def _copy(
+        self,
+        target_engine: Engine,
+        source: str,
+        user_id: int,
+        target: str,
+        tasks: List,
+        attachments: List,
+        tombstones: List
+    ) -> Dict[int, int]:
+        """Copy the rows to the target and record the move, in one transaction."""
+        now = datetime.utcnow()
+        with target_engine.begin() as conn:
+            # IDs the user already has here, e.g. tasks created since the map changed
+            taken = set(conn.execute(select(Task.id).where(Task.user_id == user_id)).scalars())
+            new_ids: Dict[int, int] = {}
+            for task in tasks:
+                fields = {key: value for key, value in task.items() if key != "id"}
+                new_ids[task["id"]] = conn.execute(
+                    insert(Task).values(**{**fields, "updated_at": now}).returning(Task.id)
+                ).scalar_one()
+
+            for attachment in attachments:
+                fields = {key: value for key, value in attachment.items() if key != "id"}
+                task_id = new_ids[attachment["task_id"]]
+                file_path = StorageService.attachment_path(self.upload_dir, target, task_id, attachment["filename"])
+                thumbnail_path = None
+                if attachment["thumbnail_path"] is not None:
+                    thumbnail_path = ThumbnailPipeline.thumbnail_path(file_path)
+                conn.execute(insert(TaskAttachment).values(
+                    **{**fields, "task_id": task_id, "file_path": file_path, "thumbnail_path": thumbnail_path}
+                ))
+
+            deleted = [
+                {"task_id": task_id, "user_id": user_id, "deleted_at": deleted_at}
+                for task_id, deleted_at in tombstones
+            ]
+            # The old IDs are gone for sync clients, unless the same ID is a live task here,
+            # one the user already had or one of the copies
+            live = taken | set(new_ids.values())
+            deleted.extend(
+                {"task_id": old_id, "user_id": user_id, "deleted_at": now}
+                for old_id in new_ids
+                if old_id not in live
+            )
+            if deleted:
+                conn.execute(insert(TaskTombstone), deleted)
+
+            conn.execute(delete(ShardMove).where(ShardMove.user_id == user_id))
+            conn.execute(insert(ShardMove).values(
+                user_id=user_id,
+                source=source,
+                task_ids=json.dumps({str(old_id): new_id for old_id, new_id in new_ids.items()}),
+                tombstone_ids=json.dumps([task_id for task_id, _ in tombstones]),
+                created_at=now
+            ))
+        return new_ids
+
+    @staticmethod
+    def _rename(old_path: str, new_path: str, user_id: int) -> None:
+        try:
+            os.replace(old_path, new_path)
+        except FileNotFoundError:
+            # Already renamed by an interrupted run
+            if not os.path.exists(new_path):
+                logger.warning(f"Attachment file {old_path} missing while moving user {user_id}")
+
+    @staticmethod
+    def _delete_source(source_engine: Engine, user_id: int, task_ids: List[int]) -> None:
+        with source_engine.begin() as conn:
+            for start in range(0, len(task_ids), 500):
+                batch = task_ids[start:start + 500]
+                conn.execute(delete(TaskAttachment).where(TaskAttachment.task_id.in_(batch)))
+                conn.execute(delete(Task).where(Task.id.in_(batch)))
+            conn.execute(delete(TaskTombstone).where(TaskTombstone.user_id == user_id))
+            # Any record of an earlier move onto the source is done with too
+            conn.execute(delete(ShardMove).where(ShardMove.user_id == user_id))
+
+    def run(self, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Move every misplaced user.
+
+        Args:
+            dry_run: Only count the users that would move
+
+        Returns:
+            Dict[str, int]: Moved user, task and attachment counts
+        """
+        counts = {"users": 0, "tasks": 0, "attachments": 0}
+        for source, user_id, target in list(self.misplaced_users()):
+            counts["users"] += 1
+            if dry_run:
+                logger.info(f"Would move user {user_id} from shard {source} to {target}")
+                continue
+            for key, value in self.move_user(source, user_id, target).items():
+                counts[key] += value
+        return counts
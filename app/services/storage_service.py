@@ -0,0 +1,197 @@
+import os
+from typing import Dict, Optional
+from fastapi import HTTPException, Request, status
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+from starlette.types import Message
+from app.models.todo import Task, TaskAttachment
+from app.models.user import User
+from app.core.database import shard_names, use_shard
+from app.core.config import get_settings
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+# Multipart boundaries and part headers around the file, allowed on top of the quota
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
+def quota_exceeded() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail="Storage quota exceeded"
+    )
+
+class StorageService:
+    """
+    Service for per-user attachment storage quotas.
+
+    Each user carries a running total of their attachment sizes, kept in
+    step with the attachment rows in the same transactions, so checking a
+    quota reads one row instead of summing every attachment.
+    """
+
+    @staticmethod
+    def attachment_path(upload_dir: str, shard: Optional[str], task_id: int, filename: str) -> str:
+        """Get where an upload is stored; task IDs repeat across shards, so
+        sharded names carry the shard."""
+        name = f"{task_id}_{filename}" if shard is None else f"{shard}_{task_id}_{filename}"
+        return os.path.join(upload_dir, name)
+
+    @staticmethod
+    def quota(user: User) -> int:
+        """Get the user's quota in bytes: their override or the default."""
+        if user.storage_quota_bytes is not None:
+            return user.storage_quota_bytes
+        return settings.STORAGE_QUOTA_BYTES
+
+    @staticmethod
+    def remaining(user: User) -> int:
+        return max(StorageService.quota(user) - (user.storage_used_bytes or 0), 0)
+
+    @staticmethod
+    def check_content_length(request: Request, remaining: int) -> None:
+        """
+        Reject an upload whose declared size cannot fit, before any of the
+        body is read.
+
+        Raises:
+            HTTPException: 413 if Content-Length exceeds the remaining quota
+        """
+        content_length = request.headers.get("content-length")
+        if content_length is None:
+            return
+        try:
+            declared = int(content_length)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid Content-Length"
+            )
+        if declared > remaining + MULTIPART_OVERHEAD_BYTES:
+            raise quota_exceeded()
+
+    @staticmethod
+    def limit_body(request: Request, remaining: int) -> Request:
+        """
+        Wrap a request so reading its body stops once it passes the remaining
+        quota, for clients that send no or a false Content-Length.
+
+        Returns:
+            Request: The same request, receiving through the cutoff
+
+        Raises:
+            HTTPException: 413 from the body read that crosses the limit
+        """
+        limit = remaining + MULTIPART_OVERHEAD_BYTES
+        received = 0
+
+        async def receive() -> Message:
+            nonlocal received
+            message = await request.receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise quota_exceeded()
+            return message
+
+        return Request(request.scope, receive)
+
+    @staticmethod
+    def reserve(db: Session, user: User, size: int) -> bool:
+        """
+        Add an upload to the user's total, in the caller's transaction, if
+        it fits the quota.
+
+        The check and the increment are one conditional UPDATE, so
+        concurrent uploads cannot together overshoot the quota.
+
+        Args:
+            db: Database session
+            user: Uploading user
+            size: Upload size in bytes
+
+        Returns:
+            bool: False if the upload does not fit
+        """
+        result = db.execute(
+            update(User)
+            .where(
+                User.id == user.id,
+                User.storage_used_bytes + size <= StorageService.quota(user)
+            )
+            .values(storage_used_bytes=User.storage_used_bytes + size)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+
+    @staticmethod
+    def release_task(db: Session, user_id: int, task_id: int) -> int:
+        """
+        Delete a task's attachment rows and subtract their sizes from its
+        owner's total, in the caller's transaction.
+
+        Only the rows this statement deleted are subtracted, so when two
+        requests delete the same task concurrently the second one, which
+        finds the rows gone once the first commits, releases nothing.
+
+        Returns:
+            int: Bytes released
+        """
+        # Deleted first rather than summed in a subquery, attachments may be on a shard
+        task_bytes = sum(db.execute(
+            delete(TaskAttachment)
+            .where(TaskAttachment.task_id == task_id)
+            .returning(TaskAttachment.size_bytes)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+        if task_bytes:
+            db.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(storage_used_bytes=User.storage_used_bytes - task_bytes)
+                .execution_options(synchronize_session=False)
+            )
+        return task_bytes
+
+    @staticmethod
+    def recalculate(db: Session, user_id: Optional[int] = None) -> int:
+        """
+        Reset running totals from the attachment rows, for repairs after
+        manual changes to the data.
+
+        Args:
+            db: Database session
+            user_id: Only this user; all users when None
+
+        Returns:
+            int: Number of users with attachments
+        """
+        used: Dict[int, int] = {}
+        for shard in shard_names():
+            with use_shard(db, shard):
+                query = (
+                    select(Task.user_id, func.sum(TaskAttachment.size_bytes))
+                    .select_from(TaskAttachment)
+                    .join(Task, Task.id == TaskAttachment.task_id)
+                    .group_by(Task.user_id)
+                )
+                if user_id is not None:
+                    query = query.where(Task.user_id == user_id)
+                for owner_id, total in db.execute(query).tuples():
+                    used[owner_id] = used.get(owner_id, 0) + total
+
+        statement = update(User).execution_options(synchronize_session=False)
+        if user_id is not None:
+            statement = statement.where(User.id == user_id)
+        db.execute(statement.values(storage_used_bytes=0))
+        for owner_id, total in used.items():
+            db.execute(
+                update(User)
+                .where(User.id == owner_id)
+                .values(storage_used_bytes=total)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        logger.info(f"Recalculated storage totals for {len(used)} users with attachments")
+        return len(used)
@@ -0,0 +1,152 @@
+import base64
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session, selectinload
+from app.models.todo import Task, TaskTombstone
+from app.core.config import get_settings
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+Cursor = Tuple[datetime, int]
+
+class SyncService:
+    """Service for delta sync of tasks."""
+
+    @staticmethod
+    def encode_cursor(cursor: Cursor) -> str:
+        timestamp, task_id = cursor
+        return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{task_id}".encode()).decode()
+
+    @staticmethod
+    def decode_cursor(value: str) -> Cursor:
+        """
+        Decode an opaque cursor.
+
+        Raises:
+            HTTPException: If the cursor is malformed
+        """
+        try:
+            timestamp, task_id = base64.urlsafe_b64decode(value.encode()).decode().split("|")
+            return datetime.fromisoformat(timestamp), int(task_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid sync cursor"
+            )
+
+    @staticmethod
+    def get_changes(
+        db: Session,
+        user_id: int,
+        since: Optional[str],
+        limit: int
+    ) -> Dict[str, Any]:
+        """
+        Get the tasks changed and deleted after a cursor.
+
+        Tasks and tombstones are read in (timestamp, task id) order through
+        the per-user indexes, so the cost is proportional to the number of
+        changes, not the number of tasks. Without a cursor all tasks are
+        returned, page by page. Changes younger than the commit grace period
+        are left for the next call, so a transaction that was still in flight
+        when this page was read is not skipped.
+
+        Args:
+            db: Database session
+            user_id: Owner of the tasks
+            since: Cursor from a previous response, or None for a full sync
+            limit: Maximum changes returned
+
+        Returns:
+            Dict[str, Any]: changed tasks, deleted task IDs, the next cursor
+                and whether more changes are waiting
+
+        Raises:
+            HTTPException: 400 for a malformed cursor, 410 when the cursor is
+                older than tombstone retention and a full sync is needed
+        """
+        upper = datetime.utcnow() - timedelta(seconds=settings.SYNC_COMMIT_GRACE_SECONDS)
+        cursor = SyncService.decode_cursor(since) if since else None
+        if cursor is not None and cursor[0] < upper - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Sync cursor expired, a full sync is required"
+            )
+
+        tasks_query = (
+            select(Task)
+            .options(selectinload(Task.attachments))
+            .where(Task.user_id == user_id, Task.updated_at <= upper)
+            .order_by(Task.updated_at, Task.id)
+            .limit(limit + 1)
+        )
+        if cursor is not None:
+            tasks_query = tasks_query.where(tuple_(Task.updated_at, Task.id) > cursor)
+        changes = [((task.updated_at, task.id), task) for task in db.scalars(tasks_query)]
+
+        # A full sync has nothing to delete
+        if cursor is not None:
+            tombstones = db.execute(
+                select(TaskTombstone.deleted_at, TaskTombstone.task_id)
+                .where(
+                    TaskTombstone.user_id == user_id,
+                    TaskTombstone.deleted_at <= upper,
+                    tuple_(TaskTombstone.deleted_at, TaskTombstone.task_id) > cursor
+                )
+                .order_by(TaskTombstone.deleted_at, TaskTombstone.task_id)
+                .limit(limit + 1)
+            )
+            changes.extend(((deleted_at, task_id), None) for deleted_at, task_id in tombstones)
+            changes.sort(key=lambda change: change[0])
+
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        if has_more:
+            next_cursor = changes[-1][0]
+        else:
+            # Caught up to the grace boundary; never move a cursor backwards
+            next_cursor = max(cursor, (upper, 0)) if cursor is not None else (upper, 0)
+        return {
+            "changed": [task for _, task in changes if task is not None],
+            "deleted": [key[1] for key, task in changes if task is None],
+            "cursor": SyncService.encode_cursor(next_cursor),
+            "has_more": has_more
+        }
+
+    @staticmethod
+    def cleanup_tombstones(db: Session, batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Delete tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS in batches.
+
+        Args:
+            db: Database session
+            batch_size: Maximum rows deleted per statement
+
+        Returns:
+            Dict[str, int]: Number of deleted rows
+        """
+        cutoff = datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        total = 0
+        try:
+            while True:
+                expired_ids = db.query(TaskTombstone.id).filter(
+                    TaskTombstone.deleted_at < cutoff
+                ).limit(batch_size).scalar_subquery()
+
+                count = db.query(TaskTombstone).filter(
+                    TaskTombstone.id.in_(expired_ids)
+                ).delete(synchronize_session=False)
+                db.commit()
+
+                total += count
+                if count < batch_size:
+                    break
+        except Exception as e:
+            logger.error(f"Error cleaning up task tombstones: {str(e)}")
+            db.rollback()
+            raise
+        return {"task_tombstones": total}
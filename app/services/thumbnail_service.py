@@ -0,0 +1,191 @@
+import asyncio
+import multiprocessing
+import os
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Set
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
+from app.core.database import SessionLocal
+from app.models.todo import Task, TaskAttachment
+from app.utils.thumbnails import THUMBNAIL_CONTENT_TYPES, init_worker, render_thumbnail
+from app.core.config import get_settings
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+settings = get_settings()
+
+# Workers are replaced after this many jobs, so leaks in the decoders cannot build up
+MAX_JOBS_PER_WORKER = 100
+
+class ThumbnailPipeline:
+    """
+    Generates attachment thumbnails in a process pool.
+
+    Decoding images and rasterizing PDFs is CPU-bound and can allocate a
+    lot, so it runs in separate worker processes: concurrency is capped by
+    the number of workers, memory per job by an address-space limit in each
+    worker, and at most max_pending jobs are queued. The pool is started on
+    first use, with spawn so workers do not inherit the server's threads
+    and connections.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_pending: int,
+        max_size: int,
+        max_pixels: int,
+        memory_limit_mb: int
+    ) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_size = max_size
+        self.max_pixels = max_pixels
+        self.memory_limit_bytes = memory_limit_mb * 1024 * 1024
+        self.generated = 0
+        self.failed = 0
+        self.dropped = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def supports(content_type: Optional[str]) -> bool:
+        return content_type in THUMBNAIL_CONTENT_TYPES
+
+    @staticmethod
+    def thumbnail_path(file_path: str) -> str:
+        """Thumbnails are stored next to the original."""
+        return f"{file_path}.thumb.jpg"
+
+    def has_capacity(self) -> bool:
+        return len(self._jobs) < self.max_pending
+
+    def submit(
+        self,
+        attachment_id: int,
+        file_path: str,
+        content_type: str,
+        user_id: Optional[int] = None
+    ) -> bool:
+        """
+        Queue thumbnail generation for an attachment; must be called on the event loop.
+
+        The owner's user_id routes the status update to their shard.
+
+        Returns:
+            bool: False if the queue is full and the job was dropped
+        """
+        if not self.has_capacity():
+            self.dropped += 1
+            logger.warning(f"Thumbnail queue full, skipping attachment {attachment_id}")
+            return False
+        job = asyncio.create_task(self._generate(attachment_id, file_path, content_type, user_id))
+        self._jobs.add(job)
+        job.add_done_callback(self._jobs.discard)
+        return True
+
+    async def _generate(
+        self,
+        attachment_id: int,
+        file_path: str,
+        content_type: str,
+        user_id: Optional[int]
+    ) -> None:
+        dest_path = self.thumbnail_path(file_path)
+        try:
+            loop = asyncio.get_running_loop()
+            width, height = await loop.run_in_executor(
+                self._get_pool(),
+                render_thumbnail,
+                file_path,
+                content_type,
+                dest_path,
+                self.max_size,
+                self.max_pixels
+            )
+            await run_in_threadpool(self._set_status, attachment_id, "ready", dest_path, user_id)
+            self.generated += 1
+            logger.info(f"Thumbnail {width}x{height} generated for attachment {attachment_id}")
+        except Exception as e:
+            self.failed += 1
+            if isinstance(e, BrokenProcessPool):
+                # A worker died, e.g. killed for memory; start a fresh pool for the next job
+                self._shutdown_pool()
+            logger.error(f"Thumbnail generation failed for attachment {attachment_id}: {e!r}")
+            try:
+                if os.path.exists(dest_path):
+                    os.remove(dest_path)
+                await run_in_threadpool(self._set_status, attachment_id, "failed", None, user_id)
+            except Exception as status_error:
+                logger.error(f"Could not record thumbnail failure: {str(status_error)}")
+
+    @staticmethod
+    def _set_status(
+        attachment_id: int,
+        status: str,
+        thumbnail_path: Optional[str],
+        user_id: Optional[int]
+    ) -> None:
+        db = SessionLocal(info={"user_id": user_id})
+        try:
+            task_id = db.scalar(
+                update(TaskAttachment)
+                .where(TaskAttachment.id == attachment_id)
+                .values(thumbnail_status=status, thumbnail_path=thumbnail_path)
+                .returning(TaskAttachment.task_id)
+            )
+            if task_id is None:
+                # Deleted while the thumbnail was rendering
+                db.rollback()
+                if thumbnail_path is not None:
+                    os.remove(thumbnail_path)
+                return
+            # Delta sync clients pick up the new thumbnail status
+            db.execute(update(Task).where(Task.id == task_id).values(updated_at=datetime.utcnow()))
+            db.commit()
+        finally:
+            db.close()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(self.memory_limit_bytes,),
+                max_tasks_per_child=MAX_JOBS_PER_WORKER
+            )
+        return self._pool
+
+    def _shutdown_pool(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def shutdown(self) -> None:
+        """Wait briefly for running jobs, then stop the workers."""
+        if self._jobs:
+            await asyncio.wait(set(self._jobs), timeout=5)
+        for job in set(self._jobs):
+            job.cancel()
+        self._shutdown_pool()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": self._pool is not None,
+            "pending": len(self._jobs),
+            "generated": self.generated,
+            "failed": self.failed,
+            "dropped": self.dropped
+        }
+
+thumbnail_pipeline = ThumbnailPipeline(
+    workers=settings.THUMBNAIL_WORKERS,
+    max_pending=settings.THUMBNAIL_MAX_PENDING,
+    max_size=settings.THUMBNAIL_MAX_SIZE,
+    max_pixels=settings.THUMBNAIL_MAX_PIXELS,
+    memory_limit_mb=settings.THUMBNAIL_MEMORY_LIMIT_MB
+)
@@ -1,6 +1,9 @@
 from datetime import datetime, timedelta
+from typing import Dict, List
+from fastapi import HTTPException, status
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
-from app.models.user import RefreshToken, BlacklistedToken
+from app.models.user import User, RefreshToken, BlacklistedToken
 from app.core.security import SecurityService
 from app.core.config import get_settings
 from app.core.logging import setup_logger
@@ -37,9 +40,9 @@ class TokenService:
         """Check if refresh token is valid and not revoked."""
         try:
             refresh_token = db.query(RefreshToken).filter(
-                RefreshToken.token == token,
+                RefreshToken.token_hash == SecurityService.hash_token(token),
                 RefreshToken.expires_at > datetime.utcnow(),
-                RefreshToken.is_revoked == False
+                ~RefreshToken.is_revoked
             ).first()
             
             return bool(refresh_token)
@@ -48,6 +51,183 @@ class TokenService:
             logger.error(f"Refresh token validation error: {str(e)}")
             return False
 
+    @staticmethod
+    def rotate_refresh_token(token: str, db: Session) -> Dict[str, str]:
+        """
+        Atomically exchange a refresh token for a new token pair.
+        
+        The old token is revoked with a single conditional UPDATE that
+        returns the owner's id and email, then the replacement is inserted
+        in the same transaction. Concurrent refreshes with one token
+        serialize on the row lock and exactly one of them wins.
+        
+        A token presented again after it was rotated is treated as a
+        concurrent retry within REFRESH_TOKEN_REUSE_GRACE_SECONDS, and as
+        token theft after that, which revokes every session of the user.
+        
+        Args:
+            token: Refresh token from the client
+            db: Database session
+            
+        Returns:
+            Dict[str, str]: New access and refresh tokens
+            
+        Raises:
+            HTTPException: 401 if token is invalid or reused, 409 if it was
+                just rotated by a concurrent request
+        """
+        now = datetime.utcnow()
+        invalid_exception = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+        
+        try:
+            rotated = db.execute(
+                update(RefreshToken)
+                .where(
+                    RefreshToken.token_hash == SecurityService.hash_token(token),
+                    ~RefreshToken.is_revoked,
+                    RefreshToken.expires_at > now
+                )
+                .values(is_revoked=True, revoked_at=now)
+                .returning(
+                    RefreshToken.user_id,
+                    select(User.email)
+                    .where(User.id == RefreshToken.user_id)
+                    .scalar_subquery()
+                )
+                .execution_options(synchronize_session=False)
+            ).first()
+            
+            if rotated is None:
+                db.rollback()
+                TokenService._handle_failed_rotation(token, now, db)
+                raise invalid_exception
+            
+            user_id, email = rotated
+            new_refresh_token = SecurityService.generate_refresh_token()
+            db.execute(
+                insert(RefreshToken).values(
+                    token_hash=SecurityService.hash_token(new_refresh_token),
+                    user_id=user_id,
+                    expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+                    created_at=now,
+                    is_revoked=False
+                )
+            )
+            db.commit()
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error rotating refresh token: {str(e)}")
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Token refresh failed"
+            )
+        
+        access_token = SecurityService.create_access_token(
+            data={"sub": email},
+            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        )
+        
+        return {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "refresh_token": new_refresh_token
+        }
+
+    @staticmethod
+    def _handle_failed_rotation(token: str, now: datetime, db: Session) -> None:
+        """Detect reuse of an already rotated refresh token."""
+        record = db.query(
+            RefreshToken.user_id,
+            RefreshToken.is_revoked,
+            RefreshToken.revoked_at
+        ).filter(RefreshToken.token_hash == SecurityService.hash_token(token)).first()
+        
+        if record is None or not record.is_revoked:
+            # Unknown or expired token
+            return
+        
+        grace = timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS)
+        if record.revoked_at and now - record.revoked_at <= grace:
+            # Only a retry if the rotation's successor is still live
+            successor = db.query(RefreshToken.id).filter(
+                RefreshToken.user_id == record.user_id,
+                ~RefreshToken.is_revoked,
+                RefreshToken.created_at >= record.revoked_at
+            ).first()
+        else:
+            successor = None
+        
+        if successor is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Refresh token was already rotated by a concurrent request"
+            )
+        
+        logger.warning(f"Refresh token reuse detected for user ID: {record.user_id}")
+        db.query(RefreshToken).filter(
+            RefreshToken.user_id == record.user_id,
+            ~RefreshToken.is_revoked
+        ).update({
+            "is_revoked": True,
+            "revoked_at": now
+        }, synchronize_session=False)
+        db.commit()
+
+    @staticmethod
+    def list_active_sessions(user_id: int, db: Session) -> List[RefreshToken]:
+        """
+        List a user's active refresh token sessions, newest first.
+        
+        Served by the partial index on non-revoked tokens.
+        
+        Args:
+            user_id: User ID
+            db: Database session
+            
+        Returns:
+            List[RefreshToken]: Active sessions
+        """
+        return db.query(RefreshToken).filter(
+            RefreshToken.user_id == user_id,
+            ~RefreshToken.is_revoked,
+            RefreshToken.expires_at > datetime.utcnow()
+        ).order_by(RefreshToken.expires_at.desc()).all()
+
+    @staticmethod
+    def revoke_session(user_id: int, session_id: int, db: Session) -> bool:
+        """
+        Revoke a single session of a user.
+        
+        Args:
+            user_id: User ID
+            session_id: Refresh token ID
+            db: Database session
+            
+        Returns:
+            bool: True if an active session was revoked
+        """
+        try:
+            count = db.query(RefreshToken).filter(
+                RefreshToken.id == session_id,
+                RefreshToken.user_id == user_id,
+                ~RefreshToken.is_revoked
+            ).update({
+                "is_revoked": True,
+                "revoked_at": datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+            return count > 0
+        except Exception as e:
+            logger.error(f"Error revoking session: {str(e)}")
+            db.rollback()
+            raise
+
     @staticmethod
     async def revoke_all_user_tokens(user_id: int, db: Session) -> None:
         """Revoke all tokens for a user (useful for logout or security breach)."""
@@ -55,7 +235,7 @@ class TokenService:
             # Revoke refresh tokens
             db.query(RefreshToken).filter(
                 RefreshToken.user_id == user_id,
-                RefreshToken.is_revoked == False
+                ~RefreshToken.is_revoked
             ).update({
                 "is_revoked": True,
                 "revoked_at": datetime.utcnow()
@@ -68,22 +248,43 @@ class TokenService:
             raise
 
     @staticmethod
-    async def cleanup_expired_tokens(db: Session) -> None:
-        """Clean up expired tokens from database."""
-        try:
-            now = datetime.utcnow()
+    def cleanup_expired_tokens(db: Session, batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Delete expired refresh and blacklisted tokens in bounded batches.
+        
+        Each batch is its own short transaction, so the cleanup never holds
+        long locks or builds one huge delete.
+        
+        Args:
+            db: Database session
+            batch_size: Maximum rows deleted per statement
             
-            # Delete expired refresh tokens
-            db.query(RefreshToken).filter(
-                RefreshToken.expires_at < now
-            ).delete()
-            
-            # Delete expired blacklisted tokens
-            db.query(BlacklistedToken).filter(
-                BlacklistedToken.expires_at < now
-            ).delete()
-            
-            db.commit()
-        except Exception as e:
-            logger.error(f"Error cleaning up tokens: {str(e)}")
-            db.rollback()
\ No newline at end of file
+        Returns:
+            Dict[str, int]: Number of deleted rows per table
+        """
+        now = datetime.utcnow()
+        deleted = {}
+        
+        for model in (RefreshToken, BlacklistedToken):
+            total = 0
+            try:
+                while True:
+                    expired_ids = db.query(model.id).filter(
+                        model.expires_at < now
+                    ).limit(batch_size).scalar_subquery()
+                    
+                    count = db.query(model).filter(
+                        model.id.in_(expired_ids)
+                    ).delete(synchronize_session=False)
+                    db.commit()
+                    
+                    total += count
+                    if count < batch_size:
+                        break
+            except Exception as e:
+                logger.error(f"Error cleaning up {model.__tablename__}: {str(e)}")
+                db.rollback()
+                raise
+            deleted[model.__tablename__] = total
+        
+        return deleted
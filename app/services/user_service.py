@@ -1,5 +1,4 @@
 from datetime import datetime, timedelta
-import uuid
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from typing import Dict, Optional
@@ -77,10 +76,29 @@ class UserService:
                 return None
             if not SecurityService.verify_password(password, user.password_hash):
                 return None
+            if SecurityService.password_needs_rehash(user.password_hash):
+                UserService._rehash_password(db, user, password)
             return user
         except Exception as e:
             logger.error(f"Error authenticating user: {str(e)}")
             return None
+
+    @staticmethod
+    def _rehash_password(db: Session, user: User, password: str) -> None:
+        """
+        Replace a password hash made with an outdated algorithm or work factor.
+        
+        The plain password is only known at login, so this is where hashes
+        move to the current policy. A failure leaves the old hash, which
+        still verifies, and does not fail the login.
+        """
+        try:
+            user.password_hash = SecurityService.get_password_hash(password)
+            db.commit()
+            logger.info(f"Rehashed password for user {user.id}")
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Error rehashing password for user {user.id}: {str(e)}")
         
     @staticmethod
     def verify_email(db: Session, token: str) -> bool:
@@ -148,19 +166,13 @@ class UserService:
             )
             
             # Create refresh token
-            refresh_token_str = str(uuid.uuid4())
+            refresh_token_str = SecurityService.generate_refresh_token()
             refresh_token = RefreshToken(
-                token=refresh_token_str,
+                token_hash=SecurityService.hash_token(refresh_token_str),
                 user_id=user.id,
                 expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
             )
             
-            # Clean up old refresh tokens
-            db.query(RefreshToken).filter(
-                RefreshToken.user_id == user.id,
-                RefreshToken.expires_at < datetime.utcnow()
-            ).delete()
-            
             # Save new refresh token
             db.add(refresh_token)
             db.commit()
@@ -1,43 +1,53 @@
-from fastapi import Request
+import logging
 import time
+from typing import Iterable, Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.core.logging import setup_logger
 
 logger = setup_logger(__name__)
 
-async def logging_middleware(request: Request, call_next):
+class LoggingMiddleware:
     """
-    Middleware for logging requests and responses.
+    ASGI middleware for logging requests and responses.
     
-    Args:
-        request: FastAPI request
-        call_next: Next middleware in chain
-        
-    Returns:
-        Response: FastAPI response
+    The response is passed through untouched, so streaming responses are
+    not buffered. Paths in exempt_paths, such as health checks, skip
+    logging entirely.
     """
-    start_time = time.time()
     
-    # Log request
-    logger.info(
-        f"Request: {request.method} {request.url.path} "
-        f"Client: {request.client.host}"
-    )
+    def __init__(self, app: ASGIApp, exempt_paths: Iterable[str] = ()) -> None:
+        self.app = app
+        self.exempt_paths = frozenset(exempt_paths)
     
-    try:
-        response = await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["path"] in self.exempt_paths
+            or not logger.isEnabledFor(logging.INFO)
+        ):
+            await self.app(scope, receive, send)
+            return
         
-        # Log response
-        process_time = (time.time() - start_time) * 1000
-        logger.info(
-            f"Response: {response.status_code} "
-            f"Process Time: {process_time:.2f}ms"
-        )
+        start_time = time.perf_counter()
+        method, path = scope["method"], scope["path"]
+        client = scope.get("client")
+        status_code: Optional[int] = None
+        
+        # Log request
+        logger.info(f"Request: {method} {path} Client: {client[0] if client else 'unknown'}")
         
-        return response
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
         
-    except Exception as e:
-        logger.error(
-            f"Request failed: {request.method} {request.url.path} "
-            f"Error: {str(e)}"
-        )
-        raise
\ No newline at end of file
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            logger.error(f"Request failed: {method} {path} Error: {str(e)}")
+            raise
+        
+        # Log response
+        process_time = (time.perf_counter() - start_time) * 1000
+        logger.info(f"Response: {status_code} Process Time: {process_time:.2f}ms")
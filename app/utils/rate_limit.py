@@ -1,17 +1,25 @@
-from fastapi import Request, HTTPException
-from typing import Dict, Tuple, Optional
+from typing import Iterable, Tuple, Optional, Union
 import time
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 from app.core.logging import setup_logger
 from app.core.config import get_settings
+from app.utils.rate_limit_backends import (
+    MemoryRateLimitBackend,
+    SharedMemoryRateLimitBackend,
+    default_shm_path
+)
 
 logger = setup_logger(__name__)
 settings = get_settings()
 
+RateLimitBackend = Union[MemoryRateLimitBackend, SharedMemoryRateLimitBackend]
+
 class RateLimiter:
     """Rate limiting implementation."""
     
-    def __init__(self) -> None:
-        self.requests: Dict[str, Dict[str, list]] = {}
+    def __init__(self, backend: Optional[RateLimitBackend] = None) -> None:
+        self.backend = backend if backend is not None else MemoryRateLimitBackend()
         self.limits = {
             "/api/v1/auth/signup": 5,  # 5 requests per minute
             "/api/v1/auth/token": 10,  # 10 requests per minute
@@ -30,65 +38,71 @@ class RateLimiter:
             Tuple[bool, Optional[int]]: (is_allowed, retry_after_seconds)
         """
         try:
-            now = time.time()
-            minute_ago = now - 60
-
-            if ip not in self.requests:
-                self.requests[ip] = {}
-            if path not in self.requests[ip]:
-                self.requests[ip][path] = []
-
-            # Clean old requests
-            self.requests[ip][path] = [
-                req for req in self.requests[ip][path] 
-                if req > minute_ago
-            ]
-
             limit = self.limits.get(path, self.limits["default"])
-
-            if len(self.requests[ip][path]) >= limit:
-                retry_after = 60 - int(now - self.requests[ip][path][0])
-                return False, retry_after
-
-            self.requests[ip][path].append(now)
-            return True, None
+            return self.backend.hit(ip, path, limit, time.time())
             
         except Exception as e:
             logger.error(f"Rate limiting error: {str(e)}")
             return True, None  # Allow request in case of error
 
-rate_limiter = RateLimiter()
-
-async def rate_limit_middleware(request: Request, call_next):
+def create_backend() -> RateLimitBackend:
     """
-    Middleware for rate limiting requests.
+    Create the configured rate limit backend.
     
-    Args:
-        request: FastAPI request
-        call_next: Next middleware in chain
-        
     Returns:
-        Response: FastAPI response
+        RateLimitBackend: memory (per worker) or shm (shared by the workers on a host)
+        
+    Raises:
+        ValueError: If RATE_LIMIT_BACKEND is unknown
     """
-    try:
-        client_ip = request.client.host
-        path = request.url.path
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        return MemoryRateLimitBackend()
+    if settings.RATE_LIMIT_BACKEND == "shm":
+        return SharedMemoryRateLimitBackend(
+            settings.RATE_LIMIT_SHM_PATH or default_shm_path(),
+            settings.RATE_LIMIT_SHM_SLOTS,
+            settings.RATE_LIMIT_SHM_STRIPES
+        )
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {settings.RATE_LIMIT_BACKEND}")
+
+rate_limiter = RateLimiter(create_backend())
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware for rate limiting requests.
+    
+    Rejected requests get a 429 response with Retry-After directly, without
+    reaching the app. Paths in exempt_paths are not counted.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: RateLimiter = rate_limiter,
+        exempt_paths: Iterable[str] = ()
+    ) -> None:
+        self.app = app
+        self.limiter = limiter
+        self.exempt_paths = frozenset(exempt_paths)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
         
-        is_allowed, retry_after = rate_limiter.is_allowed(client_ip, path)
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        path = scope["path"]
         
+        is_allowed, retry_after = self.limiter.is_allowed(client_ip, path)
         if not is_allowed:
             logger.warning(f"Rate limit exceeded for IP: {client_ip} on path: {path}")
-            raise HTTPException(
+            response = JSONResponse(
                 status_code=429,
-                detail="Too many requests",
+                content={"detail": "Too many requests"},
                 headers={"Retry-After": str(retry_after)}
             )
+            await response(scope, receive, send)
+            return
         
-        response = await call_next(request)
-        return response
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Rate limiting middleware error: {str(e)}")
-        return await call_next(request)
\ No newline at end of file
+        await self.app(scope, receive, send)
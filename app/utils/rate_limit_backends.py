@@ -0,0 +1,193 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Rate limits are per minute
+WINDOW_SECONDS = 60
+
+class MemoryRateLimitBackend:
+    """
+    Per-process sliding log of request timestamps.
+
+    Exact, but each worker keeps its own log, so with N workers a client
+    can make up to N times the limit.
+    """
+
+    def __init__(self) -> None:
+        self.requests: Dict[str, Dict[str, List[float]]] = {}
+
+    def hit(self, ip: str, path: str, limit: int, now: float) -> Tuple[bool, Optional[int]]:
+        """
+        Record a request if it is under the limit.
+
+        Args:
+            ip: Client IP address
+            path: Request path
+            limit: Requests allowed per minute
+            now: Current UNIX time
+
+        Returns:
+            Tuple[bool, Optional[int]]: (is_allowed, retry_after_seconds)
+        """
+        minute_ago = now - WINDOW_SECONDS
+
+        if ip not in self.requests:
+            self.requests[ip] = {}
+        if path not in self.requests[ip]:
+            self.requests[ip][path] = []
+
+        # Clean old requests
+        self.requests[ip][path] = [
+            req for req in self.requests[ip][path]
+            if req > minute_ago
+        ]
+
+        if len(self.requests[ip][path]) >= limit:
+            retry_after = WINDOW_SECONDS - int(now - self.requests[ip][path][0])
+            return False, retry_after
+
+        self.requests[ip][path].append(now)
+        return True, None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "clients": len(self.requests),
+            "buckets": sum(len(paths) for paths in self.requests.values()),
+            "timestamps": sum(
+                len(entries)
+                for paths in self.requests.values()
+                for entries in paths.values()
+            )
+        }
+
+class SharedMemoryRateLimitBackend:
+    """
+    Sliding window counters in a memory-mapped hash table shared by all
+    worker processes on a host.
+
+    Each slot holds a key hash, the current window number and the counts for
+    the current and previous window; the previous count is weighted by how
+    much of it still overlaps the last 60 seconds. Keys probe within a
+    fixed bucket of slots, and each bucket is guarded by one of a set of
+    striped locks: a thread lock within the process and an fcntl byte-range
+    lock across processes. When a bucket is full of live keys, the least
+    recently active one is evicted.
+    """
+
+    SLOT = struct.Struct("<QqII")  # key hash, window, current count, previous count
+    BUCKET_SLOTS = 8
+    BUCKET = struct.Struct("<" + "QqII" * BUCKET_SLOTS)
+
+    def __init__(self, path: str, slots: int, stripes: int) -> None:
+        import fcntl  # POSIX only, imported here so the memory backend works everywhere
+
+        self._fcntl = fcntl
+        self.path = path
+        self.buckets = max(1, slots // self.BUCKET_SLOTS)
+        self.slots = self.buckets * self.BUCKET_SLOTS
+        self.stripes = max(1, stripes)
+        self._thread_locks = [threading.Lock() for _ in range(self.stripes)]
+
+        size = self.slots * self.SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size != size:
+            # A zero-filled table is empty, workers starting together all agree on it
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+
+    @staticmethod
+    def key_hash(ip: str, path: str) -> int:
+        # Python's hash() is salted per process, so use a stable digest; 0 marks an empty slot
+        digest = hashlib.blake2b(f"{ip}|{path}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def hit(self, ip: str, path: str, limit: int, now: float) -> Tuple[bool, Optional[int]]:
+        """
+        Record a request if it is under the limit.
+
+        Args:
+            ip: Client IP address
+            path: Request path
+            limit: Requests allowed per minute
+            now: Current UNIX time
+
+        Returns:
+            Tuple[bool, Optional[int]]: (is_allowed, retry_after_seconds)
+        """
+        key = self.key_hash(ip, path)
+        bucket = key % self.buckets
+        stripe = bucket % self.stripes
+        window = int(now // WINDOW_SECONDS)
+        elapsed = now - window * WINDOW_SECONDS
+
+        with self._thread_locks[stripe]:
+            self._fcntl.lockf(self._fd, self._fcntl.LOCK_EX, 1, stripe)
+            try:
+                offset, current, previous = self._find_slot(key, bucket, window)
+                estimate = previous * (WINDOW_SECONDS - elapsed) / WINDOW_SECONDS + current
+                if estimate >= limit:
+                    return False, self._retry_after(current, previous, limit, elapsed)
+                self.SLOT.pack_into(self._map, offset, key, window, current + 1, previous)
+                return True, None
+            finally:
+                self._fcntl.lockf(self._fd, self._fcntl.LOCK_UN, 1, stripe)
+
+    def _find_slot(self, key: int, bucket: int, window: int) -> Tuple[int, int, int]:
+        """Find or claim the key's slot; returns its offset and counts rolled to window."""
+        start = bucket * self.BUCKET.size
+        # One unpack per bucket: key, window, current and previous for each slot
+        fields = self.BUCKET.unpack_from(self._map, start)
+        keys = fields[0::4]
+
+        if key in keys:
+            i = keys.index(key) * 4
+            offset = start + i // 4 * self.SLOT.size
+            slot_window, current, previous = fields[i + 1], fields[i + 2], fields[i + 3]
+            if slot_window == window:
+                return offset, current, previous
+            if slot_window == window - 1:
+                return offset, 0, current
+            return offset, 0, 0
+
+        # Claim an empty or expired slot, else evict the least recently active key
+        if 0 in keys:
+            slot = keys.index(0)
+        else:
+            windows = fields[1::4]
+            slot = windows.index(min(windows))
+        return start + slot * self.SLOT.size, 0, 0
+
+    @staticmethod
+    def _retry_after(current: int, previous: int, limit: int, elapsed: float) -> int:
+        if current < limit and previous:
+            # Wait until enough of the previous window has slid out
+            wait = WINDOW_SECONDS * (1 - (limit - current) / previous) - elapsed
+        else:
+            wait = WINDOW_SECONDS - elapsed
+        return max(1, math.ceil(wait))
+
+    def stats(self) -> Dict[str, Any]:
+        used = sum(
+            1
+            for bucket in range(self.buckets)
+            for key in self.BUCKET.unpack_from(self._map, bucket * self.BUCKET.size)[0::4]
+            if key
+        )
+        return {
+            "backend": "shm",
+            "path": self.path,
+            "slots": self.slots,
+            "used_slots": used,
+            "stripes": self.stripes
+        }
+
+def default_shm_path() -> str:
+    """Prefer tmpfs so the table never touches disk."""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "todoapp-rate-limit")
@@ -0,0 +1,91 @@
+# Thumbnail rendering, run inside pool worker processes. Keep imports light:
+# spawned workers import this module to unpickle the job and must not pull in
+# the app, its settings or database engines.
+from typing import Tuple
+
+THUMBNAIL_CONTENT_TYPES = (
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+    "application/pdf",
+)
+
+IMAGE_FORMATS = ("JPEG", "PNG", "GIF", "WEBP")
+
+THUMBNAIL_MEDIA_TYPE = "image/jpeg"
+
+def init_worker(memory_limit_bytes: int) -> None:
+    """
+    Pool initializer capping the worker's address space.
+
+    Workers run one job at a time, so this is the memory cap per job; a job
+    exceeding it fails with MemoryError instead of growing the host.
+    """
+    if memory_limit_bytes <= 0:
+        return
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+    except (ImportError, ValueError, OSError):
+        # Not available on this platform, run uncapped
+        pass
+
+def render_thumbnail(
+    source_path: str,
+    content_type: str,
+    dest_path: str,
+    max_size: int,
+    max_pixels: int
+) -> Tuple[int, int]:
+    """
+    Render a JPEG thumbnail of an image or the first page of a PDF.
+
+    Args:
+        source_path: Original file
+        content_type: MIME type of the original
+        dest_path: Where to write the thumbnail
+        max_size: Longest side of the thumbnail in pixels
+        max_pixels: Largest source image accepted, against decompression bombs
+
+    Returns:
+        Tuple[int, int]: Thumbnail width and height
+
+    Raises:
+        ValueError: If the content type is not supported or the source too large
+    """
+    from PIL import Image
+
+    Image.MAX_IMAGE_PIXELS = max_pixels
+
+    if content_type == "application/pdf":
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(source_path)
+        try:
+            page = pdf[0]
+            width, height = page.get_size()
+            # Render straight at thumbnail scale, never at full page size
+            image = page.render(scale=max_size / max(width, height)).to_pil()
+            page.close()
+        finally:
+            pdf.close()
+    elif content_type in THUMBNAIL_CONTENT_TYPES:
+        # Decode only the formats we advertise, whatever the file claims to be
+        image = Image.open(source_path, formats=IMAGE_FORMATS)
+        # JPEG can decode at a reduced scale, which saves most of the memory
+        image.draft("RGB", (max_size, max_size))
+    else:
+        raise ValueError(f"Unsupported content type: {content_type}")
+
+    image.thumbnail((max_size, max_size))
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+
+    image.save(dest_path, "JPEG", quality=80, optimize=True)
+    return image.size
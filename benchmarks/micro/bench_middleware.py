@@ -0,0 +1,86 @@
+import asyncio
+import itertools
+import logging
+import sys
+
+import pytest
+from fastapi import FastAPI
+
+from app.utils.logging import LoggingMiddleware
+from app.utils.rate_limit import RateLimiter, RateLimitMiddleware
+
+HEALTH_PATH = "/"
+API_PATH = "/api/v1/tasks/ping"
+
+
+def make_app(with_middleware: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get(HEALTH_PATH)
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get(API_PATH)
+    async def ping():
+        return {"ok": True}
+
+    if with_middleware:
+        # Same stack as main.app, with limits lifted so every request is admitted
+        limiter = RateLimiter()
+        limiter.limits = {path: sys.maxsize for path in limiter.limits}
+        app.add_middleware(RateLimitMiddleware, limiter=limiter, exempt_paths={HEALTH_PATH})
+        app.add_middleware(LoggingMiddleware, exempt_paths={HEALTH_PATH})
+    return app
+
+
+# Rotate client addresses so the limiter's per-client logs stay short
+CLIENTS = itertools.cycle([f"10.0.{i >> 8}.{i & 255}" for i in range(65536)])
+
+
+def call(app, path, loop):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": (next(CLIENTS), 1234),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    loop.run_until_complete(app(scope, receive, send))
+
+
+@pytest.fixture(scope="module")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs(monkeypatch):
+    # Records are still built, but the handlers are not part of the measurement
+    for name in ("app.utils.logging", "app.utils.rate_limit"):
+        logger = logging.getLogger(name)
+        monkeypatch.setattr(logger, "handlers", [logging.NullHandler()])
+        monkeypatch.setattr(logger, "propagate", False)
+
+
+@pytest.mark.parametrize("with_middleware", [False, True], ids=["bare", "middleware"])
+@pytest.mark.parametrize("path", [HEALTH_PATH, API_PATH], ids=["health", "api"])
+def test_request_overhead(benchmark, loop, with_middleware, path):
+    app = make_app(with_middleware)
+    call(app, path, loop)  # build the middleware stack outside the timing
+    benchmark(call, app, path, loop)
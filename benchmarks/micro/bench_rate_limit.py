@@ -0,0 +1,36 @@
+import itertools
+
+import pytest
+
+from app.utils.rate_limit import RateLimiter
+from app.utils.rate_limit_backends import MemoryRateLimitBackend, SharedMemoryRateLimitBackend
+
+PATH = "/api/v1/tasks/"
+
+
+def make_backend(name, clients, tmp_path_factory):
+    if name == "memory":
+        return MemoryRateLimitBackend()
+    # Twice as many slots as clients, as a deployment would size the table
+    path = tmp_path_factory.mktemp("rate-limit") / "table"
+    return SharedMemoryRateLimitBackend(str(path), slots=clients * 2, stripes=64)
+
+
+@pytest.fixture(scope="module", params=["memory", "shm"])
+def backend_name(request):
+    return request.param
+
+
+@pytest.fixture(scope="module", params=[10_000, 1_000_000], ids=["10k_ips", "1m_ips"])
+def populated_limiter(request, backend_name, tmp_path_factory):
+    limiter = RateLimiter(make_backend(backend_name, request.param, tmp_path_factory))
+    ips = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(request.param)]
+    for ip in ips:
+        limiter.is_allowed(ip, PATH)
+    return limiter, ips
+
+
+def test_is_allowed(benchmark, populated_limiter):
+    limiter, ips = populated_limiter
+    clients = itertools.cycle(ips)
+    benchmark(lambda: limiter.is_allowed(next(clients), PATH))
@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+import pytest
+
+from app.core.security import SecurityService
+
+PASSWORD = "Bench-Passw0rd!"
+
+
+@pytest.fixture(scope="module")
+def access_token() -> str:
+    return SecurityService.create_access_token(
+        data={"sub": "bench@example.com"},
+        expires_delta=timedelta(minutes=30)
+    )
+
+
+@pytest.fixture(scope="module")
+def password_hash() -> str:
+    return SecurityService.get_password_hash(PASSWORD)
+
+
+def test_create_access_token(benchmark):
+    benchmark(
+        SecurityService.create_access_token,
+        data={"sub": "bench@example.com"},
+        expires_delta=timedelta(minutes=30)
+    )
+
+
+def test_decode_token(benchmark, access_token):
+    payload = benchmark(SecurityService.decode_token, access_token)
+    assert payload["sub"] == "bench@example.com"
+
+
+def test_password_hash(benchmark):
+    benchmark.pedantic(SecurityService.get_password_hash, args=(PASSWORD,), rounds=5)
+
+
+def test_verify_password(benchmark, password_hash):
+    result = benchmark.pedantic(
+        SecurityService.verify_password, args=(PASSWORD, password_hash), rounds=5
+    )
+    assert result
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+# Registers User, which Task's relationship refers to
+import app.models.user  # noqa: F401
+from app.models.todo import Task, TaskAttachment
+from app.schemas.todo import TaskResponse
+
+TASKS_PER_RESPONSE = 50
+
+
+@pytest.fixture(scope="module")
+def tasks() -> List[Task]:
+    now = datetime.utcnow()
+    return [
+        Task(
+            id=i,
+            title=f"Task {i}",
+            description="Lorem ipsum dolor sit amet " * 20,
+            created_at=now,
+            updated_at=now,
+            due_date=now + timedelta(days=i),
+            is_completed=i % 3 == 0,
+            completed_at=now if i % 3 == 0 else None,
+            user_id=1,
+            attachments=[
+                TaskAttachment(
+                    id=i * 10 + j,
+                    filename=f"file-{j}.pdf",
+                    file_path=f"uploads/{i}_file-{j}.pdf",
+                    content_type="application/pdf",
+                    created_at=now,
+                    task_id=i
+                )
+                for j in range(i % 3)
+            ]
+        )
+        for i in range(TASKS_PER_RESPONSE)
+    ]
+
+
+def test_task_response_serialization(benchmark, tasks):
+    adapter = TypeAdapter(List[TaskResponse])
+
+    def serialize() -> bytes:
+        return adapter.dump_json(adapter.validate_python(tasks, from_attributes=True))
+
+    assert benchmark(serialize).startswith(b"[")
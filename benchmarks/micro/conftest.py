@@ -0,0 +1,8 @@
+import os
+
+from benchmarks.load_test import IN_PROCESS_ENV
+
+# App modules read settings at import time; fill in anything not configured
+for key, value in IN_PROCESS_ENV.items():
+    os.environ.setdefault(key, value)
+os.environ.setdefault("DATABASE_URL", "sqlite://")
@@ -86,6 +86,23 @@ class TodoAppStack(Stack):
             removal_policy=RemovalPolicy.DESTROY
         )
 
+        # Read replica for read-only queries, reads fall back to the primary when it lags
+        self.read_replica = rds.DatabaseInstanceReadReplica(
+            self, "TodoAppReadReplica",
+            source_database_instance=self.database,
+            instance_type=ec2.InstanceType.of(
+                ec2.InstanceClass.BURSTABLE3,
+                ec2.InstanceSize.MICRO
+            ),
+            vpc=self.vpc,
+            vpc_subnets=ec2.SubnetSelection(
+                subnet_type=ec2.SubnetType.PRIVATE_ISOLATED
+            ),
+            security_groups=[self.db_security_group],
+            deletion_protection=False,
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
         # ECS Cluster
         self.cluster = ecs.Cluster(
             self, "TodoAppCluster",
@@ -117,6 +134,7 @@ class TodoAppStack(Stack):
             ),
             environment={
                 "ENVIRONMENT": "production",
+                "DB_REPLICA_HOST": self.read_replica.db_instance_endpoint_address,
             },
             secrets={
                 "DATABASE_URL": ecs.Secret.from_secrets_manager(
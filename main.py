@@ -1,36 +1,130 @@
+# Imported first so the startup report includes import time
+from app.core.started import STARTED_AT as STARTUP_STARTED_AT
+
+import time
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from functools import partial
 from typing import AsyncGenerator
 
 # Import database and models
-from app.core.database import Base, engine
 from app.models import user  # This ensures models are registered with SQLAlchemy
 
 # Import routers, middleware, and config
 from app.api.v1.endpoints.auth import router as auth_router
-from app.utils.logging import logging_middleware
-from app.utils.rate_limit import rate_limit_middleware
+from app.api.v1.endpoints import admin, tasks
+from app.utils.logging import LoggingMiddleware
+from app.utils.rate_limit import RateLimitMiddleware
+from app.middleware.admission import AdmissionControlMiddleware, admission_controller
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.idempotency import IdempotencyMiddleware, idempotency_store
+from app.middleware.idempotency_backends import DatabaseIdempotencyStore
 from app.core.config import get_settings
 from app.core.logging import setup_logger
+from app.core.scheduler import scheduler
+from app.core.database import shard_names
+from app.core.password_hashing import password_hasher
+from app.core.change_feed import change_feed
+from app.core.startup import StartupTimer, get_warm_size, prepare_schema, warm_pool
+from app.services.token_service import TokenService
+from app.services.reminder_service import reminder_schedulers
+from app.services.sync_service import SyncService
+from app.services.file_purge_service import FilePurgeService
+from app.services.thumbnail_service import thumbnail_pipeline
 # from prometheus_fastapi_instrumentator import Instrumentator
 
 # Set up logging
 logger = setup_logger(__name__)
 settings = get_settings()
 
+# Periodic background jobs, run by the elected leader worker only
+scheduler.add_job(
+    "token_cleanup",
+    settings.TOKEN_CLEANUP_INTERVAL_SECONDS,
+    partial(
+        TokenService.cleanup_expired_tokens,
+        batch_size=settings.TOKEN_CLEANUP_BATCH_SIZE
+    )
+)
+if settings.IDEMPOTENCY_ENABLED and isinstance(idempotency_store, DatabaseIdempotencyStore):
+    scheduler.add_job(
+        "idempotency_cleanup",
+        settings.IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS,
+        partial(
+            idempotency_store.cleanup,
+            batch_size=settings.IDEMPOTENCY_CLEANUP_BATCH_SIZE
+        )
+    )
+# Jobs over the task tables run once per shard
+for shard in shard_names():
+    suffix = f"[{shard}]" if shard is not None else ""
+    scheduler.add_job(
+        f"tombstone_cleanup{suffix}",
+        settings.TOMBSTONE_CLEANUP_INTERVAL_SECONDS,
+        partial(
+            SyncService.cleanup_tombstones,
+            batch_size=settings.TOMBSTONE_CLEANUP_BATCH_SIZE
+        ),
+        shard=shard
+    )
+    scheduler.add_job(
+        f"file_purge{suffix}",
+        settings.FILE_PURGE_INTERVAL_SECONDS,
+        partial(
+            FilePurgeService.purge_files,
+            batch_size=settings.FILE_PURGE_BATCH_SIZE
+        ),
+        shard=shard
+    )
+    if settings.REMINDERS_ENABLED:
+        scheduler.add_job(
+            f"task_reminders{suffix}",
+            settings.REMINDER_INTERVAL_SECONDS,
+            reminder_schedulers[shard].run,
+            shard=shard
+        )
+# The upload directory is shared: orphans are checked against every shard and queued on the first
+scheduler.add_job(
+    "orphan_file_reconcile",
+    settings.ORPHAN_RECONCILE_INTERVAL_SECONDS,
+    partial(
+        FilePurgeService.reconcile_orphaned_files,
+        batch_size=settings.FILE_PURGE_BATCH_SIZE
+    ),
+    shard=shard_names()[0]
+)
+
 # Lifespan event handler
 @asynccontextmanager
-async def lifespan(_: FastAPI) -> AsyncGenerator:
+async def lifespan(app: FastAPI) -> AsyncGenerator:
     """
     Lifespan event handler for FastAPI application.
     Handles startup and shutdown events.
     """
+    timer = StartupTimer(started_at=STARTUP_STARTED_AT)
+    timer.record("imports", (time.perf_counter() - STARTUP_STARTED_AT) * 1000)
     try:
-        # Create database tables on startup
-        logger.info("Creating database tables...")
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully")
+        with timer.phase("schema"):
+            prepare_schema(settings.STARTUP_SCHEMA_MODE)
+        
+        with timer.phase("pool_warmup"):
+            warm_pool(get_warm_size())
+        
+        if settings.PASSWORD_HASH_TARGET_MS > 0:
+            with timer.phase("password_hashing"):
+                password_hasher.calibrate(settings.PASSWORD_HASH_TARGET_MS)
+        
+        if settings.SCHEDULER_ENABLED:
+            with timer.phase("scheduler"):
+                await scheduler.start()
+        
+        if settings.CHANGE_FEED_ENABLED:
+            with timer.phase("change_feed"):
+                await change_feed.start()
+        
+        app.state.startup_timings = timer.report()
+        logger.info(f"Startup completed ({settings.STARTUP_SCHEMA_MODE}): {timer.summary()}")
         
         yield
         
@@ -40,6 +134,9 @@ async def lifespan(_: FastAPI) -> AsyncGenerator:
     finally:
         # Cleanup on shutdown
         logger.info("Shutting down application...")
+        await scheduler.stop()
+        await change_feed.stop()
+        await thumbnail_pipeline.shutdown()
 
 # Initialize FastAPI app with lifespan
 app = FastAPI(
@@ -64,14 +161,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add custom middleware
-@app.middleware("http")
-async def add_logging_middleware(request, call_next):
-    return await logging_middleware(request, call_next)
+# Replay responses to retried POSTs. Token issuing is left out so tokens are
+# never stored; retrying it just issues another token.
+IDEMPOTENT_PATHS = [
+    f"^{settings.API_V1_STR}/auth/(signup|verify/[^/]+)$",
+    f"^{settings.API_V1_STR}/tasks/(import|[^/]+/attachments)?$",
+]
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(
+        IdempotencyMiddleware,
+        store=idempotency_store,
+        paths=IDEMPOTENT_PATHS,
+        max_response_bytes=settings.IDEMPOTENCY_MAX_RESPONSE_BYTES
+    )
+
+# Compress API responses, attachment downloads are sent as stored
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        exclude_paths=[f"^{settings.API_V1_STR}/tasks/[^/]+/attachments/"]
+    )
 
-@app.middleware("http")
-async def add_rate_limit_middleware(request, call_next):
-    return await rate_limit_middleware(request, call_next)
+# Shed load per route class before it queues up in the worker
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware, controller=admission_controller)
+
+# Health checks and API docs skip logging and rate limiting
+EXEMPT_PATHS = {
+    "/",
+    "/docs",
+    "/docs/oauth2-redirect",
+    "/redoc",
+    f"{settings.API_V1_STR}/openapi.json",
+}
+
+# Add custom middleware, the last added runs first
+app.add_middleware(RateLimitMiddleware, exempt_paths=EXEMPT_PATHS)
+app.add_middleware(LoggingMiddleware, exempt_paths=EXEMPT_PATHS)
 
 # Include routers
 app.include_router(
@@ -80,8 +207,6 @@ app.include_router(
     tags=["auth"]
 )
 
-from app.api.v1.endpoints import tasks
-
 # Add to existing router includes
 app.include_router(
     tasks.router,
@@ -89,6 +214,22 @@ app.include_router(
     tags=["tasks"]
 )
 
+app.include_router(
+    admin.router,
+    prefix=f"{settings.API_V1_STR}/admin",
+    tags=["admin"]
+)
+
+# Admin-only diagnostics, mounted only when enabled
+if settings.ENABLE_DIAGNOSTICS:
+    from app.api.v1.endpoints import diagnostics
+
+    app.include_router(
+        diagnostics.router,
+        prefix=f"{settings.API_V1_STR}/diagnostics",
+        tags=["diagnostics"]
+    )
+
 # Health check endpoint
 @app.get("/", tags=["health"])
 async def health_check():
@@ -0,0 +1,27 @@
+import os
+import tempfile
+from pathlib import Path
+
+# App modules read settings at import time; fill in anything not configured
+TEST_ENV = {
+    "VERSION": "test",
+    "SECRET_KEY": "test-secret-key",
+    "SERVER_HOST": "localhost",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "DB_HOST": "localhost",
+    "DB_NAME": "test",
+    "EMAILS_FROM_EMAIL": "test@example.com",
+    "EMAILS_FROM_NAME": "Test",
+    "SMTP_HOST": "localhost",
+    "SMTP_PORT": "25",
+    "SMTP_USER": "test",
+    "SMTP_PASSWORD": "test",
+}
+
+for key, value in TEST_ENV.items():
+    os.environ.setdefault(key, value)
+# Two local databases, so replica routing is exercised by the tests
+TEST_DB_DIR = Path(tempfile.mkdtemp(prefix="todoapp-tests-"))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{TEST_DB_DIR / 'primary.db'}")
+os.environ.setdefault("DATABASE_REPLICA_URL", f"sqlite:///{TEST_DB_DIR / 'replica.db'}")
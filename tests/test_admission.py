@@ -0,0 +1,67 @@
+import asyncio
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.middleware.admission import AdmissionControlMiddleware, AdmissionController, RouteClass, create_admission_controller
+
+async def slow(request):
+    await asyncio.sleep(0.1)
+    return PlainTextResponse("done")
+
+def make_client(route_class: RouteClass) -> httpx.AsyncClient:
+    app = Starlette(routes=[Route("/api/v1/tasks/", slow), Route("/health", slow)])
+    controller = AdmissionController("/api/v1", {"tasks": route_class})
+    transport = httpx.ASGITransport(app=AdmissionControlMiddleware(app, controller))
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+@pytest.mark.asyncio
+async def test_sheds_excess_requests_with_retry_after():
+    route_class = RouteClass("tasks", max_concurrency=2, max_queue=2, target_ms=50, max_wait_ms=1000)
+    async with make_client(route_class) as client:
+        responses = await asyncio.gather(*(client.get("/api/v1/tasks/") for _ in range(10)))
+
+    statuses = [response.status_code for response in responses]
+    assert statuses.count(200) == 4  # two in flight, two queued
+    assert statuses.count(503) == 6
+    assert all(int(r.headers["Retry-After"]) >= 1 for r in responses if r.status_code == 503)
+    assert route_class.in_flight == 0 and route_class.waiting == 0
+
+@pytest.mark.asyncio
+async def test_rejects_queued_requests_once_queueing_passes_target():
+    route_class = RouteClass("tasks", max_concurrency=1, max_queue=10, target_ms=50, max_wait_ms=1000)
+    async def late_request(client):
+        # Arrives while the third queued request is running
+        await asyncio.sleep(0.25)
+        return await client.get("/api/v1/tasks/")
+
+    async with make_client(route_class) as client:
+        responses = await asyncio.gather(
+            *(client.get("/api/v1/tasks/") for _ in range(3)),
+            late_request(client)
+        )
+
+    # Queueing time passed the target, so the late request is rejected without queueing
+    assert [r.status_code for r in responses] == [200, 200, 200, 503]
+    assert route_class.rejected == 1
+
+@pytest.mark.asyncio
+async def test_unclassified_paths_bypass_admission():
+    route_class = RouteClass("tasks", max_concurrency=1, max_queue=0, target_ms=50, max_wait_ms=1000)
+    async with make_client(route_class) as client:
+        responses = await asyncio.gather(*(client.get("/health") for _ in range(5)))
+    assert all(response.status_code == 200 for response in responses)
+
+def test_bulk_transfers_have_their_own_class():
+    controller = create_admission_controller()
+    prefix = controller.api_prefix
+
+    assert controller.classify(f"{prefix}/tasks/export").name == "bulk"
+    assert controller.classify(f"{prefix}/tasks/import").name == "bulk"
+    assert controller.classify(f"{prefix}/admin/export").name == "bulk"
+    assert controller.classify(f"{prefix}/tasks/").name == "tasks"
+    assert controller.classify(f"{prefix}/tasks/1/attachments").name == "attachments"
+    assert controller.classify(f"{prefix}/tasks/events") is None
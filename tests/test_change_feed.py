@@ -0,0 +1,138 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from app.core.change_feed import ChangeFeed, change_feed, event_stream
+from app.core.database import Base, SessionLocal, engine
+from app.core.security import SecurityService
+from app.models.todo import Task
+from app.models.user import User
+from app.services.export_service import ExportService
+
+@pytest.fixture
+def user():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(id=1, email="user1@example.com", password_hash="x", is_verified=True, is_admin=True))
+    db.commit()
+    db.close()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.mark.asyncio
+async def test_events_are_delivered_after_commit_only(user):
+    feed = change_feed
+    await feed.start()
+    mine = feed.subscribe(1)
+    other = feed.subscribe(2)
+    db = SessionLocal()
+    try:
+        db.add(Task(id=1, title="a", user_id=1))
+        feed.publish(db, 1, "task.created", {"id": 1})
+        await asyncio.sleep(0)
+        assert mine.queue.empty()
+        # Commits run in a worker thread in the real app
+        await asyncio.to_thread(db.commit)
+
+        feed.publish(db, 1, "task.deleted", {"id": 1})
+        db.rollback()
+    finally:
+        db.close()
+        feed.unsubscribe(other)
+
+    try:
+        assert await asyncio.wait_for(mine.queue.get(), 1) == {"event": "task.created", "data": {"id": 1}}
+        await asyncio.sleep(0.01)
+        assert mine.queue.empty()
+        assert other.queue.empty()
+    finally:
+        feed.unsubscribe(mine)
+        await feed.stop()
+    assert feed.subscribers == {}
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_reset():
+    feed = ChangeFeed("test", queue_size=3)
+    subscription = feed.subscribe(1)
+    for i in range(5):
+        feed.dispatch({"user_id": 1, "event": "task.updated", "data": {"id": i}})
+
+    assert subscription.queue.qsize() == 2
+    assert subscription.queue.get_nowait()["event"] == "reset"
+
+@pytest.mark.asyncio
+async def test_event_stream_frames_and_heartbeat():
+    feed = ChangeFeed("test", queue_size=10)
+    subscription = feed.subscribe(1)
+    feed.dispatch({"user_id": 1, "event": "task.created", "data": {"id": 7}})
+    disconnected = False
+
+    async def is_disconnected():
+        return disconnected
+
+    stream = event_stream(subscription, is_disconnected, heartbeat_seconds=0.01)
+    assert await stream.__anext__() == "retry: 3000\n\n"
+    assert await stream.__anext__() == 'event: task.created\ndata: {"id":7}\n\n'
+    assert await stream.__anext__() == ": keepalive\n\n"
+    disconnected = True
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/api/v1/tasks/events", "/api/v1/tasks/export", "/api/v1/admin/export"])
+async def test_open_stream_releases_its_connection(user, path, monkeypatch):
+    from main import app
+
+    disconnected = asyncio.Event()
+
+    async def stream_export(export_format, user_id=None):
+        # Exports read with their own session; hold the stream open without one
+        yield b"{}\n"
+        await disconnected.wait()
+
+    monkeypatch.setattr(ExportService, "stream_export", staticmethod(stream_export))
+    token = SecurityService.create_access_token({"sub": "user1@example.com"}, timedelta(minutes=5))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"test"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+    }
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    messages = []
+    first_frame = asyncio.Event()
+
+    async def send(message):
+        messages.append(message)
+        if message["type"] == "http.response.body" and message.get("body"):
+            first_frame.set()
+
+    stream = asyncio.create_task(app(scope, receive, send))
+    try:
+        await asyncio.wait_for(first_frame.wait(), 5)
+        assert messages[0]["status"] == 200
+        if path.endswith("/events"):
+            assert change_feed.subscribers
+        assert engine.pool.checkedout() == 0
+    finally:
+        disconnected.set()
+        await asyncio.wait_for(stream, 5)
+    assert change_feed.subscribers == {}
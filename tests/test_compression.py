@@ -0,0 +1,86 @@
+import gzip
+
+import brotli
+import httpx
+import pytest
+import zstandard
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.middleware.compression import CompressionMiddleware, negotiate_encoding
+
+PAYLOAD = [{"id": i, "description": "Lorem ipsum dolor sit amet " * 10} for i in range(20)]
+
+async def tasks(request):
+    return JSONResponse(PAYLOAD)
+
+async def small(request):
+    return JSONResponse({"ok": True})
+
+async def image(request):
+    return Response(b"\x89PNG" + b"\x00" * 2000, media_type="image/png")
+
+async def attachment(request):
+    return Response(b"a,b\n" * 500, media_type="text/csv")
+
+async def export(request):
+    async def rows():
+        for row in PAYLOAD:
+            yield JSONResponse(row).body + b"\n"
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+def make_client() -> httpx.AsyncClient:
+    app = Starlette(routes=[
+        Route("/tasks", tasks),
+        Route("/small", small),
+        Route("/image", image),
+        Route("/tasks/1/attachments/1", attachment),
+        Route("/export", export),
+    ])
+    app = CompressionMiddleware(app, minimum_size=500, exclude_paths=["^/tasks/[^/]+/attachments/"])
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+async def get_raw(path: str, accept_encoding: str):
+    async with make_client() as client:
+        async with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+            body = b"".join([chunk async for chunk in response.aiter_raw()])
+    return response, body
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("gzip, br, zstd", "zstd"),
+    ("br;q=1.0, zstd;q=0.5", "br"),
+    ("*", "zstd"),
+    ("gzip;q=0, identity", None),
+    ("", None),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header, ["zstd", "br", "gzip"]) == expected
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("coding, decode", [
+    ("gzip", gzip.decompress),
+    ("br", brotli.decompress),
+    ("zstd", lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data)),
+])
+async def test_json_response_compressed(coding, decode):
+    response, body = await get_raw("/tasks", coding)
+    assert response.headers["content-encoding"] == coding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(body)
+    assert decode(body) == JSONResponse(PAYLOAD).body
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/small", "/image", "/tasks/1/attachments/1"])
+async def test_small_media_and_attachments_skipped(path):
+    response, _ = await get_raw(path, "gzip")
+    assert "content-encoding" not in response.headers
+
+@pytest.mark.asyncio
+async def test_streaming_response_compressed_per_chunk():
+    response, body = await get_raw("/export", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = gzip.decompress(body).splitlines()
+    assert len(lines) == len(PAYLOAD)
@@ -0,0 +1,46 @@
+import csv
+import io
+import json
+
+import pytest
+
+from app.core.database import Base, SessionLocal, engine, replica_engine
+from app.models.todo import Task, TaskAttachment
+from app.models.user import User
+from app.services import export_service
+from app.services.export_service import CSV_FIELDS, ExportService
+
+@pytest.fixture
+def tasks():
+    # Exports read from the replica, so load the same rows into both databases
+    for bind in (engine, replica_engine):
+        Base.metadata.create_all(bind=bind)
+        db = SessionLocal(bind=bind)
+        db.add_all([User(id=user_id, email=f"user{user_id}@example.com", password_hash="x") for user_id in (1, 2)])
+        db.add_all([Task(id=i, title=f"Task {i}", user_id=1 + i % 2) for i in range(1, 101)])
+        db.add_all([
+            TaskAttachment(id=1, filename="a.pdf", file_path="a", content_type="application/pdf", task_id=2),
+            TaskAttachment(id=2, filename="b.pdf", file_path="b", content_type="application/pdf", task_id=2),
+        ])
+        db.commit()
+        db.close()
+    yield
+    for bind in (engine, replica_engine):
+        Base.metadata.drop_all(bind=bind)
+
+def test_ndjson_export_streams_in_chunks(tasks, monkeypatch):
+    monkeypatch.setattr(export_service, "CHUNK_SIZE", 512)
+    chunks = list(ExportService.stream_export("ndjson", user_id=1))
+    records = [json.loads(line) for line in b"".join(chunks).splitlines()]
+
+    assert len(chunks) > 1
+    assert [record["id"] for record in records] == list(range(2, 101, 2))
+    assert [a["filename"] for a in records[0]["attachments"]] == ["a.pdf", "b.pdf"]
+    assert records[1]["attachments"] == []
+
+def test_csv_export_all_users(tasks):
+    rows = list(csv.reader(io.StringIO(b"".join(ExportService.stream_export("csv")).decode())))
+
+    assert rows[0] == CSV_FIELDS
+    assert len(rows) == 101
+    assert rows[2][-2:] == ["2", "a.pdf;b.pdf"]
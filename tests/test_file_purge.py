@@ -0,0 +1,60 @@
+import os
+import time
+
+import pytest
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.todo import PendingFileDeletion, Task, TaskAttachment
+from app.models.user import User
+from app.services import file_purge_service
+from app.services.file_purge_service import FilePurgeService
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_purge_service.settings, "UPLOAD_DIR", str(tmp_path))
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(id=1, email="user1@example.com", password_hash="x"))
+    db.add_all([Task(id=1, title="a", user_id=1), Task(id=2, title="b", user_id=1)])
+    for task_id, name in ((1, "1_a.txt"), (1, "1_b.txt"), (2, "2_c.txt")):
+        path = os.path.join(str(tmp_path), name)
+        with open(path, "w") as f:
+            f.write(name)
+        db.add(TaskAttachment(filename=name, file_path=path, content_type="text/plain", task_id=task_id))
+    db.commit()
+    yield db, str(tmp_path)
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+def test_purge_removes_queued_files_in_batches(uploads):
+    db, upload_dir = uploads
+    FilePurgeService.enqueue_task_files(db, 1)
+    db.query(TaskAttachment).filter(TaskAttachment.task_id == 1).delete()
+    db.commit()
+    # Also queued: a file that is already gone and one still referenced
+    db.add(PendingFileDeletion(file_path=os.path.join(upload_dir, "gone.txt")))
+    db.add(PendingFileDeletion(file_path=os.path.join(upload_dir, "2_c.txt")))
+    db.commit()
+
+    counts = FilePurgeService.purge_files(db, batch_size=2)
+
+    assert counts == {"removed": 2, "missing": 1, "kept": 1, "failed": 0}
+    assert sorted(os.listdir(upload_dir)) == ["2_c.txt"]
+    assert db.query(PendingFileDeletion).count() == 0
+
+def test_reconcile_queues_only_old_unreferenced_files(uploads, monkeypatch):
+    db, upload_dir = uploads
+    monkeypatch.setattr(file_purge_service.settings, "ORPHAN_FILE_MIN_AGE_SECONDS", 60)
+    old = time.time() - 3600
+    for name in ("orphan.txt", "fresh.txt"):
+        with open(os.path.join(upload_dir, name), "w") as f:
+            f.write(name)
+    for name in ("orphan.txt", "1_a.txt"):
+        os.utime(os.path.join(upload_dir, name), (old, old))
+
+    assert FilePurgeService.reconcile_orphaned_files(db, batch_size=1) == {"scanned": 2, "orphaned": 1}
+    # Already queued orphans are not queued twice
+    assert FilePurgeService.reconcile_orphaned_files(db)["orphaned"] == 0
+
+    FilePurgeService.purge_files(db)
+    assert sorted(os.listdir(upload_dir)) == ["1_a.txt", "1_b.txt", "2_c.txt", "fresh.txt"]
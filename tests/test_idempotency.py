@@ -0,0 +1,215 @@
+import asyncio
+import os
+from datetime import timedelta
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.api.v1.endpoints import tasks
+from app.core.database import Base, SessionLocal, engine
+from app.core.security import SecurityService
+from app.middleware.idempotency import IdempotencyMiddleware, _BodyHasher
+from app.middleware.idempotency_backends import DatabaseIdempotencyStore, MemoryIdempotencyStore
+from app.models.todo import Task, TaskAttachment
+from app.models.user import User
+from app.services.email_service import EmailService
+
+@pytest.fixture(params=["memory", "database"])
+def store(request):
+    if request.param == "memory":
+        yield MemoryIdempotencyStore(ttl_seconds=60, lock_seconds=60, max_keys=100)
+        return
+    Base.metadata.create_all(bind=engine)
+    yield DatabaseIdempotencyStore(ttl_seconds=60, lock_seconds=60)
+    Base.metadata.drop_all(bind=engine)
+
+def make_client(store, calls, release=None):
+    async def create(request):
+        calls.append(await request.body())
+        if release is not None:
+            await release.wait()
+        status = 500 if request.query_params.get("fail") else 201
+        return JSONResponse({"call": len(calls)}, status_code=status)
+
+    app = Starlette(routes=[Route("/items", create, methods=["POST"]), Route("/other", create, methods=["POST"])])
+    app.add_middleware(IdempotencyMiddleware, store=store, paths=["^/items$"])
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+@pytest.mark.asyncio
+async def test_retry_replays_first_response(store):
+    calls = []
+    async with make_client(store, calls) as client:
+        first = await client.post("/items", content=b"a", headers={"Idempotency-Key": "k1"})
+        retry = await client.post("/items", content=b"a", headers={"Idempotency-Key": "k1"})
+        other_caller = await client.post("/items", headers={"Idempotency-Key": "k1", "Authorization": "Bearer x"})
+        unkeyed = await client.post("/items")
+        unmatched = await client.post("/other", headers={"Idempotency-Key": "k1"})
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json() == {"call": 1}
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert [r.json()["call"] for r in (other_caller, unkeyed, unmatched)] == [2, 3, 4]
+
+@pytest.mark.asyncio
+async def test_server_errors_are_not_stored(store):
+    calls = []
+    async with make_client(store, calls) as client:
+        statuses = [
+            (await client.post("/items?fail=1", headers={"Idempotency-Key": "k2"})).status_code
+            for _ in range(2)
+        ]
+    assert statuses == [500, 500]
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_concurrent_retry_gets_conflict(store):
+    calls, release = [], asyncio.Event()
+    async with make_client(store, calls, release) as client:
+        first = asyncio.create_task(client.post("/items", headers={"Idempotency-Key": "k3"}))
+        while not calls:
+            await asyncio.sleep(0.01)
+        retry = await client.post("/items", headers={"Idempotency-Key": "k3"})
+        release.set()
+        assert (await first).status_code == 201
+
+    assert retry.status_code == 409
+    assert retry.headers["Retry-After"] == "1"
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_key_reused_with_another_body_is_refused(store):
+    calls = []
+    async with make_client(store, calls) as client:
+        first = await client.post("/items", content=b"a", headers={"Idempotency-Key": "k4"})
+        other = await client.post("/items", content=b"b", headers={"Idempotency-Key": "k4"})
+
+    assert first.status_code == 201
+    assert other.status_code == 422
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_claim_is_renewed_while_the_request_runs(store):
+    store.lock = timedelta(seconds=0.1)
+    calls, release = [], asyncio.Event()
+    async with make_client(store, calls, release) as client:
+        first = asyncio.create_task(client.post("/items", headers={"Idempotency-Key": "k5"}))
+        while not calls:
+            await asyncio.sleep(0.01)
+        # Well past the lock length
+        await asyncio.sleep(0.3)
+        retry = await client.post("/items", headers={"Idempotency-Key": "k5"})
+        release.set()
+        assert (await first).status_code == 201
+
+    assert retry.status_code == 409
+    assert len(calls) == 1
+
+@pytest.fixture
+def app_client(tmp_path, monkeypatch):
+    """The real app, with the database backend configured by default."""
+    from main import app
+
+    monkeypatch.setattr(tasks, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(EmailService, "send_verification_email", staticmethod(lambda *args: None))
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(id=1, email="user1@example.com", password_hash="x", is_verified=True))
+    db.add(Task(id=1, title="a", user_id=1))
+    db.commit()
+    db.close()
+    yield TestClient(app)
+    Base.metadata.drop_all(bind=engine)
+
+def test_replayed_signup_skips_hashing_and_insert(app_client, monkeypatch):
+    hashes = []
+    get_password_hash = SecurityService.get_password_hash
+    monkeypatch.setattr(
+        SecurityService,
+        "get_password_hash",
+        staticmethod(lambda password: hashes.append(password) or get_password_hash(password))
+    )
+    body = {"email": "new@example.com", "password": "Passw0rd!", "confirm_password": "Passw0rd!"}
+    headers = {"Idempotency-Key": "signup-1"}
+
+    first = app_client.post("/api/v1/auth/signup", json=body, headers=headers)
+    retry = app_client.post("/api/v1/auth/signup", json=body, headers=headers)
+    # Another person's signup with a colliding key does not see this one
+    other = app_client.post("/api/v1/auth/signup", json={**body, "email": "other@example.com"}, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert other.status_code == 422
+    assert len(hashes) == 1
+    db = SessionLocal()
+    assert db.query(User).filter(User.email == "new@example.com").count() == 1
+    db.close()
+
+def test_replayed_upload_skips_insert_and_write_across_token_refresh(app_client, tmp_path, monkeypatch):
+    writes = []
+    replace = os.replace
+    monkeypatch.setattr(os, "replace", lambda src, dst: writes.append(dst) or replace(src, dst))
+    files = {"file": ("a.txt", b"x" * 100, "text/plain")}
+
+    def upload(minutes):
+        token = SecurityService.create_access_token({"sub": "user1@example.com"}, timedelta(minutes=minutes))
+        return app_client.post(
+            "/api/v1/tasks/1/attachments",
+            files=files,
+            headers={"Authorization": f"Bearer {token}", "Idempotency-Key": "upload-1"}
+        )
+
+    first = upload(5)
+    # The client refreshed its access token before retrying
+    retry = upload(10)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert len(writes) == 1
+    assert os.listdir(tmp_path) == ["1_a.txt"]
+    db = SessionLocal()
+    assert db.query(TaskAttachment).count() == 1
+    db.close()
+
+def test_early_quota_rejection_is_not_replayed(app_client):
+    db = SessionLocal()
+    db.get(User, 1).storage_quota_bytes = 1024
+    db.commit()
+    token = SecurityService.create_access_token({"sub": "user1@example.com"}, timedelta(minutes=5))
+    headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": "upload-2"}
+    # Past the quota plus the multipart allowance
+    files = {"file": ("a.txt", b"x" * 32 * 1024, "text/plain")}
+
+    # Refused from Content-Length, before the body is read
+    first = app_client.post("/api/v1/tasks/1/attachments", files=files, headers=headers)
+    db.get(User, 1).storage_quota_bytes = None
+    db.commit()
+    db.close()
+    retry = app_client.post("/api/v1/tasks/1/attachments", files=files, headers=headers)
+
+    assert first.status_code == 413
+    assert retry.status_code == 200
+    assert "Idempotent-Replayed" not in retry.headers
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 5, 1000])
+async def test_multipart_body_hash_ignores_the_boundary(chunk_size):
+    async def hash_body(boundary, content):
+        body = f"--{boundary}\r\nContent-Disposition: form-data; name=file\r\n\r\n{content}\r\n--{boundary}--\r\n".encode()
+        chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+        async def receive():
+            chunk = chunks.pop(0)
+            return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+        hasher = _BodyHasher(receive, f"multipart/form-data; boundary={boundary}")
+        await hasher.drain()
+        return hasher.request_hash()
+
+    assert await hash_body("abc123", "x") == await hash_body("zz9", "x")
+    assert await hash_body("abc123", "x") != await hash_body("abc123", "y")
@@ -0,0 +1,93 @@
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.todo import Task
+from app.models.user import User
+from app.services.import_service import ImportJob, RowParser
+
+CSV_INPUT = (
+    b"\xef\xbb\xbftitle,description,due_date\r\n"
+    b"First,plain,2030-01-01T09:00:00\r\n"
+    b'Second,"spans\r\ntwo lines, with a comma",\r\n'
+    b",missing title,\r\n"
+    b"Fourth,,2030-01-01T10:00:00+02:00\r\n"
+)
+
+def feed_in_pieces(parser, data, size):
+    records = []
+    for i in range(0, len(data), size):
+        records.extend(parser.feed(data[i:i + size]))
+    return records + parser.close()
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    session.add(User(id=1, email="user1@example.com", password_hash="x"))
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.mark.parametrize("size", [1, 7, 1024])
+def test_csv_parser_handles_any_chunking(size):
+    records = feed_in_pieces(RowParser("csv"), CSV_INPUT, size)
+
+    assert [r["title"] for r in records] == ["First", "Second", "", "Fourth"]
+    assert records[1]["description"] == "spans\ntwo lines, with a comma"
+    assert [r["_line"] for r in records] == [2, 3, 5, 6]
+
+def test_ndjson_parser_rejects_non_objects():
+    parser = RowParser("ndjson")
+    assert parser.feed(b'{"title": "a"}\n\n{"ti') == [{"title": "a", "_line": 1}]
+    with pytest.raises(ValueError):
+        parser.feed(b'tle": "b"}\n[1, 2]\n')
+
+def test_unterminated_quote_is_an_error():
+    parser = RowParser("csv")
+    parser.feed(b'title\n"open\n')
+    with pytest.raises(ValueError):
+        parser.close()
+
+def test_import_loads_valid_rows_in_batches(db):
+    job = ImportJob(db, 1, "csv", batch_size=2, max_errors=10)
+    job.feed(CSV_INPUT)
+    report = job.finish()
+
+    assert report["imported"] == 3
+    assert report["rejected"] == 1
+    assert report["errors"][0]["line"] == 5
+    assert report["errors"][0]["error"].startswith("title")
+
+    tasks = db.query(Task).order_by(Task.id).all()
+    assert [t.title for t in tasks] == ["First", "Second", "Fourth"]
+    assert all(t.user_id == 1 and not t.is_completed for t in tasks)
+    assert tasks[1].description == "spans\ntwo lines, with a comma"
+    # Offsets are normalised to naive UTC
+    assert tasks[2].due_date == datetime(2030, 1, 1, 8, 0)
+
+def test_import_row_limit_rolls_back(db):
+    job = ImportJob(db, 1, "ndjson", batch_size=2, max_errors=10, max_rows=3)
+    lines = b"".join(json.dumps({"title": f"Task {i}"}).encode() + b"\n" for i in range(5))
+    with pytest.raises(ValueError):
+        job.feed(lines)
+    job.abort()
+
+    assert db.query(Task).count() == 0
+
+def test_imported_tasks_are_stamped_at_commit(db):
+    job = ImportJob(db, 1, "ndjson", batch_size=1, max_errors=10)
+    job.feed(b'{"title": "early"}\n')
+    time.sleep(0.01)
+    # A sync made while the upload is still streaming moves its cursor here
+    cursor = datetime.utcnow()
+    job.feed(b'{"title": "late"}\n')
+    job.finish()
+
+    tasks = db.query(Task).all()
+    assert len(tasks) == 2
+    assert all(t.updated_at > cursor for t in tasks)
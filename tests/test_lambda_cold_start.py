@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import SessionLocal
+from app.scripts.import_time import ROOT, measure_import_time
+
+# Modules the Lambda entry point must not load until a route needs them
+DEFERRED_MODULES = [
+    "fastapi_mail",
+    "jose",
+    "bcrypt",
+    "app.api.v1.endpoints.auth",
+    "app.api.v1.endpoints.tasks",
+    "app.api.v1.endpoints.admin",
+]
+
+# Generous default so slow CI machines pass; tighten locally via the env var
+IMPORT_BUDGET_MS = float(os.environ.get("LAMBDA_IMPORT_BUDGET_MS", "3000"))
+
+def test_lambda_import_defers_heavy_modules():
+    code = (
+        "import importlib, json, sys; importlib.import_module('app.lambda'); "
+        f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+def test_lambda_import_time_within_budget():
+    total_us, rows = measure_import_time("app.lambda")
+    report = "\n".join(
+        f"{cumulative / 1000:8.1f}ms  {name.strip()}"
+        for _, cumulative, name in sorted(rows, key=lambda r: r[1], reverse=True)[:15]
+    )
+    assert total_us / 1000 < IMPORT_BUDGET_MS, f"Import took {total_us / 1000:.1f}ms:\n{report}"
+
+@pytest.fixture
+def lambda_app():
+    from app.lambda_app import create_lambda_app
+
+    original_bind = SessionLocal.kw.get("bind")
+    yield create_lambda_app()
+    SessionLocal.configure(bind=original_bind)
+
+def test_routers_load_on_first_request(lambda_app):
+    lazy = {route.path: route.app for route in lambda_app.routes if hasattr(route, "app")}
+    tasks_router = lazy["/api/v1/tasks"]
+    auth_router = lazy["/api/v1/auth"]
+
+    with TestClient(lambda_app) as client:
+        assert client.get("/").status_code == 200
+        assert tasks_router._app is None
+
+        # Unauthenticated, but routed through the freshly loaded tasks router
+        assert client.post("/api/v1/tasks/", json={}).status_code == 401
+        assert tasks_router._app is not None
+        assert auth_router._app is None
+
+        # Every router of the long-running app is mounted
+        assert client.get("/api/v1/admin/export").status_code == 401
+
+def test_lambda_engine_reused(lambda_app):
+    from app.lambda_app import get_lambda_engine
+
+    engine = get_lambda_engine()
+    assert get_lambda_engine() is engine
+    assert SessionLocal.kw["bind"] is engine
@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+from app.services.memory_service import MemoryDiagnostics
+
+@pytest.fixture
+def diagnostics():
+    diagnostics = MemoryDiagnostics(max_snapshots=2, frames=1)
+    yield diagnostics
+    diagnostics.stop()
+
+def test_snapshots_need_tracing(diagnostics):
+    with pytest.raises(RuntimeError):
+        diagnostics.take_snapshot()
+    assert diagnostics.status()["tracing"] is False
+
+def test_snapshots_are_bounded_and_diffed(diagnostics):
+    diagnostics.start()
+    first = diagnostics.take_snapshot()
+    leak = [bytearray(1024) for _ in range(1000)]
+    second = diagnostics.take_snapshot()
+    third = diagnostics.take_snapshot()
+
+    assert first["id"] == f"{os.getpid()}-1"
+    assert first["pid"] == os.getpid()
+    # The oldest snapshot was evicted
+    assert [s["id"] for s in diagnostics.status()["snapshots"]] == [second["id"], third["id"]]
+    with pytest.raises(KeyError):
+        diagnostics.top(snapshot_id=first["id"])
+
+    growth = diagnostics.diff(second["id"], key_type="filename", limit=100)
+    assert growth
+    assert diagnostics.top(limit=3, snapshot_id=third["id"])
+    del leak
+
+def test_other_workers_snapshots_are_refused(diagnostics):
+    diagnostics.start()
+    diagnostics.take_snapshot()
+
+    with pytest.raises(ValueError, match="taken by worker"):
+        diagnostics.diff(f"{os.getpid() + 1}-1")
@@ -0,0 +1,48 @@
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.utils.logging import LoggingMiddleware
+from app.utils.rate_limit import RateLimiter, RateLimitMiddleware
+
+async def ok(request):
+    return PlainTextResponse("ok")
+
+async def stream(request):
+    async def chunks():
+        for i in range(3):
+            yield f"chunk {i}\n"
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+def make_client(limit: int) -> httpx.AsyncClient:
+    limiter = RateLimiter()
+    limiter.limits = {"default": limit}
+    app = Starlette(routes=[Route("/", ok), Route("/api", ok), Route("/stream", stream)])
+    app.add_middleware(RateLimitMiddleware, limiter=limiter, exempt_paths={"/"})
+    app.add_middleware(LoggingMiddleware, exempt_paths={"/"})
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+@pytest.mark.asyncio
+async def test_rate_limit_returns_429_with_retry_after():
+    async with make_client(limit=2) as client:
+        statuses = [(await client.get("/api")).status_code for _ in range(2)]
+        response = await client.get("/api")
+
+    assert statuses == [200, 200]
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too many requests"}
+    assert 0 < int(response.headers["Retry-After"]) <= 60
+
+@pytest.mark.asyncio
+async def test_exempt_paths_are_not_limited():
+    async with make_client(limit=1) as client:
+        responses = [await client.get("/") for _ in range(5)]
+    assert all(response.status_code == 200 for response in responses)
+
+@pytest.mark.asyncio
+async def test_streaming_responses_pass_through():
+    async with make_client(limit=10) as client:
+        response = await client.get("/stream")
+    assert response.text == "chunk 0\nchunk 1\nchunk 2\n"
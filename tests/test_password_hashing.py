@@ -0,0 +1,83 @@
+import pytest
+
+from app.core import password_hashing
+from app.core.database import Base, SessionLocal, engine
+from app.core.password_hashing import MAX_BCRYPT_ROUNDS, PasswordHasher
+from app.models.user import User
+from app.services.user_service import UserService
+
+def make_hasher(algorithm: str = "bcrypt", rounds: int = 4, time_cost: int = 1) -> PasswordHasher:
+    # Minimum costs keep the tests fast
+    return PasswordHasher(
+        algorithm=algorithm,
+        bcrypt_rounds=rounds,
+        argon2_time_cost=time_cost,
+        argon2_memory_kib=1024,
+        argon2_parallelism=1
+    )
+
+@pytest.fixture
+def hasher(monkeypatch):
+    hasher = make_hasher()
+    monkeypatch.setattr(password_hashing, "password_hasher", hasher)
+    monkeypatch.setattr("app.core.security.password_hasher", hasher)
+    return hasher
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.mark.parametrize("algorithm", ["bcrypt", "argon2id"])
+def test_hashes_verify_whatever_the_policy(algorithm):
+    hashed = make_hasher(algorithm).hash("secret")
+
+    for verifier in (make_hasher("bcrypt"), make_hasher("argon2id")):
+        assert verifier.verify("secret", hashed)
+        assert not verifier.verify("wrong", hashed)
+
+def test_needs_rehash_on_algorithm_change_or_weaker_cost():
+    bcrypt_hash = make_hasher("bcrypt", rounds=5).hash("secret")
+    argon2_hash = make_hasher("argon2id", time_cost=2).hash("secret")
+
+    assert not make_hasher("bcrypt", rounds=5).needs_rehash(bcrypt_hash)
+    assert make_hasher("bcrypt", rounds=6).needs_rehash(bcrypt_hash)
+    assert make_hasher("argon2id").needs_rehash(bcrypt_hash)
+
+    assert not make_hasher("argon2id", time_cost=2).needs_rehash(argon2_hash)
+    assert make_hasher("argon2id", time_cost=3).needs_rehash(argon2_hash)
+    assert make_hasher("bcrypt").needs_rehash(argon2_hash)
+
+    # Stronger hashes, e.g. from a host that calibrated higher, are kept
+    assert not make_hasher("bcrypt", rounds=4).needs_rehash(bcrypt_hash)
+    assert not make_hasher("argon2id", time_cost=1).needs_rehash(argon2_hash)
+
+def test_calibration_never_lowers_the_configured_cost():
+    hasher = make_hasher("bcrypt", rounds=12)
+    assert hasher.calibrate(target_ms=1) == {"algorithm": "bcrypt", "rounds": 12}
+
+    argon2_hasher = make_hasher("argon2id", time_cost=3)
+    assert argon2_hasher.calibrate(target_ms=0.001)["time_cost"] == 3
+
+def test_calibration_is_capped():
+    hasher = make_hasher("bcrypt")
+    assert hasher.calibrate(target_ms=10 ** 9)["rounds"] == MAX_BCRYPT_ROUNDS
+
+def test_login_rehashes_outdated_hash(db, hasher):
+    db.add(User(id=1, email="user1@example.com", password_hash=make_hasher("bcrypt").hash("secret"), is_verified=True))
+    db.commit()
+
+    hasher.algorithm = "argon2id"
+    assert UserService.authenticate_user(db, "user1@example.com", "wrong") is None
+    assert db.get(User, 1).password_hash.startswith("$2b$")
+
+    user = UserService.authenticate_user(db, "user1@example.com", "secret")
+    assert user is not None
+    assert user.password_hash.startswith("$argon2id$")
+    assert not hasher.needs_rehash(user.password_hash)
+
+    # The new hash keeps working
+    assert UserService.authenticate_user(db, "user1@example.com", "secret") is not None
@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.pool import InstrumentedNullPool, InstrumentedQueuePool, get_pool_options, get_pool_stats
+
+@pytest.fixture
+def make_engine(tmp_path):
+    engines = []
+
+    def make(mode, pool_size=2, max_overflow=1, pool_timeout=1, **overrides):
+        options = {**get_pool_options(mode, pool_size, max_overflow, pool_timeout), **overrides}
+        engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", **options)
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.dispose()
+
+def test_pool_options_per_mode():
+    assert get_pool_options("queue", 5, 10, 30)["pool_use_lifo"] is False
+    assert get_pool_options("lifo", 5, 10, 30)["pool_use_lifo"] is True
+    assert get_pool_options("null", 5, 10, 30) == {"poolclass": InstrumentedNullPool}
+    with pytest.raises(ValueError):
+        get_pool_options("fifo", 5, 10, 30)
+
+def test_queue_pool_stats(make_engine):
+    engine = make_engine("queue")
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("SELECT 1"))
+        second.execute(text("SELECT 1"))
+        assert get_pool_stats(engine)["checked_out"] == 2
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    stats = get_pool_stats(engine, "queue")
+    assert stats["mode"] == "queue"
+    assert stats["pool_class"] == "InstrumentedQueuePool"
+    assert (stats["size"], stats["max_overflow"], stats["max_connections"]) == (2, 1, 3)
+    assert stats["checkouts"] == 3
+    assert stats["checked_out"] == 0
+    assert stats["peak_checked_out"] == 2
+    # The third checkout reused a pooled connection
+    assert stats["connects"] == 2
+    assert stats["idle"] == 2
+    assert stats["wait_ms"]["max"] >= stats["wait_ms"]["p95"] >= 0
+
+def test_timeouts_are_counted(make_engine):
+    engine = make_engine("queue", pool_size=1, max_overflow=0, pool_timeout=0.05)
+
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    stats = get_pool_stats(engine)
+    assert stats["timeouts"] == 1
+    assert stats["checkouts"] == 1
+    assert stats["checked_out"] == 0
+
+def test_lifo_reuses_the_last_returned_connection(make_engine):
+    engine = make_engine("lifo")
+
+    # second is returned before first
+    with engine.connect() as first, engine.connect():
+        last = first.connection.dbapi_connection
+    with engine.connect() as conn:
+        assert conn.connection.dbapi_connection is last
+
+def test_stats_survive_dispose_without_double_counting(make_engine):
+    engine = make_engine("queue")
+    with engine.connect():
+        pass
+
+    engine.dispose()
+    with engine.connect():
+        pass
+
+    stats = get_pool_stats(engine)
+    assert (stats["checkouts"], stats["connects"], stats["checked_out"]) == (2, 2, 0)
+
+def test_null_pool_opens_a_connection_per_checkout(make_engine):
+    engine = make_engine("null")
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    stats = get_pool_stats(engine, "null")
+    assert stats["pool_class"] == "InstrumentedNullPool"
+    assert "size" not in stats
+    assert (stats["checkouts"], stats["connects"], stats["checked_out"]) == (3, 3, 0)
@@ -0,0 +1,44 @@
+import multiprocessing
+
+from app.utils.rate_limit_backends import SharedMemoryRateLimitBackend
+
+NOW = 1_700_000_050.0  # 10 seconds into a window
+LIMIT = 60
+
+def _worker(path: str, hits: int, results) -> None:
+    backend = SharedMemoryRateLimitBackend(path, slots=1024, stripes=8)
+    results.put(sum(backend.hit("10.0.0.1", "/api/v1/tasks/", LIMIT, NOW)[0] for _ in range(hits)))
+
+def test_limit_shared_across_processes(tmp_path):
+    path = str(tmp_path / "rate-limit")
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    workers = [context.Process(target=_worker, args=(path, 40, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    allowed = sum(results.get(timeout=30) for _ in workers)
+    for worker in workers:
+        worker.join(timeout=30)
+
+    assert allowed == LIMIT
+
+def test_previous_window_is_weighted(tmp_path):
+    backend = SharedMemoryRateLimitBackend(str(tmp_path / "rate-limit"), slots=1024, stripes=8)
+    for _ in range(LIMIT):
+        assert backend.hit("10.0.0.1", "/path", LIMIT, NOW)[0]
+    allowed, retry_after = backend.hit("10.0.0.1", "/path", LIMIT, NOW)
+    assert not allowed and retry_after == 50
+
+    # Halfway through the next window half of the previous count still applies
+    next_window = NOW + 50 + 30
+    results = [backend.hit("10.0.0.1", "/path", LIMIT, next_window)[0] for _ in range(LIMIT)]
+    assert results.count(True) == LIMIT // 2
+
+def test_full_bucket_evicts_least_recent_key(tmp_path):
+    backend = SharedMemoryRateLimitBackend(str(tmp_path / "rate-limit"), slots=8, stripes=1)
+    for client in range(8):
+        backend.hit(f"10.0.0.{client}", "/path", LIMIT, NOW - 60)
+    backend.hit("10.0.0.0", "/path", LIMIT, NOW)
+
+    assert backend.hit("10.0.1.1", "/path", LIMIT, NOW)[0]
+    assert backend.stats()["used_slots"] == 8
@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import Base, SessionLocal, engine, replica_engine, replica_router
+from app.core.security import SecurityService
+from app.models.todo import Task, TaskAttachment
+from app.models.user import User
+
+@pytest.fixture
+def databases():
+    """Primary and replica with the same user, as replication would leave them."""
+    for bind in (engine, replica_engine):
+        Base.metadata.create_all(bind=bind)
+        db = SessionLocal(bind=bind)
+        user = User(id=1, email="reader@example.com", password_hash="x", is_verified=True)
+        db.add(user)
+        db.add(Task(id=1, title="Shared task", user_id=1))
+        db.commit()
+        db.close()
+
+    replica_router._recent_writers.clear()
+    replica_router.monitor.lag_seconds = None
+    replica_router.monitor.checked_at = 0.0
+    yield
+    for bind in (engine, replica_engine):
+        Base.metadata.drop_all(bind=bind)
+
+@pytest.fixture
+def client(databases):
+    from main import app
+
+    return TestClient(app)
+
+@pytest.fixture
+def auth_headers():
+    token = SecurityService.create_access_token({"sub": "reader@example.com"}, timedelta(minutes=5))
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture
+def replica_only_attachment(databases, tmp_path):
+    """An attachment row that exists on the replica only."""
+    path = tmp_path / "notes.txt"
+    path.write_text("from the replica")
+    db = SessionLocal(bind=replica_engine)
+    db.add(TaskAttachment(id=1, filename="notes.txt", file_path=str(path), content_type="text/plain", task_id=1))
+    db.commit()
+    db.close()
+
+def count_tasks(bind) -> int:
+    db = SessionLocal(bind=bind)
+    try:
+        return db.query(Task).count()
+    finally:
+        db.close()
+
+def test_read_only_session_reads_from_replica(replica_only_attachment):
+    db = SessionLocal()
+    try:
+        assert db.query(TaskAttachment).count() == 0
+        db.info["read_only"] = True
+        assert db.query(TaskAttachment).count() == 1
+    finally:
+        db.close()
+
+def test_read_only_session_writes_to_primary(databases):
+    db = SessionLocal()
+    try:
+        db.info.update(read_only=True, user_id=1)
+        db.add(Task(title="New task", user_id=1))
+        db.commit()
+    finally:
+        db.close()
+
+    assert count_tasks(engine) == 2
+    assert count_tasks(replica_engine) == 1
+    assert replica_router.wrote_recently(1)
+
+def test_download_served_from_replica(client, auth_headers, replica_only_attachment):
+    response = client.get("/api/v1/tasks/1/attachments/1", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.text == "from the replica"
+
+def test_lagging_replica_falls_back_to_primary(client, auth_headers, replica_only_attachment, monkeypatch):
+    monkeypatch.setattr(replica_router.monitor, "measure", lambda: replica_router.monitor.max_lag_seconds + 1)
+    response = client.get("/api/v1/tasks/1/attachments/1", headers=auth_headers)
+    assert response.status_code == 404
+
+def test_unreachable_replica_falls_back_to_primary(client, auth_headers, replica_only_attachment, monkeypatch):
+    def fail():
+        raise ConnectionError("replica down")
+
+    monkeypatch.setattr(replica_router.monitor, "measure", fail)
+    response = client.get("/api/v1/tasks/1/attachments/1", headers=auth_headers)
+    assert response.status_code == 404
+
+def test_reads_own_writes_from_primary(client, auth_headers, replica_only_attachment):
+    response = client.put("/api/v1/tasks/1", json={"title": "Renamed"}, headers=auth_headers)
+    assert response.status_code == 200
+
+    # Pinned to the primary after the write, where the attachment does not exist yet
+    response = client.get("/api/v1/tasks/1/attachments/1", headers=auth_headers)
+    assert response.status_code == 404
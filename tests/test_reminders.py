@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.todo import Task
+from app.models.user import User
+from app.services.reminder_service import ReminderScheduler
+
+NOW = datetime(2030, 1, 1, 12, 0)
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    session.add_all([
+        User(id=1, email="user1@example.com", password_hash="x", is_verified=True),
+        User(id=2, email="user2@example.com", password_hash="x", is_verified=False),
+    ])
+    session.add_all([
+        Task(id=1, title="Soon", user_id=1, due_date=NOW + timedelta(minutes=30)),
+        Task(id=2, title="Sooner", user_id=1, due_date=NOW + timedelta(minutes=10)),
+        Task(id=3, title="Later", user_id=1, due_date=NOW + timedelta(minutes=90)),
+        Task(id=4, title="Done", user_id=1, due_date=NOW + timedelta(minutes=5), is_completed=True),
+        Task(id=5, title="Stale", user_id=1, due_date=NOW - timedelta(days=2)),
+        Task(id=6, title="Unverified", user_id=2, due_date=NOW + timedelta(minutes=20)),
+        Task(id=7, title="Far", user_id=1, due_date=NOW + timedelta(days=3)),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+def make_scheduler(sent, fail=()):
+    async def send(email, tasks):
+        if email in fail:
+            raise RuntimeError("smtp down")
+        sent.append((email, [task["title"] for task in tasks]))
+
+    return ReminderScheduler(
+        lead_minutes=60,
+        scan_interval_seconds=300,
+        max_late_minutes=60,
+        batch_size=2,
+        max_queue=1000,
+        send_concurrency=2,
+        send=send
+    )
+
+def test_scan_loads_only_the_window(db):
+    scheduler = make_scheduler([])
+    # Due within lead + two scan intervals, open, not stale
+    assert scheduler.scan(db, NOW) == 3
+    assert scheduler.horizon == NOW + timedelta(minutes=70)
+
+def test_dispatch_sends_one_batched_email_per_user_once(db):
+    sent = []
+    scheduler = make_scheduler(sent)
+    scheduler.scan(db, NOW)
+    counts = scheduler.dispatch(db, NOW)
+
+    assert counts == {"claimed": 3, "sent": 2, "skipped": 1, "failed": 0}
+    assert sent == [("user1@example.com", ["Sooner", "Soon"])]
+
+    # A second worker with its own queue finds nothing left to claim
+    other = make_scheduler(sent)
+    other.scan(db, NOW)
+    assert other.dispatch(db, NOW)["claimed"] == 0
+    assert len(sent) == 1
+
+    # Task 3 becomes due as time passes
+    later = NOW + timedelta(minutes=30)
+    scheduler.scan(db, later)
+    assert scheduler.dispatch(db, later)["sent"] == 1
+    assert sent[-1] == ("user1@example.com", ["Later"])
+
+def test_failed_sends_are_released_for_retry(db):
+    sent = []
+    scheduler = make_scheduler(sent, fail={"user1@example.com"})
+    scheduler.scan(db, NOW)
+    assert scheduler.dispatch(db, NOW)["failed"] == 2
+    assert db.query(Task).filter(Task.id.in_([1, 2]), Task.reminder_sent_at.is_(None)).count() == 2
+
+    scheduler.send = make_scheduler(sent).send
+    assert scheduler.dispatch(db, NOW)["sent"] == 2
+
+def test_completed_before_dispatch_is_not_sent(db):
+    sent = []
+    scheduler = make_scheduler(sent)
+    scheduler.scan(db, NOW)
+    db.query(Task).filter(Task.id == 2).update({"is_completed": True})
+    db.commit()
+
+    scheduler.dispatch(db, NOW)
+    assert sent == [("user1@example.com", ["Soon"])]
+
+def test_queries_use_the_pending_reminder_index(db):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, *args):
+        if "reminder_sent_at IS NULL" in statement:
+            statements.append((statement, parameters))
+
+    scheduler = make_scheduler([])
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        scheduler.scan(db, NOW)
+        scheduler.dispatch(db, NOW + timedelta(minutes=30))
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    def plan(statement, parameters):
+        with engine.connect() as conn:
+            conn.exec_driver_sql("ANALYZE")
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        return " ".join(row[-1] for row in rows)
+
+    # One scan, then the claim batches
+    scan, claim = statements[:2]
+    assert "USING INDEX ix_tasks_pending_reminder_due_date" in plan(*scan)
+    # The claim looks tasks up by id
+    assert "SCAN tasks" not in plan(*claim)
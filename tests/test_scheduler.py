@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+
+from app.core import scheduler as scheduler_module
+from app.core.database import Base, SessionLocal, engine
+from app.core.scheduler import Scheduler
+from app.core.security import SecurityService
+# Registers Task, which User's relationship refers to
+import app.models.todo  # noqa: F401
+from app.models.user import BlacklistedToken, RefreshToken, User
+from app.services.token_service import TokenService
+
+class FakeLockServer:
+    """Stands in for Postgres advisory locks: one holder per lock, freed when its connection closes."""
+
+    def __init__(self):
+        self.holder = None
+
+class FakeConnection:
+    def __init__(self, server):
+        self.server = server
+        self.broken = False
+        self.closed = False
+
+    def execute(self, statement, params=None):
+        if self.broken:
+            raise ConnectionError("server closed the connection")
+        if "pg_try_advisory_lock" in str(statement):
+            acquired = self.server.holder in (None, self)
+            if acquired:
+                self.server.holder = self
+            return SimpleNamespace(scalar=lambda: acquired)
+        return SimpleNamespace(scalar=lambda: 1)
+
+    def close(self):
+        self.closed = True
+        if self.server.holder is self:
+            self.server.holder = None
+
+class FakeEngine:
+    def __init__(self, server):
+        self.server = server
+
+    def connect(self):
+        return FakeConnection(self.server)
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def postgres(monkeypatch):
+    # Only the dialect name is read before the leader engine takes over
+    monkeypatch.setattr(scheduler_module, "engine", SimpleNamespace(dialect=SimpleNamespace(name="postgresql")))
+    return FakeLockServer()
+
+def make_scheduler(server=None):
+    scheduler = Scheduler(lock_id=1, tick_seconds=1)
+    if server is not None:
+        scheduler._leader_engine = FakeEngine(server)
+    return scheduler
+
+def test_jobs_run_on_their_interval():
+    runs = []
+    scheduler = make_scheduler()
+    scheduler.add_job("often", 0, lambda db: runs.append("often"))
+    scheduler.add_job("rarely", 3600, lambda db: runs.append("rarely"))
+
+    scheduler._tick()
+    scheduler._tick()
+
+    assert runs == ["often", "rarely", "often"]
+
+def test_failed_job_does_not_stop_the_others():
+    runs = []
+
+    def fail(db):
+        raise RuntimeError("boom")
+
+    scheduler = make_scheduler()
+    scheduler.add_job("failing", 0, fail)
+    scheduler.add_job("shard", 0, lambda db: runs.append(db.info.get("shard")), shard="shard_1")
+
+    scheduler._tick()
+
+    assert runs == ["shard_1"]
+
+def test_only_the_leader_runs_jobs(postgres):
+    runs = []
+    leader, follower = make_scheduler(postgres), make_scheduler(postgres)
+    leader.add_job("job", 0, lambda db: runs.append("leader"))
+    follower.add_job("job", 0, lambda db: runs.append("follower"))
+
+    leader._tick()
+    follower._tick()
+
+    assert runs == ["leader"]
+    assert leader.is_leader and not follower.is_leader
+
+def test_leadership_moves_when_the_leader_goes(postgres):
+    leader, follower = make_scheduler(postgres), make_scheduler(postgres)
+    assert leader._ensure_leadership()
+    assert not follower._ensure_leadership()
+
+    # A dropped connection frees the lock and the leader steps down
+    leader._leader_conn.broken = True
+    leader._leader_conn.close()
+    assert follower._ensure_leadership()
+    assert not leader._ensure_leadership()
+    assert not leader.is_leader
+
+    # A clean stop hands leadership back
+    follower._release_leadership()
+    assert leader._ensure_leadership()
+
+def test_cleanup_deletes_expired_tokens_in_batches(db):
+    now = datetime.utcnow()
+    db.add(User(id=1, email="user1@example.com", password_hash="x", is_verified=True))
+    for i in range(5):
+        db.add(RefreshToken(
+            token_hash=SecurityService.hash_token(f"expired-{i}"),
+            user_id=1,
+            created_at=now - timedelta(days=2),
+            expires_at=now - timedelta(days=1)
+        ))
+        db.add(BlacklistedToken(token=f"expired-{i}", expires_at=now - timedelta(days=1)))
+    db.add(RefreshToken(
+        token_hash=SecurityService.hash_token("live"),
+        user_id=1,
+        created_at=now,
+        expires_at=now + timedelta(days=1)
+    ))
+    db.add(BlacklistedToken(token="live", expires_at=now + timedelta(days=1)))
+    db.commit()
+
+    statements = []
+
+    def count_deletes(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("DELETE"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_deletes)
+    try:
+        deleted = TokenService.cleanup_expired_tokens(db, batch_size=2)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_deletes)
+
+    assert deleted == {"refresh_tokens": 5, "blacklisted_tokens": 5}
+    # 2 + 2 + 1 per table
+    assert len(statements) == 6
+    assert [t.token for t in db.query(BlacklistedToken)] == ["live"]
+    assert db.query(RefreshToken).count() == 1
@@ -0,0 +1,92 @@
+import hashlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.core.database import Base, SessionLocal, engine
+from app.core.security import SecurityService
+from app.models.user import RefreshToken, User
+
+ROOT = Path(__file__).resolve().parent.parent
+
+@pytest.fixture
+def client():
+    from main import app
+
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    db = SessionLocal()
+    db.add(User(id=1, email="user1@example.com", password_hash="x", is_verified=True))
+    db.add(User(id=2, email="user2@example.com", password_hash="x", is_verified=True))
+    for token_id, user_id, days, revoked in [(1, 1, 1, False), (2, 1, 2, False), (3, 1, 3, True), (4, 2, 1, False)]:
+        db.add(RefreshToken(
+            id=token_id,
+            token_hash=SecurityService.hash_token(f"token-{token_id}"),
+            user_id=user_id,
+            created_at=now,
+            expires_at=now + timedelta(days=days),
+            is_revoked=revoked
+        ))
+    db.commit()
+    db.close()
+    yield TestClient(app)
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def auth_headers():
+    token = SecurityService.create_access_token({"sub": "user1@example.com"}, timedelta(minutes=5))
+    return {"Authorization": f"Bearer {token}"}
+
+def test_list_active_sessions_newest_first(client, auth_headers):
+    response = client.get("/api/v1/auth/sessions", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert [s["id"] for s in response.json()] == [2, 1]
+
+def test_revoke_own_session(client, auth_headers):
+    assert client.delete("/api/v1/auth/sessions/1", headers=auth_headers).status_code == 200
+
+    assert [s["id"] for s in client.get("/api/v1/auth/sessions", headers=auth_headers).json()] == [2]
+    # Already revoked
+    assert client.delete("/api/v1/auth/sessions/1", headers=auth_headers).status_code == 404
+
+def test_other_users_session_is_not_found(client, auth_headers):
+    assert client.delete("/api/v1/auth/sessions/4", headers=auth_headers).status_code == 404
+
+    db = SessionLocal()
+    assert db.get(RefreshToken, 4).is_revoked is False
+    db.close()
+
+def test_migrations_hash_existing_refresh_tokens(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'migrations.db'}"
+    # env.py takes the URL from the settings; no ini file, so logging is left alone
+    monkeypatch.setattr(get_settings(), "DATABASE_URL", url)
+    config = Config()
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+
+    command.upgrade(config, "0001")
+    migration_engine = sa.create_engine(url)
+    with migration_engine.begin() as conn:
+        conn.execute(sa.text("INSERT INTO users (id, email, password_hash, is_verified) VALUES (1, 'a@example.com', 'x', 1)"))
+        conn.execute(sa.text(
+            "INSERT INTO refresh_tokens (id, token, expires_at, user_id, is_revoked) "
+            "VALUES (1, 'raw-token', '2030-01-01 00:00:00', 1, 0)"
+        ))
+
+    command.upgrade(config, "0003")
+    with migration_engine.connect() as conn:
+        assert conn.execute(sa.text("SELECT is_admin FROM users")).scalar() == 0
+        assert conn.execute(sa.text("SELECT token_hash FROM refresh_tokens")).scalar() == hashlib.sha256(b"raw-token").digest()
+        indexes = {index["name"] for index in sa.inspect(conn).get_indexes("refresh_tokens")}
+    assert {"ix_refresh_tokens_user_id_expires_at", "ix_refresh_tokens_active_user_id"} <= indexes
+
+    # The whole chain applies and reverts
+    command.upgrade(config, "head")
+    command.downgrade(config, "base")
+    migration_engine.dispose()
@@ -0,0 +1,154 @@
+import os
+from collections import Counter
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.replica import RoutingSession
+from app.core.sharding import HashRing, ShardRouter, shard_metadata
+from app.models.todo import ShardMove, Task, TaskAttachment, TaskTombstone
+from app.models.user import User
+from app.services.shard_service import ShardRebalancer
+
+USER_IDS = range(1, 61)
+
+def test_ring_is_balanced_and_moves_little_when_a_shard_is_added():
+    ring = HashRing(["a", "b", "c"], 100)
+    before = {user_id: ring.locate(user_id) for user_id in range(10_000)}
+    assert min(Counter(before.values()).values()) > 2500
+
+    grown = HashRing(["a", "b", "c", "d"], 100)
+    moved = [user_id for user_id in before if grown.locate(user_id) != before[user_id]]
+    # Only users taken over by the new shard move, about a quarter of them
+    assert {grown.locate(user_id) for user_id in moved} == {"d"}
+    assert 1500 < len(moved) < 3500
+
+@pytest.fixture
+def databases(tmp_path):
+    """A primary holding users and three task shards, as separate SQLite files."""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    Base.metadata.create_all(bind=primary)
+    shards = {name: create_engine(f"sqlite:///{tmp_path / f'{name}.db'}") for name in ("a", "b", "c")}
+    schema = shard_metadata(Base.metadata)
+    for shard_engine in shards.values():
+        schema.create_all(bind=shard_engine)
+    yield primary, shards
+    for bind in (primary, *shards.values()):
+        bind.dispose()
+
+def make_session(primary, router):
+    return sessionmaker(bind=primary, class_=RoutingSession, info={"shard_router": router})
+
+def owners(shard_engine):
+    with shard_engine.connect() as conn:
+        return set(conn.execute(select(Task.user_id)).scalars())
+
+def test_tasks_route_to_the_owner_shard(databases):
+    primary, shards = databases
+    router = ShardRouter(shards, 100)
+    Session = make_session(primary, router)
+
+    for user_id in USER_IDS:
+        db = Session(info={"user_id": user_id})
+        db.add(User(id=user_id, email=f"user{user_id}@example.com"))
+        db.add(Task(title="t", user_id=user_id))
+        db.commit()
+        assert db.scalar(select(Task.id).where(Task.user_id == user_id)) is not None
+        db.close()
+
+    for name, shard_engine in shards.items():
+        assert owners(shard_engine) == {u for u in USER_IDS if router.shard_for(u) == name}
+    db = Session()
+    assert db.query(User).count() == len(USER_IDS)
+    # Without a shard key the task tables cannot be routed
+    with pytest.raises(RuntimeError):
+        db.query(Task).count()
+    db.close()
+
+def test_rebalance_moves_users_to_their_new_shard(databases, tmp_path):
+    primary, shards = databases
+    small = ShardRouter({"a": shards["a"], "b": shards["b"]}, 100)
+    Session = make_session(primary, small)
+    for user_id in USER_IDS:
+        db = Session(info={"user_id": user_id})
+        task = Task(title=f"task {user_id}", user_id=user_id)
+        db.add(task)
+        db.flush()
+        path = str(tmp_path / f"{small.shard_for(user_id)}_{task.id}_f.txt")
+        with open(path, "w") as f:
+            f.write(str(user_id))
+        db.add(TaskAttachment(filename="f.txt", file_path=path, content_type="text/plain", task_id=task.id))
+        db.add(TaskTombstone(task_id=10_000 + user_id, user_id=user_id))
+        db.commit()
+        db.close()
+
+    grown = ShardRouter(shards, 100)
+    rebalancer = ShardRebalancer(grown, str(tmp_path))
+    moving = [user_id for user_id in USER_IDS if grown.shard_for(user_id) == "c"]
+    assert rebalancer.run(dry_run=True)["users"] == len(moving)
+    assert owners(shards["c"]) == set()
+
+    assert rebalancer.run() == {"users": len(moving), "tasks": len(moving), "attachments": len(moving)}
+    for name, shard_engine in shards.items():
+        assert owners(shard_engine) == {u for u in USER_IDS if grown.shard_for(u) == name}
+    assert list(rebalancer.misplaced_users()) == []
+
+    db = make_session(primary, grown)(info={"user_id": moving[0]})
+    attachment = db.query(TaskAttachment).join(Task).filter(Task.user_id == moving[0]).one()
+    assert os.path.basename(attachment.file_path) == f"c_{attachment.task_id}_f.txt"
+    with open(attachment.file_path) as f:
+        assert f.read() == str(moving[0])
+    # The old tombstone came along, plus one for the task's old ID
+    assert db.query(TaskTombstone).filter(TaskTombstone.user_id == moving[0]).count() == 2
+    db.close()
+
+def tombstoned(shard_engine, user_id):
+    with shard_engine.connect() as conn:
+        return set(conn.execute(select(TaskTombstone.task_id).where(TaskTombstone.user_id == user_id)).scalars())
+
+def test_move_keeps_ids_that_collide_with_the_copies(databases, tmp_path):
+    _, shards = databases
+    router = ShardRouter({"a": shards["a"]}, 100)
+    with shards["b"].begin() as conn:
+        conn.execute(Task.__table__.insert(), [{"id": 1, "title": "a", "user_id": 7}, {"id": 2, "title": "b", "user_id": 7}])
+
+    ShardRebalancer(router, str(tmp_path), {"b": shards["b"]}).run()
+
+    with shards["a"].connect() as conn:
+        assert conn.execute(select(Task.id, Task.title).order_by(Task.id)).all() == [(1, "a"), (2, "b")]
+    # Tombstones for IDs that are live copies would delete them on clients
+    assert tombstoned(shards["a"], 7) == set()
+    assert owners(shards["b"]) == set()
+
+def test_interrupted_move_resumes_without_duplicating(databases, tmp_path, monkeypatch):
+    _, shards = databases
+    router = ShardRouter({"a": shards["a"]}, 100)
+    with shards["b"].begin() as conn:
+        conn.execute(Task.__table__.insert(), [{"id": 5, "title": "a", "user_id": 7}, {"id": 6, "title": "b", "user_id": 7}])
+        conn.execute(TaskAttachment.__table__.insert(), [{
+            "filename": "f.txt", "file_path": str(tmp_path / "b_5_f.txt"), "content_type": "text/plain", "task_id": 5
+        }])
+    (tmp_path / "b_5_f.txt").write_text("x")
+
+    def crash(*args):
+        raise RuntimeError("crashed")
+
+    rebalancer = ShardRebalancer(router, str(tmp_path), {"b": shards["b"]})
+    monkeypatch.setattr(ShardRebalancer, "_delete_source", staticmethod(crash))
+    with pytest.raises(RuntimeError):
+        rebalancer.run()
+    monkeypatch.undo()
+
+    assert rebalancer.run() == {"users": 1, "tasks": 2, "attachments": 1}
+    with shards["a"].connect() as conn:
+        assert conn.execute(select(Task.title).order_by(Task.title)).scalars().all() == ["a", "b"]
+        attachment = conn.execute(select(TaskAttachment)).one()
+    assert open(attachment.file_path).read() == "x"
+    # Copies got IDs 1 and 2, so clients drop 5 and 6
+    assert tombstoned(shards["a"], 7) == {5, 6}
+    with shards["a"].connect() as conn:
+        assert conn.execute(select(ShardMove)).all() == []
+    assert owners(shards["b"]) == set()
+    assert list(rebalancer.misplaced_users()) == []
@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy import event, inspect, text
+
+from app.core import startup
+from app.core.database import Base, engine
+from app.core.startup import StartupTimer, get_alembic_heads, prepare_schema, warm_pool
+# Registers every table create_all is expected to build
+import app.models.todo  # noqa: F401
+import app.models.user  # noqa: F401
+
+@pytest.fixture
+def empty_db():
+    Base.metadata.drop_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+
+def stamp(revisions):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) PRIMARY KEY)"))
+        for revision in revisions:
+            conn.execute(text("INSERT INTO alembic_version VALUES (:revision)"), {"revision": revision})
+
+def test_create_all_builds_the_schema(empty_db):
+    prepare_schema("create_all")
+
+    assert {"users", "tasks", "refresh_tokens"} <= set(inspect(engine).get_table_names())
+
+def test_check_refuses_an_unmigrated_database(empty_db):
+    with pytest.raises(RuntimeError, match="alembic upgrade head"):
+        prepare_schema("check")
+
+    stamp(["0001"])
+    with pytest.raises(RuntimeError, match="0001"):
+        prepare_schema("check")
+
+def test_check_accepts_the_migration_head(empty_db):
+    stamp(get_alembic_heads())
+
+    prepare_schema("check")
+    # Check mode never creates tables
+    assert "users" not in inspect(engine).get_table_names()
+
+def test_skip_does_not_touch_the_database(empty_db):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        prepare_schema("skip")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert statements == []
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        prepare_schema("migrate")
+
+def test_warm_pool_is_capped_at_the_pool_size():
+    engine.dispose()
+
+    assert warm_pool(engine.pool.size() + 5) == engine.pool.size()
+    assert engine.pool.checkedin() == engine.pool.size()
+    assert warm_pool(0) == 0
+
+def test_warm_size_defaults_to_the_full_pool_in_lifo_mode(monkeypatch):
+    monkeypatch.setattr(startup.settings, "DB_POOL_WARM_SIZE", 0)
+    monkeypatch.setattr(startup.settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(startup.settings, "DB_POOL_MODE", "lifo")
+    assert startup.get_warm_size() == 7
+
+    monkeypatch.setattr(startup.settings, "DB_POOL_MODE", "queue")
+    assert startup.get_warm_size() == 0
+
+    monkeypatch.setattr(startup.settings, "DB_POOL_WARM_SIZE", 3)
+    assert startup.get_warm_size() == 3
+
+def test_timer_reports_phases_and_total():
+    timer = StartupTimer()
+    timer.record("imports", 1.234)
+    with timer.phase("schema"):
+        pass
+
+    report = timer.report()
+    assert list(report) == ["imports", "schema", "total"]
+    assert report["imports"] == 1.23
+    assert report["total"] >= 0
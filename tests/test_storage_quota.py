@@ -0,0 +1,109 @@
+import os
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException, Request
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import tasks
+from app.core.database import Base, SessionLocal, engine
+from app.core.security import SecurityService
+from app.models.todo import Task, TaskAttachment
+from app.models.user import User
+from app.services.storage_service import MULTIPART_OVERHEAD_BYTES, StorageService
+
+QUOTA = 1000
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    from main import app
+
+    monkeypatch.setattr(tasks, "UPLOAD_DIR", str(tmp_path))
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(id=1, email="user1@example.com", password_hash="x", is_verified=True, storage_quota_bytes=QUOTA))
+    db.add(Task(id=1, title="a", user_id=1))
+    db.commit()
+    db.close()
+    yield TestClient(app)
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def auth_headers():
+    token = SecurityService.create_access_token({"sub": "user1@example.com"}, timedelta(minutes=5))
+    return {"Authorization": f"Bearer {token}"}
+
+def storage_used() -> int:
+    db = SessionLocal()
+    try:
+        return db.get(User, 1).storage_used_bytes
+    finally:
+        db.close()
+
+def upload(client, headers, name: str, size: int):
+    return client.post(
+        "/api/v1/tasks/1/attachments",
+        files={"file": (name, b"x" * size, "text/plain")},
+        headers=headers
+    )
+
+def test_uploads_and_deletes_update_running_total(client, auth_headers, tmp_path):
+    assert upload(client, auth_headers, "a.txt", 600).status_code == 200
+    assert storage_used() == 600
+
+    # Fits the body allowance but not the quota
+    response = upload(client, auth_headers, "b.txt", 500)
+    assert response.status_code == 413
+    assert storage_used() == 600
+    assert os.listdir(tmp_path) == ["1_a.txt"]
+
+    assert upload(client, auth_headers, "c.txt", 400).status_code == 200
+    db = SessionLocal()
+    assert sorted(a.size_bytes for a in db.query(TaskAttachment)) == [400, 600]
+    db.close()
+
+    assert client.delete("/api/v1/tasks/1", headers=auth_headers).status_code == 200
+    assert storage_used() == 0
+
+def test_content_length_over_quota_is_refused_unread(client, auth_headers, tmp_path):
+    headers = {**auth_headers, "Content-Length": str(QUOTA + MULTIPART_OVERHEAD_BYTES + 1)}
+    response = client.post("/api/v1/tasks/1/attachments", content=b"", headers=headers)
+    assert response.status_code == 413
+    assert os.listdir(tmp_path) == []
+
+@pytest.mark.asyncio
+async def test_body_read_stops_at_limit():
+    chunks = [b"x" * 8192] * 4
+
+    async def receive():
+        return {"type": "http.request", "body": chunks.pop(0), "more_body": bool(chunks)}
+
+    request = Request({"type": "http", "method": "POST", "headers": []}, receive)
+    with pytest.raises(HTTPException) as error:
+        await StorageService.limit_body(request, 10).body()
+    assert error.value.status_code == 413
+    # Cut off once over the allowance, the rest of the body was never received
+    assert len(chunks) == 1
+
+def test_reserve_is_conditional(client):
+    db = SessionLocal()
+    user = db.get(User, 1)
+    assert StorageService.reserve(db, user, QUOTA - 1)
+    assert not StorageService.reserve(db, user, 2)
+    db.commit()
+    db.close()
+    assert storage_used() == QUOTA - 1
+
+def test_release_only_counts_rows_it_deleted(client, auth_headers):
+    assert upload(client, auth_headers, "a.txt", 600).status_code == 200
+
+    # Two deletes of the same task that both passed the existence check
+    first, second = SessionLocal(), SessionLocal()
+    assert StorageService.release_task(first, 1, 1) == 600
+    first.commit()
+    assert StorageService.release_task(second, 1, 1) == 0
+    second.commit()
+    first.close()
+    second.close()
+
+    assert storage_used() == 0
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.todo import Task, TaskTombstone
+from app.models.user import User
+from app.services import sync_service
+from app.services.sync_service import SyncService
+
+T0 = datetime.utcnow() - timedelta(hours=1)
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    session.add_all([User(id=user_id, email=f"user{user_id}@example.com", password_hash="x") for user_id in (1, 2)])
+    session.add_all([
+        Task(id=i, title=f"Task {i}", user_id=1, updated_at=T0 + timedelta(minutes=i % 5))
+        for i in range(1, 11)
+    ])
+    session.add(Task(id=11, title="Other user", user_id=2, updated_at=T0))
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+def sync_all(db, since, limit):
+    changed, deleted, pages = [], [], 0
+    while True:
+        page = SyncService.get_changes(db, 1, since, limit)
+        changed += [task.id for task in page["changed"]]
+        deleted += page["deleted"]
+        since = page["cursor"]
+        pages += 1
+        if not page["has_more"]:
+            return changed, deleted, since, pages
+
+def test_full_sync_pages_through_ties(db):
+    changed, deleted, _, pages = sync_all(db, None, limit=3)
+
+    # Ordered by (updated_at, id); ties on updated_at are not lost across pages
+    assert changed == [5, 10, 1, 6, 2, 7, 3, 8, 4, 9]
+    assert deleted == []
+    assert pages == 4
+
+def test_delta_returns_only_changes_and_tombstones(db, monkeypatch):
+    monkeypatch.setattr(sync_service.settings, "SYNC_COMMIT_GRACE_SECONDS", 0)
+    _, _, cursor, _ = sync_all(db, None, limit=100)
+    assert SyncService.get_changes(db, 1, cursor, 100)["changed"] == []
+
+    now = datetime.utcnow()
+    db.get(Task, 3).title = "Edited"
+    db.get(Task, 3).updated_at = now
+    db.delete(db.get(Task, 4))
+    db.add(TaskTombstone(task_id=4, user_id=1, deleted_at=now))
+    db.add(TaskTombstone(task_id=11, user_id=2, deleted_at=now))
+    db.commit()
+
+    changed, deleted, new_cursor, _ = sync_all(db, cursor, limit=1)
+    assert changed == [3]
+    assert deleted == [4]
+    assert SyncService.decode_cursor(new_cursor) >= SyncService.decode_cursor(cursor)
+
+def test_recent_changes_wait_for_the_grace_period(db):
+    _, _, cursor, _ = sync_all(db, None, limit=100)
+    db.get(Task, 1).title = "Just now"
+    db.commit()
+
+    assert SyncService.get_changes(db, 1, cursor, 100)["changed"] == []
+
+def test_bad_and_expired_cursors(db):
+    with pytest.raises(HTTPException) as exc:
+        SyncService.get_changes(db, 1, "not-a-cursor", 10)
+    assert exc.value.status_code == 400
+
+    expired = SyncService.encode_cursor((datetime.utcnow() - timedelta(days=365), 0))
+    with pytest.raises(HTTPException) as exc:
+        SyncService.get_changes(db, 1, expired, 10)
+    assert exc.value.status_code == 410
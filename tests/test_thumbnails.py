@@ -0,0 +1,75 @@
+import asyncio
+import os
+
+import pytest
+from PIL import Image
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.todo import Task, TaskAttachment
+from app.models.user import User
+from app.services.thumbnail_service import ThumbnailPipeline
+from app.utils.thumbnails import render_thumbnail
+
+@pytest.mark.parametrize("mode, size", [("RGB", (1200, 800)), ("RGBA", (300, 900))])
+def test_render_thumbnail_fits_and_flattens(tmp_path, mode, size):
+    source = str(tmp_path / "source.png")
+    Image.new(mode, size).save(source)
+    dest = str(tmp_path / "thumb.jpg")
+
+    width, height = render_thumbnail(source, "image/png", dest, 256, 10_000_000)
+
+    assert max(width, height) == 256
+    with Image.open(dest) as thumbnail:
+        assert thumbnail.format == "JPEG"
+        assert thumbnail.size == (width, height)
+
+def test_render_thumbnail_rejects_oversized_and_mislabelled(tmp_path):
+    source = str(tmp_path / "source.png")
+    Image.new("RGB", (1000, 1000)).save(source)
+
+    with pytest.raises(Image.DecompressionBombError):
+        render_thumbnail(source, "image/png", str(tmp_path / "a.jpg"), 256, 10_000)
+    with pytest.raises(ValueError):
+        render_thumbnail(source, "text/plain", str(tmp_path / "b.jpg"), 256, 10_000_000)
+
+@pytest.fixture
+def attachments(tmp_path):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(id=1, email="user1@example.com", password_hash="x"))
+    db.add(Task(id=1, title="a", user_id=1))
+    good, bad = str(tmp_path / "1_photo.jpg"), str(tmp_path / "1_fake.png")
+    Image.new("RGB", (800, 600)).save(good)
+    with open(bad, "wb") as f:
+        f.write(b"not an image")
+    db.add_all([
+        TaskAttachment(id=1, filename="photo.jpg", file_path=good, content_type="image/jpeg", task_id=1, thumbnail_status="pending"),
+        TaskAttachment(id=2, filename="fake.png", file_path=bad, content_type="image/png", task_id=1, thumbnail_status="pending"),
+    ])
+    db.commit()
+    db.close()
+    yield good, bad
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.mark.asyncio
+async def test_pipeline_renders_in_worker_processes(attachments):
+    good, bad = attachments
+    pipeline = ThumbnailPipeline(workers=1, max_pending=1, max_size=128, max_pixels=10_000_000, memory_limit_mb=512)
+    try:
+        assert pipeline.submit(1, good, "image/jpeg")
+        # The queue is bounded
+        assert not pipeline.submit(2, bad, "image/png")
+        await asyncio.wait_for(asyncio.gather(*pipeline._jobs), 60)
+        assert pipeline.submit(2, bad, "image/png")
+        await asyncio.wait_for(asyncio.gather(*pipeline._jobs), 60)
+    finally:
+        await pipeline.shutdown()
+
+    db = SessionLocal()
+    ready, failed = db.get(TaskAttachment, 1), db.get(TaskAttachment, 2)
+    db.close()
+    assert (ready.thumbnail_status, ready.thumbnail_path) == ("ready", ThumbnailPipeline.thumbnail_path(good))
+    assert os.path.exists(ready.thumbnail_path)
+    assert (failed.thumbnail_status, failed.thumbnail_path) == ("failed", None)
+    assert pipeline.stats()["generated"] == 1
+    assert pipeline.stats()["dropped"] == 1
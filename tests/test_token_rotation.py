@@ -0,0 +1,102 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.database import Base, SessionLocal, engine
+from app.core.security import SecurityService
+# Registers Task, which User's relationship refers to
+import app.models.todo  # noqa: F401
+from app.models.user import RefreshToken, User
+from app.services import token_service
+from app.services.token_service import TokenService
+
+@pytest.fixture
+def refresh_token():
+    Base.metadata.create_all(bind=engine)
+    token = SecurityService.generate_refresh_token()
+    db = SessionLocal()
+    db.add(User(id=1, email="user1@example.com", password_hash="x", is_verified=True))
+    db.add(RefreshToken(
+        token_hash=SecurityService.hash_token(token),
+        user_id=1,
+        expires_at=datetime.utcnow() + timedelta(days=1),
+        created_at=datetime.utcnow()
+    ))
+    db.commit()
+    db.close()
+    yield token
+    Base.metadata.drop_all(bind=engine)
+
+def rotate(token):
+    db = SessionLocal()
+    try:
+        return TokenService.rotate_refresh_token(token, db)
+    finally:
+        db.close()
+
+def active_tokens():
+    db = SessionLocal()
+    try:
+        return db.query(RefreshToken).filter(RefreshToken.is_revoked.is_(False)).count()
+    finally:
+        db.close()
+
+def test_rotation_replaces_the_token(refresh_token):
+    tokens = rotate(refresh_token)
+
+    assert tokens["refresh_token"] != refresh_token
+    assert SecurityService.decode_token(tokens["access_token"])["sub"] == "user1@example.com"
+    assert active_tokens() == 1
+    # The new token rotates in turn
+    assert rotate(tokens["refresh_token"])["refresh_token"]
+
+def test_reuse_within_grace_is_a_conflict(refresh_token):
+    tokens = rotate(refresh_token)
+
+    with pytest.raises(HTTPException) as e:
+        rotate(refresh_token)
+    assert e.value.status_code == 409
+    # The successor survives a concurrent retry
+    assert active_tokens() == 1
+    assert rotate(tokens["refresh_token"])
+
+def test_reuse_after_grace_revokes_every_session(refresh_token, monkeypatch):
+    tokens = rotate(refresh_token)
+    monkeypatch.setattr(token_service.settings, "REFRESH_TOKEN_REUSE_GRACE_SECONDS", -1)
+
+    with pytest.raises(HTTPException) as e:
+        rotate(refresh_token)
+    assert e.value.status_code == 401
+    assert active_tokens() == 0
+    with pytest.raises(HTTPException):
+        rotate(tokens["refresh_token"])
+
+def test_unknown_token_is_rejected_without_revoking(refresh_token):
+    with pytest.raises(HTTPException) as e:
+        rotate("not-a-token")
+    assert e.value.status_code == 401
+    assert active_tokens() == 1
+
+def test_concurrent_rotations_have_one_winner(refresh_token):
+    barrier = threading.Barrier(2)
+    results = []
+
+    def attempt():
+        barrier.wait()
+        try:
+            results.append(rotate(refresh_token)["refresh_token"])
+        except HTTPException as e:
+            results.append(e.status_code)
+
+    threads = [threading.Thread(target=attempt) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # The loser sees the winner's successor and is told to retry
+    assert results.count(409) == 1
+    assert len([r for r in results if isinstance(r, str)]) == 1
+    assert active_tokens() == 1